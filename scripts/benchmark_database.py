@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Agent Hub database
+
+Generates synthetic catalogs in a temporary directory and measures file size and
+load time of the database.
+
+Usage:
+    python benchmark_database.py storage-format [--agents N ...]
+    python benchmark_database.py cold-load [--agents N ...]
+    python benchmark_database.py parallel-load [--agents N ...] [--workers N ...]
+    python benchmark_database.py batch-writes [--agents N ...] [--edits N]
+    python benchmark_database.py memory [--agents N ...]
+    python benchmark_database.py similar-agents [--agents N ...] [--lookups N]
+    python benchmark_database.py semantic-search [--agents N ...] [--queries N] [--probes N ...]
+    python benchmark_database.py fuzzy-search [--agents N ...] [--queries N]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from schema import (
+    Provider, AgentMetadata, AgentFeatures, LLMSupport, VectorStore, MemoryStore,
+    CodeSnippet, MemoryType, PlanningCapability, ToolUseCapability, AgentDomain, ProviderType
+)
+import database
+from database import JSONDatabase, agent_to_dict
+from similarity import SimilarityIndex
+from semantic_index import SemanticIndex
+from fuzzy_index import FuzzyIndex
+
+WORDS = [
+    "research", "coding", "assistant", "planner", "data", "report", "sql", "support",
+    "finance", "legal", "vision", "audio", "retrieval", "memory", "workflow", "chat",
+]
+MODELS = ["gpt-4", "gpt-4o", "claude-3", "llama-3", "mistral-large", "gemini-pro"]
+
+
+def generate_catalog(num_agents, num_providers=50, seed=42):
+    """Generate linked synthetic providers and agents.
+
+    Returns:
+        Tuple of (providers, agents) lists
+    """
+    rng = random.Random(seed)
+    providers = [
+        Provider(
+            name=f"Provider {i}",
+            description=f"Synthetic provider {i} building {rng.choice(WORDS)} agents.",
+            url=f"https://provider{i}.example.com",
+            provider_type=rng.choice(list(ProviderType)),
+            github_url=f"https://github.com/provider{i}",
+            docs_url=f"https://provider{i}.example.com/docs"
+        )
+        for i in range(num_providers)
+    ]
+
+    agents = []
+    for i in range(num_agents):
+        name_words = rng.sample(WORDS, 2)
+        agents.append(AgentMetadata(
+            name=f"{name_words[0].capitalize()} {name_words[1].capitalize()} Agent {i}",
+            description=" ".join(rng.choices(WORDS, k=25)),
+            version=f"{rng.randint(0, 3)}.{rng.randint(0, 9)}.0",
+            provider_id=rng.choice(providers).id,
+            features=AgentFeatures(
+                planning=rng.choice(list(PlanningCapability)),
+                memory=rng.sample(list(MemoryType), 2),
+                tool_use=rng.choice(list(ToolUseCapability)),
+                multi_agent_collaboration=rng.random() < 0.5,
+                human_in_the_loop=rng.random() < 0.5,
+                reasoning_frameworks=rng.sample(["ReAct", "CoT", "ToT", "Reflexion"], 2),
+                autonomous=rng.random() < 0.5,
+                supports_vision=rng.random() < 0.3,
+            ),
+            supported_llms=[
+                LLMSupport(model_name=model, provider_id=rng.choice(providers).id, performance_rating=rng.randint(1, 5))
+                for model in rng.sample(MODELS, 3)
+            ],
+            vector_stores=[VectorStore(name="Chroma", provider_id=rng.choice(providers).id)],
+            memory_stores=[MemoryStore(name="Redis", type=MemoryType.SHORT_TERM, provider_id=rng.choice(providers).id)],
+            domains=rng.sample(list(AgentDomain), 2),
+            code_snippets=[CodeSnippet(
+                language="python",
+                description="Basic setup",
+                code="\n".join(f"agent.step({j})" for j in range(10)),
+                import_requirements=["agent_sdk"]
+            )],
+            example_prompts=[" ".join(rng.choices(WORDS, k=8)) for _ in range(3)],
+            tags=rng.sample(WORDS, 4),
+            github_url=f"https://github.com/agents/agent{i}",
+        ))
+    return providers, agents
+
+
+def write_catalog(data_dir, providers, agents, embed_providers=False):
+    """Write a catalog as JSON files, optionally in the old denormalized format."""
+    os.makedirs(data_dir, exist_ok=True)
+    provider_map = {p.id: p for p in providers}
+    with open(os.path.join(data_dir, "providers.json"), 'w') as f:
+        json.dump([p.model_dump() for p in providers], f, default=str, indent=2)
+
+    agent_dicts = []
+    for agent in agents:
+        if embed_providers:
+            # Reproduce the old format, which embedded every linked provider object
+            agent = agent.model_copy(deep=True)
+            agent.provider = provider_map.get(agent.provider_id)
+            for item in agent.supported_llms + agent.vector_stores + agent.memory_stores:
+                item.provider = provider_map.get(item.provider_id)
+            agent_dicts.append(agent.model_dump())
+        else:
+            agent_dicts.append(agent_to_dict(agent))
+    with open(os.path.join(data_dir, "agents.json"), 'w') as f:
+        json.dump(agent_dicts, f, default=str, indent=2)
+
+
+def time_load(data_dir, repeat=3, **kwargs):
+    """Return the best load time of a JSONDatabase in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        JSONDatabase(data_dir, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark_storage_format(args):
+    """Compare the old embedded-provider format with the ID-only format."""
+    print(f"{'agents':>8} {'format':>10} {'agents.json':>12} {'load':>10}")
+    for num_agents in args.agents:
+        providers, agents = generate_catalog(num_agents)
+        with tempfile.TemporaryDirectory() as tmp:
+            for label, embed in (("embedded", True), ("id-only", False)):
+                data_dir = os.path.join(tmp, label)
+                write_catalog(data_dir, providers, agents, embed_providers=embed)
+                size = os.path.getsize(os.path.join(data_dir, "agents.json"))
+                load = time_load(data_dir, args.repeat)
+                print(f"{num_agents:>8} {label:>10} {size / 1e6:>10.2f}MB {load:>9.3f}s")
+
+
+def benchmark_cold_load(args):
+    """Compare loading a snapshot written by the database with files that need full validation."""
+    print(f"{'agents':>8} {'file':>26} {'load':>10}")
+    for num_agents in args.agents:
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy_dir = os.path.join(tmp, "legacy")
+            providers, agents = generate_catalog(num_agents)
+            write_catalog(legacy_dir, providers, agents)
+            del providers, agents
+
+            snapshot_dir = os.path.join(tmp, "snapshot")
+            JSONDatabase(legacy_dir).export_json(snapshot_dir, pretty=False)
+            gc.collect()
+
+            # Same content with a checksum that no longer matches, as after a manual edit
+            mismatch_dir = os.path.join(tmp, "mismatch")
+            os.makedirs(mismatch_dir)
+            for name in ("providers.json", "agents.json"):
+                with open(os.path.join(snapshot_dir, name), 'rb') as f:
+                    content = re.sub(rb'"checksum":"[0-9a-f]{64}"', b'"checksum":"' + b"0" * 64 + b'"', f.read(), count=1)
+                with open(os.path.join(mismatch_dir, name), 'wb') as f:
+                    f.write(content)
+
+            for label, data_dir in (("legacy array", legacy_dir), ("snapshot, checksum mismatch", mismatch_dir),
+                                    ("snapshot, trusted", snapshot_dir)):
+                load = time_load(data_dir, args.repeat)
+                gc.collect()
+                print(f"{num_agents:>8} {label:>26} {load:>9.3f}s")
+
+
+def benchmark_parallel_load(args):
+    """Compare load times of large files that need full validation with different numbers of worker processes."""
+    # Parallel loading only starts above a file size; use it at every size for the comparison
+    database.PARALLEL_LOAD_MIN_BYTES = 0
+    print(f"{'agents':>8} {'workers':>8} {'load':>10}")
+    for num_agents in args.agents:
+        with tempfile.TemporaryDirectory() as tmp:
+            providers, agents = generate_catalog(num_agents)
+            write_catalog(tmp, providers, agents)
+            del providers, agents
+            gc.collect()
+
+            for workers in args.workers:
+                load = time_load(tmp, args.repeat, load_workers=workers)
+                gc.collect()
+                print(f"{num_agents:>8} {workers:>8} {load:>9.3f}s")
+
+
+def benchmark_batch_writes(args):
+    """Compare updating agents one write at a time with a single batched write."""
+    print(f"{'agents':>8} {'edits':>6} {'storage':>8} {'mode':>10} {'flushes':>8} {'time':>10}")
+    for num_agents in args.agents:
+        with tempfile.TemporaryDirectory() as tmp:
+            providers, agents = generate_catalog(num_agents)
+            write_catalog(tmp, providers, agents)
+            del providers, agents
+
+            for storage, journal in (("snapshot", False), ("journal", True)):
+                for mode in ("per-edit", "batch"):
+                    db = JSONDatabase(tmp, journal=journal, compact_threshold=10 ** 9)
+                    edited = db.get_all_agents()[:args.edits]
+                    flushes = db.metrics["flushes"]
+                    start = time.perf_counter()
+                    if mode == "batch":
+                        with db.batch():
+                            for agent in edited:
+                                db.update_agent(agent.model_copy(update={"version": "2.0.0"}))
+                    else:
+                        for agent in edited:
+                            db.update_agent(agent.model_copy(update={"version": "2.0.0"}))
+                    elapsed = time.perf_counter() - start
+                    flushes = db.metrics["flushes"] - flushes
+                    db.compact()
+                    print(f"{num_agents:>8} {len(edited):>6} {storage:>8} {mode:>10} {flushes:>8} {elapsed:>9.3f}s")
+
+
+def resident_mb():
+    """Current resident set size in MB (peak size where /proc is not available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1e6 if sys.platform == "darwin" else 1e3)
+
+
+def measure_memory(data_dir, compact_records, traced):
+    """Load a catalog and return the memory it holds in MB (run in a fresh process).
+
+    With traced, the live Python allocations are measured with tracemalloc, otherwise the growth of the RSS.
+    """
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+    before = resident_mb()
+    db = JSONDatabase(data_dir, compact_records=compact_records)
+    gc.collect()
+    if traced:
+        return tracemalloc.get_traced_memory()[0] / 1e6
+    return resident_mb() - before
+
+
+def benchmark_memory(args):
+    """Compare the memory held by loaded catalogs with and without compact records, per 10k agents."""
+    print(f"{'agents':>8} {'file':>10} {'records':>8} {'RSS/10k':>10} {'heap/10k':>10}")
+    context = get_context("spawn")
+    for num_agents in args.agents:
+        scale = 10000 / num_agents
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy_dir = os.path.join(tmp, "legacy")
+            providers, agents = generate_catalog(num_agents)
+            write_catalog(legacy_dir, providers, agents)
+            del providers, agents
+            snapshot_dir = os.path.join(tmp, "snapshot")
+            JSONDatabase(legacy_dir).export_json(snapshot_dir, pretty=False)
+            gc.collect()
+
+            for label, data_dir in (("legacy", legacy_dir), ("snapshot", snapshot_dir)):
+                for compact_records in (False, True):
+                    sizes = []
+                    for traced in (False, True):
+                        # A fresh process per measurement, so earlier loads do not skew the RSS
+                        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                            sizes.append(executor.submit(measure_memory, data_dir, compact_records, traced).result())
+                    records = "compact" if compact_records else "plain"
+                    print(f"{num_agents:>8} {label:>10} {records:>8} {sizes[0] * scale:>8.1f}MB {sizes[1] * scale:>8.1f}MB")
+
+
+def benchmark_similar_agents(args):
+    """Time building the similarity index, top-10 lookups and single-agent updates."""
+    print(f"{'agents':>8} {'build':>10} {'lookup':>10} {'update':>10}")
+    for num_agents in args.agents:
+        _, agents = generate_catalog(num_agents)
+        index = SimilarityIndex()
+        with database.paused_gc():
+            start = time.perf_counter()
+            index.add_all(agents)
+            build = time.perf_counter() - start
+
+        sample = random.Random(0).sample(agents, min(args.lookups, num_agents))
+        start = time.perf_counter()
+        for agent in sample:
+            index.similar(agent.id, limit=10)
+        lookup = (time.perf_counter() - start) / len(sample)
+
+        start = time.perf_counter()
+        for agent in sample:
+            index.add(agent)
+        update = (time.perf_counter() - start) / len(sample)
+        print(f"{num_agents:>8} {build:>9.2f}s {lookup * 1000:>8.2f}ms {update * 1000:>8.3f}ms")
+        del agents, index, sample
+        gc.collect()
+
+
+def benchmark_semantic_search(args):
+    """Time fitting and reopening the semantic index, and query time and recall per number of probes."""
+    for num_agents in args.agents:
+        _, agents = generate_catalog(num_agents)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with database.paused_gc():
+                start = time.perf_counter()
+                index = SemanticIndex(tmp_dir)
+                index.sync(agents)
+                index.save()
+                build = time.perf_counter() - start
+                start = time.perf_counter()
+                SemanticIndex(tmp_dir).sync(agents)
+                reopen = time.perf_counter() - start
+            print(f"{num_agents} agents: fit and embed {build:.2f}s, reopen {reopen:.2f}s, "
+                  f"{len(index.centroids)} clusters")
+
+            rng = random.Random(0)
+            queries = [" ".join(rng.sample(agent.description.split(), 4))
+                       for agent in rng.sample(agents, min(args.queries, num_agents))]
+            exact = [{agent_id for agent_id, _ in index.search(query, 10, probes=len(index.centroids))}
+                     for query in queries]
+            print(f"{'probes':>8} {'query':>10} {'recall@10':>10}")
+            for probes in sorted(set(args.probes + [len(index.centroids)])):
+                start = time.perf_counter()
+                results = [index.search(query, 10, probes=probes) for query in queries]
+                query_time = (time.perf_counter() - start) / len(queries)
+                recall = sum(
+                    len(expected & {agent_id for agent_id, _ in found}) / max(1, len(expected))
+                    for found, expected in zip(results, exact)
+                ) / len(queries)
+                print(f"{probes:>8} {query_time * 1000:>8.2f}ms {recall:>10.2f}")
+            del index
+        del agents
+        gc.collect()
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Swap two adjacent letters of a word."""
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def benchmark_fuzzy_search(args):
+    """Time building the fuzzy index and searching misspelled agent names, and how often the top match is right."""
+    print(f"{'agents':>8} {'build':>10} {'top 10':>10} {'all':>10} {'matches':>10} {'hit@1':>8}")
+    for num_agents in args.agents:
+        providers, agents = generate_catalog(num_agents)
+        index = FuzzyIndex()
+        with database.paused_gc():
+            start = time.perf_counter()
+            index.add_all(agents)
+            for provider in providers:
+                index.set_provider(provider.id, provider.name)
+            build = time.perf_counter() - start
+
+        rng = random.Random(0)
+        # The two words starting each generated name, misspelled
+        names = [" ".join(agent.name.split()[:2]) for agent in rng.sample(agents, min(args.queries, num_agents))]
+        queries = [" ".join(misspell(word, rng) for word in name.split()) for name in names]
+        by_id = {agent.id: agent for agent in agents}
+
+        start = time.perf_counter()
+        results = [index.search(query, limit=10) for query in queries]
+        top = (time.perf_counter() - start) / len(queries)
+        start = time.perf_counter()
+        matches = sum(len(index.search(query)) for query in queries) / len(queries)
+        full = (time.perf_counter() - start) / len(queries)
+        # Names with the same two words in either order score the same
+        hits = sum(
+            bool(found) and set(by_id[found[0][0]].name.split()[:2]) == set(name.split())
+            for found, name in zip(results, names)
+        ) / len(queries)
+        print(f"{num_agents:>8} {build:>9.2f}s {top * 1000:>8.2f}ms {full * 1000:>8.2f}ms {matches:>10.0f} {hits:>8.2f}")
+        del agents, index, by_id
+        gc.collect()
+
+
+def main():
+    """Main function to run a benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    storage_format = subparsers.add_parser("storage-format", help="File size and load time of the agent file format")
+    storage_format.add_argument("--agents", type=int, nargs="+", default=[1000, 10000])
+    storage_format.add_argument("--repeat", type=int, default=3)
+    storage_format.set_defaults(func=benchmark_storage_format)
+
+    cold_load = subparsers.add_parser("cold-load", help="Load time of trusted snapshots and fully validated files")
+    cold_load.add_argument("--agents", type=int, nargs="+", default=[10000, 100000])
+    cold_load.add_argument("--repeat", type=int, default=3)
+    cold_load.set_defaults(func=benchmark_cold_load)
+
+    parallel_load = subparsers.add_parser("parallel-load", help="Full validation load time per number of worker processes")
+    parallel_load.add_argument("--agents", type=int, nargs="+", default=[100000])
+    parallel_load.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parallel_load.add_argument("--repeat", type=int, default=3)
+    parallel_load.set_defaults(func=benchmark_parallel_load)
+
+    batch_writes = subparsers.add_parser("batch-writes", help="Write time of many edits, one at a time and batched")
+    batch_writes.add_argument("--agents", type=int, nargs="+", default=[1000, 10000])
+    batch_writes.add_argument("--edits", type=int, default=50)
+    batch_writes.set_defaults(func=benchmark_batch_writes)
+
+    memory = subparsers.add_parser("memory", help="Memory held by loaded catalogs with and without compact records")
+    memory.add_argument("--agents", type=int, nargs="+", default=[10000])
+    memory.set_defaults(func=benchmark_memory)
+
+    similar_agents = subparsers.add_parser("similar-agents", help="Similarity index build, lookup and update time")
+    similar_agents.add_argument("--agents", type=int, nargs="+", default=[10000, 100000])
+    similar_agents.add_argument("--lookups", type=int, default=200)
+    similar_agents.set_defaults(func=benchmark_similar_agents)
+
+    semantic_search = subparsers.add_parser("semantic-search", help="Semantic index build time, query time and recall")
+    semantic_search.add_argument("--agents", type=int, nargs="+", default=[10000, 100000])
+    semantic_search.add_argument("--queries", type=int, default=200)
+    semantic_search.add_argument("--probes", type=int, nargs="+", default=[8, 16, 32, 64])
+    semantic_search.set_defaults(func=benchmark_semantic_search)
+
+    fuzzy_search = subparsers.add_parser("fuzzy-search", help="Fuzzy index build time, query time and accuracy")
+    fuzzy_search.add_argument("--agents", type=int, nargs="+", default=[10000, 100000])
+    fuzzy_search.add_argument("--queries", type=int, default=200)
+    fuzzy_search.set_defaults(func=benchmark_fuzzy_search)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
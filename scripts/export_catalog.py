@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Export the agents of the Agent Hub catalog as NDJSON or CSV
+
+Agents are written one record at a time, so memory use does not grow with the
+size of the catalog. Filters are resolved by the database indexes and
+--fields limits each record to the given (dotted) fields.
+
+Usage:
+    python export_catalog.py agents.ndjson
+    python export_catalog.py agents.csv --fields id,name,features.planning --domain coding
+    python export_catalog.py - --provider "Microsoft AutoGen" --query research
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from bulk_export import EXPORT_FORMATS, export_agents
+from bulk_import import provider_lookup, resolve_provider
+from database import SORT_OPTIONS, get_database
+
+
+def main():
+    """Main function to run the export."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="Output file, or - for standard output")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Output format (default: from the file extension)")
+    parser.add_argument("--fields", help="Comma-separated fields to export, e.g. id,name,features.planning")
+    parser.add_argument("--query", default="", help="Only agents matching this search text")
+    parser.add_argument("--provider", help="Only agents of this provider (ID or name)")
+    parser.add_argument("--domain", action="append", help="Only agents of this domain (repeatable)")
+    parser.add_argument("--tag", action="append", help="Only agents with this tag (repeatable)")
+    parser.add_argument("--sort", choices=SORT_OPTIONS, default="name")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+    parser.add_argument("--backend", choices=["json", "sqlite", "sharded"], help="Storage backend (default: AGENT_HUB_BACKEND or json)")
+    args = parser.parse_args()
+
+    db = get_database(args.data_dir, args.backend)
+    db.wait_until_loaded()
+    provider_id = None
+    if args.provider:
+        provider_id = resolve_provider(args.provider, provider_lookup(db.get_all_providers()))
+
+    fields = [field.strip() for field in args.fields.split(",") if field.strip()] if args.fields else None
+    fmt = args.format or ("ndjson" if args.output == "-" else None)
+    target = sys.stdout.buffer if args.output == "-" else args.output
+    count = export_agents(db, target, fmt, fields, query=args.query, provider_id=provider_id,
+                          domains=args.domain, tags=args.tag, sort=args.sort)
+    print(f"Exported {count} agents", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
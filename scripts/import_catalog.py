@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Bulk import agents or providers into the Agent Hub catalog
+
+Reads JSONL (one record per line) or CSV (one record per row, dotted column
+names for nested fields such as features.planning, ";" between list items)
+and adds the valid records in one batched write. Agents may name their
+provider instead of giving its ID. Invalid rows are reported and skipped.
+
+Usage:
+    python import_catalog.py providers providers.jsonl
+    python import_catalog.py agents agents.csv [--data-dir DIR] [--backend sqlite] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from bulk_import import IMPORT_FORMATS, import_file
+from database import get_database
+
+
+def main():
+    """Main function to run the import."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=["agents", "providers"])
+    parser.add_argument("file", help="JSONL or CSV file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Input format (default: from the file extension)")
+    parser.add_argument("--data-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+    parser.add_argument("--backend", choices=["json", "sqlite", "sharded"], help="Storage backend (default: AGENT_HUB_BACKEND or json)")
+    parser.add_argument("--workers", type=int, help="Processes validating large inputs (default: one per CPU)")
+    parser.add_argument("--max-errors", type=int, default=20, help="Number of row errors to print")
+    args = parser.parse_args()
+
+    db = get_database(args.data_dir, args.backend)
+    result = import_file(db, args.file, args.kind[:-1], args.format, args.workers)
+
+    for number, error in result["errors"][:args.max_errors]:
+        print(f"Row {number}: {error}", file=sys.stderr)
+    if result["failed"] > args.max_errors:
+        print(f"... and {result['failed'] - args.max_errors} more errors", file=sys.stderr)
+    print(f"Imported {result['imported']} {args.kind}, {result['failed']} rows failed "
+          f"({result['records_per_second']:.0f} records/s, {result['seconds']:.2f}s, {result['workers']} workers)")
+    sys.exit(1 if result["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
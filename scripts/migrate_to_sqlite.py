@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Migrate the Agent Hub catalog from JSON files to SQLite
+
+Reads providers.json and agents.json from the data directory and writes them
+into agent_hub.db in the same directory. Start the app with
+AGENT_HUB_BACKEND=sqlite to use the migrated database.
+
+Usage:
+    python migrate_to_sqlite.py [data_dir]
+
+    If data_dir is not provided, the project's data directory is used.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from sqlite_database import SQLiteDatabase
+
+
+def main():
+    """Main function to run the migration."""
+    if len(sys.argv) > 1:
+        data_dir = sys.argv[1]
+    else:
+        data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+    db = SQLiteDatabase(data_dir)
+    counts = db.migrate_from_json()
+    print(f"Migrated {counts['providers']} providers and {counts['agents']} agents to {db.db_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import streamlit as st
 import os
 import sys
 
-from database import JSONDatabase
+from database import get_database
 from schema import (
     Provider, AgentMetadata, AgentFeatures, 
     LLMSupport, VectorStore, MemoryStore, CodeSnippet,
@@ -15,13 +15,13 @@ from schema import (
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 
-from database import JSONDatabase
+from database import get_database
 from schema import ProviderType
 
 # Seed some initial data for demo purposes
 def seed_data():
     """Seed the database with some initial data if empty."""
-    db = JSONDatabase()
+    db = get_database()
     
     # Only seed if no data exists
     if db.get_all_providers() or db.get_all_agents():
@@ -96,15 +96,6 @@ def seed_data():
         docs_url="https://redis.io/docs/"
     )
     
-    # Add all providers to the database
-    db.add_provider(autogen_provider)
-    db.add_provider(agno_provider)
-    db.add_provider(llamaindex_framework)
-    db.add_provider(openai_provider)
-    db.add_provider(anthropic_provider)
-    db.add_provider(facebook_provider)
-    db.add_provider(redis_provider)
-    
     # Sample agent for AutoGen
     autogen_agent = AgentMetadata(
         name="AutoGen Conversational Agent",
@@ -185,7 +176,16 @@ user_proxy.initiate_chat(
         docs_url="https://microsoft.github.io/autogen/docs/Use-Cases/agent_chat"
     )
     
-    db.add_agent(autogen_agent)
+    # Add all providers and the agent to the database, written in one flush
+    with db.batch():
+        db.add_provider(autogen_provider)
+        db.add_provider(agno_provider)
+        db.add_provider(llamaindex_framework)
+        db.add_provider(openai_provider)
+        db.add_provider(anthropic_provider)
+        db.add_provider(facebook_provider)
+        db.add_provider(redis_provider)
+        db.add_agent(autogen_agent)
 
 
 def welcome():
@@ -205,8 +205,15 @@ def welcome():
     )
     
     # Initialize database
-    db = JSONDatabase()
-    
+    db = get_database()
+
+    # Database cache metrics
+    with st.sidebar.expander("Database Metrics"):
+        metrics = db.get_metrics()
+        st.caption(f"Providers: {metrics['providers']} | Agents: {metrics['agents']}")
+        st.caption(f"Last load: {metrics['last_load_seconds'] * 1000:.1f} ms")
+        st.caption(f"Loads: {metrics['load_count']} | Reload checks: {metrics['reload_checks']}")
+
     # Display the home page
     st.header("👨‍👨 AI Agent Hub")
     st.markdown("""
@@ -228,16 +235,14 @@ def welcome():
     platforms and frameworks.
     """)
     
-    # Display quick stats
-    provider_counts = {}
-    for provider in db.get_all_providers():
-        provider_type = provider.provider_type.value
-        provider_counts[provider_type] = provider_counts.get(provider_type, 0) + 1
+    # Display quick stats (counts are maintained by the database, no catalog scan)
+    counts = db.get_catalog_counts()
+    provider_counts = counts["provider_type"]
     
     # Create a metric for total providers and a breakdown by type
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Total Providers", len(db.get_all_providers()))
+        st.metric("Total Providers", counts["providers"])
         
         # Show provider breakdown if there are any providers
         if provider_counts:
@@ -246,16 +251,11 @@ def welcome():
                 st.caption(f"- {ptype.capitalize()}: {count}")
     
     with col2:
-        st.metric("Agents", len(db.get_all_agents()))
+        st.metric("Agents", counts["agents"])
         
         # Show agent domain breakdown if there are any agents
-        if db.get_all_agents():
-            # Count agents by domain
-            domain_counts = {}
-            for agent in db.get_all_agents():
-                for domain in agent.domains:
-                    domain_name = domain.value
-                    domain_counts[domain_name] = domain_counts.get(domain_name, 0) + 1
+        if counts["agents"]:
+            domain_counts = counts["domain"]
             
             # Display domain counts
             st.caption("Agent Domains:")
@@ -263,6 +263,24 @@ def welcome():
             for domain, count in list(sorted(domain_counts.items(), key=lambda x: x[1], reverse=True))[:3]:
                 st.caption(f"- {domain.capitalize()}: {count}")
     
+    # Breakdown of agent capabilities and the providers with the most agents
+    if counts["agents"]:
+        with st.expander("Catalog Breakdown"):
+            planning_col, tool_use_col, provider_col = st.columns(3)
+            with planning_col:
+                st.caption("Planning:")
+                for level, count in sorted(counts["planning"].items(), key=lambda x: x[1], reverse=True):
+                    st.caption(f"- {level.capitalize()}: {count}")
+            with tool_use_col:
+                st.caption("Tool Use:")
+                for level, count in sorted(counts["tool_use"].items(), key=lambda x: x[1], reverse=True):
+                    st.caption(f"- {level.capitalize()}: {count}")
+            with provider_col:
+                st.caption("Top Providers:")
+                for provider_id, count in sorted(counts["provider"].items(), key=lambda x: x[1], reverse=True)[:5]:
+                    provider = db.get_provider(provider_id)
+                    st.caption(f"- {provider.name if provider else 'Unknown'}: {count}")
+    
     # Display some featured providers
     st.subheader("Featured Providers")
     
@@ -306,11 +324,11 @@ def welcome():
     # Create columns for featured agents
     agent_cols = st.columns(3)
     
-    # Get all agents
-    agents = db.get_all_agents()
+    # Get the first agents of the catalog
+    agents = db.search_agents("", limit=3)
     
     # Display up to 3 agents in columns
-    for i, agent in enumerate(agents[:3]):
+    for i, agent in enumerate(agents):
         with agent_cols[i]:
             with st.container(border=True):
                 st.subheader(agent.name)
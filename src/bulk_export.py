@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+from itertools import chain
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+from schema import AgentMetadata
+from database import JSONDatabase
+from bulk_import import CSV_LIST_COLUMNS, LIST_SEPARATOR
+
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Fields of an exported agent record (linked provider objects are never exported)
+EXPORT_FIELDS = [field for field in AgentMetadata.model_fields if field != "provider"]
+
+# CSV columns written when no fields are given; read_csv of bulk_import reads them back
+DEFAULT_CSV_COLUMNS = [
+    "id", "name", "description", "version", "provider_id",
+    "features.planning", "features.tool_use", "features.memory", "features.reasoning_frameworks",
+    "features.multi_agent_collaboration", "features.human_in_the_loop", "features.autonomous",
+    "features.fine_tuning_support", "features.streaming_support", "features.supports_vision",
+    "features.supports_audio",
+    "supported_llms", "vector_stores", "memory_stores", "domains", "tags",
+    "github_url", "docs_url", "demo_url", "created_at", "updated_at",
+    "star_rating", "review_count", "installation_count",
+]
+
+# Exported rows written to a file at a time
+WRITE_BATCH_SIZE = 1000
+
+# Matching agents taken from the database at a time; a page of a search reruns
+# the search, so pages are large (they only hold references to loaded agents)
+QUERY_PAGE_SIZE = 10000
+
+
+def _field_tree(fields: List[str]) -> Dict[str, Any]:
+    """Turn dotted field paths into a tree of selected keys (None selects a whole value).
+
+    Raises:
+        ValueError: If a path does not start with an agent field
+    """
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        *parents, key = field.split(".")
+        if (parents[0] if parents else key) not in EXPORT_FIELDS:
+            raise ValueError(f"Unknown field: {field}")
+        node = tree
+        for parent in parents:
+            if parent in node and node[parent] is None:
+                break
+            node = node.setdefault(parent, {})
+        else:
+            node[key] = None
+    return tree
+
+
+def _select(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    """Keep the keys of a tree in a value, applying it to each item of lists."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_select(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _select(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+
+def iter_agent_records(db: JSONDatabase, fields: Optional[List[str]] = None, **filters) -> Iterator[Dict[str, Any]]:
+    """Yield exported agent records one at a time.
+
+    Filters are resolved by the database indexes, and the matches are taken a
+    page of QUERY_PAGE_SIZE at a time, so only one page of agents is held and
+    serialized at once; each record holds only the requested fields.
+
+    Args:
+        db: Database to export from
+        fields: Dotted field paths (e.g. "name", "features.planning",
+            "supported_llms.model_name"); all fields if None
+        filters: query, provider_id, domains, features, tags, sort, fuzzy, offset and limit, as for query_agents
+    """
+    tree = _field_tree(fields) if fields else None
+    offset = filters.pop("offset", 0)
+    limit = filters.pop("limit", None)
+    end = offset + limit if limit is not None else None
+    while end is None or offset < end:
+        page_size = QUERY_PAGE_SIZE if end is None else min(QUERY_PAGE_SIZE, end - offset)
+        total, agents = db.query_agents(**filters, offset=offset, limit=page_size)
+        for agent in agents:
+            record = db.get_agent_record(agent, tree.keys() if tree is not None else None)
+            yield _select(record, tree)
+        if len(agents) < page_size:
+            break
+        offset += page_size
+        end = min(end, total) if end is not None else total
+
+
+def csv_cell(value: Any, column: str) -> str:
+    """Format a value as a CSV cell the way bulk_import.read_csv reads it."""
+    if value is None:
+        return ""
+    if isinstance(value, list) and column in CSV_LIST_COLUMNS:
+        return LIST_SEPARATOR.join(str(item) for item in value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _lookup(record: Dict[str, Any], column: str) -> Any:
+    """Get the value of a dotted column from a projected record."""
+    value: Any = record
+    for key in column.split("."):
+        if isinstance(value, list):
+            value = [item.get(key) if isinstance(item, dict) else None for item in value]
+        elif isinstance(value, dict):
+            value = value.get(key)
+        else:
+            return None
+    return value
+
+
+def iter_export(db: JSONDatabase, fmt: str = "ndjson", fields: Optional[List[str]] = None,
+                **filters) -> Iterator[bytes]:
+    """Yield an export of agents as encoded lines (see iter_agent_records).
+
+    Args:
+        fmt: "ndjson" (one JSON record per line) or "csv" (a header and one row per agent,
+            with fields as columns, DEFAULT_CSV_COLUMNS by default)
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "ndjson":
+        for record in iter_agent_records(db, fields, **filters):
+            yield json.dumps(record, ensure_ascii=False).encode() + b"\n"
+        return
+
+    columns = fields or DEFAULT_CSV_COLUMNS
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    rows = (
+        [csv_cell(_lookup(record, column), column) for column in columns]
+        for record in iter_agent_records(db, columns, **filters)
+    )
+    for row in chain([columns], rows):
+        writer.writerow(row)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def export_agents(db: JSONDatabase, target: Union[str, BinaryIO], fmt: Optional[str] = None,
+                  fields: Optional[List[str]] = None, **filters) -> int:
+    """Write agents to a file, one record at a time (see iter_export).
+
+    Args:
+        target: File path or binary file
+        fmt: "ndjson" or "csv"; defaults to the file extension (.csv, otherwise NDJSON)
+
+    Returns:
+        Number of exported agents
+    """
+    if fmt is None:
+        name = target if isinstance(target, str) else getattr(target, "name", "")
+        fmt = "csv" if str(name).lower().endswith(".csv") else "ndjson"
+    if isinstance(target, str):
+        with open(target, 'wb') as f:
+            return export_agents(db, f, fmt, fields, **filters)
+
+    count = 0
+    lines = []
+    for line in iter_export(db, fmt, fields, **filters):
+        lines.append(line)
+        if len(lines) == WRITE_BATCH_SIZE:
+            target.write(b"".join(lines))
+            lines = []
+        count += 1
+    target.write(b"".join(lines))
+    # The CSV header is not a record
+    return count - 1 if fmt == "csv" else count
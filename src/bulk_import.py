@@ -0,0 +1,302 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+from itertools import chain
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple, Union
+from pydantic import TypeAdapter, ValidationError
+from schema import AgentMetadata, Provider
+from database import AGENT_LIST, AGENT_PROVIDER_EXCLUDE, NESTED_PROVIDER_FIELDS, PROVIDER_LIST, JSONDatabase, paused_gc
+
+
+IMPORT_KINDS = ("agent", "provider")
+IMPORT_FORMATS = ("jsonl", "csv")
+
+# CSV columns holding lists, written as values separated by LIST_SEPARATOR
+CSV_LIST_COLUMNS = {"domains", "tags", "example_prompts", "features.memory", "features.reasoning_frameworks"}
+LIST_SEPARATOR = ";"
+
+# Rows validated at a time (by one worker process in a parallel import)
+IMPORT_CHUNK_SIZE = 1000
+
+# Smaller imports are validated in-process; starting workers would cost more than it saves
+PARALLEL_IMPORT_MIN_ROWS = 5000
+
+# (row number, record or None if the row could not be read, error message or None)
+Row = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+MODELS = {"agent": AgentMetadata, "provider": Provider}
+LISTS: Dict[str, TypeAdapter] = {"agent": AGENT_LIST, "provider": PROVIDER_LIST}
+
+
+def read_jsonl(f: IO[str]) -> Iterator[Row]:
+    """Read one record per line; blank lines are skipped."""
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line), None
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+
+
+def read_csv(f: IO[str]) -> Iterator[Row]:
+    """Read one record per CSV row.
+
+    Dotted column names (e.g. ``features.planning``) fill nested objects, columns
+    in CSV_LIST_COLUMNS are split on LIST_SEPARATOR, cells starting with ``[`` or
+    ``{`` are decoded as JSON and empty cells are left out, so defaults apply.
+    """
+    reader = csv.DictReader(f)
+    for row in reader:
+        record: Dict[str, Any] = {}
+        try:
+            for column, cell in row.items():
+                if column is None:
+                    raise ValueError("More cells than columns")
+                cell = (cell or "").strip()
+                if not cell:
+                    continue
+                if cell[0] in "[{":
+                    value = json.loads(cell)
+                elif column in CSV_LIST_COLUMNS:
+                    value = [item.strip() for item in cell.split(LIST_SEPARATOR) if item.strip()]
+                else:
+                    value = cell
+                *parents, key = column.split(".")
+                target = record
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[key] = value
+        except (ValueError, AttributeError) as e:
+            yield reader.line_num, None, f"Invalid row: {e}"
+            continue
+        yield reader.line_num, record, None
+
+
+def read_rows(source: Union[str, IO[str]], fmt: Optional[str] = None) -> Iterator[Row]:
+    """Stream the records of a JSONL or CSV file.
+
+    Args:
+        source: File path or open text file
+        fmt: "jsonl" or "csv"; defaults to the file extension (.csv, otherwise JSONL)
+    """
+    if fmt is None:
+        name = source if isinstance(source, str) else getattr(source, "name", "")
+        fmt = "csv" if str(name).lower().endswith(".csv") else "jsonl"
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+    if not isinstance(source, str):
+        yield from read_csv(source) if fmt == "csv" else read_jsonl(source)
+        return
+    with open(source, newline="", encoding="utf-8") as f:
+        yield from read_csv(f) if fmt == "csv" else read_jsonl(f)
+
+
+def provider_lookup(providers: Iterable[Provider]) -> Dict[str, str]:
+    """Map provider IDs and lowercased names to provider IDs (the first provider wins a shared name)."""
+    provider_ids: Dict[str, str] = {}
+    for provider in providers:
+        provider_ids.setdefault(provider.name.strip().lower(), provider.id)
+        provider_ids[provider.id] = provider.id
+    return provider_ids
+
+
+def resolve_provider(value: Any, provider_ids: Dict[str, str]) -> str:
+    """Get the provider ID for a provider ID or name (case-insensitive).
+
+    Raises:
+        ValueError: If no provider has that ID or name
+    """
+    if isinstance(value, str):
+        provider_id = provider_ids.get(value) or provider_ids.get(value.strip().lower())
+        if provider_id:
+            return provider_id
+    raise ValueError(f"Unknown provider: {value}")
+
+
+def resolve_agent_providers(record: Dict[str, Any], provider_ids: Dict[str, str]):
+    """Replace provider names in an agent record with provider IDs.
+
+    The agent's own provider may be given as provider_id or as a provider name
+    in ``provider``; items of NESTED_PROVIDER_FIELDS are resolved from their
+    provider_id.
+    """
+    provider = record.pop("provider", None)
+    value = record.get("provider_id") or provider
+    if value is not None:
+        record["provider_id"] = resolve_provider(value, provider_ids)
+    for field in NESTED_PROVIDER_FIELDS:
+        for item in record.get(field) or []:
+            if isinstance(item, dict):
+                item.pop("provider", None)
+                if item.get("provider_id"):
+                    item["provider_id"] = resolve_provider(item["provider_id"], provider_ids)
+
+
+def format_error(error: Exception) -> str:
+    """Get a one-line description of a validation error."""
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in e['loc']) or 'record'}: {e['msg']}" for e in error.errors()
+        )
+    return str(error)
+
+
+def validate_rows(kind: str, rows: List[Row], provider_ids: Dict[str, str]
+                  ) -> List[Tuple[int, Optional[Any], Optional[str]]]:
+    """Validate records into models.
+
+    Args:
+        kind: "agent" or "provider"
+        rows: Rows as read by read_rows
+        provider_ids: Provider ID and lowercased name -> provider ID, to resolve agents' providers
+
+    Returns:
+        (row number, model or None, error message or None) per row
+    """
+    results = []
+    for number, record, error in rows:
+        model = None
+        if error is None:
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("Expected an object")
+                if kind == "agent":
+                    resolve_agent_providers(record, provider_ids)
+                model = MODELS[kind](**record)
+            except (ValidationError, ValueError, TypeError) as e:
+                error = format_error(e)
+        results.append((number, model, error))
+    return results
+
+
+def validate_chunk(kind: str, rows: List[Row], provider_ids: Dict[str, str]
+                   ) -> Tuple[bytes, List[Tuple[int, Optional[str]]]]:
+    """Validate rows in a worker process.
+
+    Returns:
+        JSON array of the valid records, and (row number, error message or None) per row
+    """
+    results = validate_rows(kind, rows, provider_ids)
+    exclude = AGENT_PROVIDER_EXCLUDE if kind == "agent" else None
+    records = b",".join(model.model_dump_json(exclude=exclude).encode() for _, model, _ in results if model)
+    return b"[" + records + b"]", [(number, error) for number, _, error in results]
+
+
+def _chunks(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    """Group rows into lists of up to size rows."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validated_parallel(kind: str, rows: Iterator[Row], provider_ids: Dict[str, str], workers: int
+                        ) -> Iterator[Tuple[int, Optional[Any], Optional[str]]]:
+    """Validate chunks of rows in worker processes, yielding results in input order.
+
+    Workers report errors and send the valid records back as JSON, which is
+    turned into models here in one pass per chunk (cheaper than receiving the
+    models themselves). At most two chunks per worker are in flight, so large
+    inputs are never held in memory at once.
+    """
+    # Spawned workers do not inherit the locks of other threads (e.g. Streamlit's)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        pending = []
+        for chunk in _chunks(rows, IMPORT_CHUNK_SIZE):
+            pending.append(executor.submit(validate_chunk, kind, chunk, provider_ids))
+            if len(pending) < workers * 2:
+                continue
+            yield from _chunk_results(kind, pending.pop(0).result())
+        for future in pending:
+            yield from _chunk_results(kind, future.result())
+
+
+def _chunk_results(kind: str, result: Tuple[bytes, List[Tuple[int, Optional[str]]]]
+                   ) -> Iterator[Tuple[int, Optional[Any], Optional[str]]]:
+    """Pair the models of a validated chunk with its row results."""
+    records, row_errors = result
+    models = iter(LISTS[kind].validate_json(records))
+    for number, error in row_errors:
+        yield number, None if error else next(models), error
+
+
+def import_rows(db: JSONDatabase, rows: Iterable[Row], kind: str = "agent", workers: Optional[int] = None
+                ) -> Dict[str, Any]:
+    """Validate records and add the valid ones to the database in one batched write.
+
+    Agents may reference their providers by ID or by name (see
+    resolve_agent_providers). Invalid rows are reported and skipped; records
+    whose ID exists already replace the stored version.
+
+    Args:
+        db: Database to import into
+        rows: Rows as read by read_rows
+        kind: "agent" or "provider"
+        workers: Processes validating the records (all CPUs by default; 1
+            validates in-process, as do imports of fewer than
+            PARALLEL_IMPORT_MIN_ROWS rows)
+
+    Returns:
+        Counts of imported and failed rows, errors as (row number, message)
+        pairs, elapsed seconds and records per second
+    """
+    if kind not in IMPORT_KINDS:
+        raise ValueError(f"Unknown import kind: {kind}")
+    start = time.perf_counter()
+    db.wait_until_loaded()
+    provider_ids = provider_lookup(db.get_all_providers())
+
+    # Only parallelize inputs large enough to pay for the worker processes
+    rows = iter(rows)
+    head = [row for _, row in zip(range(PARALLEL_IMPORT_MIN_ROWS), rows)]
+    workers = max(1, workers or os.cpu_count() or 1) if len(head) == PARALLEL_IMPORT_MIN_ROWS else 1
+    if workers > 1:
+        results = _validated_parallel(kind, chain(head, rows), provider_ids, workers)
+    else:
+        results = (result for chunk in _chunks(chain(head, rows), IMPORT_CHUNK_SIZE)
+                   for result in validate_rows(kind, chunk, provider_ids))
+
+    imported = 0
+    errors = []
+    # Building many models at once triggers garbage collections that find nothing to free
+    with paused_gc(), db.batch():
+        for chunk in _chunks(results, IMPORT_CHUNK_SIZE):
+            models = []
+            for number, model, error in chunk:
+                if error:
+                    errors.append((number, error))
+                else:
+                    models.append(model)
+            if kind == "agent":
+                db.add_agents(models)
+            else:
+                for provider in models:
+                    db.add_provider(provider)
+            imported += len(models)
+
+    seconds = time.perf_counter() - start
+    return {
+        "imported": imported,
+        "failed": len(errors),
+        "errors": errors,
+        "seconds": seconds,
+        "records_per_second": (imported + len(errors)) / seconds if seconds else 0.0,
+        "workers": workers,
+    }
+
+
+def import_file(db: JSONDatabase, source: Union[str, IO[str]], kind: str = "agent", fmt: Optional[str] = None,
+                workers: Optional[int] = None) -> Dict[str, Any]:
+    """Import a JSONL or CSV file (see read_rows and import_rows)."""
+    return import_rows(db, read_rows(source, fmt), kind, workers)
+
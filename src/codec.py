@@ -0,0 +1,59 @@
+import json
+from typing import Any, Dict, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class JSONCodec:
+    """Encodes and decodes the database files with the standard library json module.
+
+    Output is compact unless pretty=True is requested. Values that are not JSON
+    types (datetimes, URLs) are written as strings.
+    """
+
+    name = "json"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON bytes or text."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        """Encode an object as UTF-8 JSON bytes."""
+        if pretty:
+            return json.dumps(obj, default=str, indent=2).encode()
+        return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+
+class OrjsonCodec(JSONCodec):
+    """JSONCodec backed by orjson."""
+
+    name = "orjson"
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """Decode JSON bytes or text."""
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        """Encode an object as UTF-8 JSON bytes."""
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+
+CODECS: Dict[str, type] = {"json": JSONCodec}
+if orjson is not None:
+    CODECS["orjson"] = OrjsonCodec
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """Get a codec by name, or the fastest installed one if name is None.
+
+    Raises:
+        ValueError: If the named codec is unknown or its package is not installed
+    """
+    if name is None:
+        name = "orjson" if "orjson" in CODECS else "json"
+    if name not in CODECS:
+        raise ValueError(f"JSON codec not available: {name}")
+    return CODECS[name]()
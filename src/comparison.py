@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from schema import AgentMetadata, LLMSupport, Provider
+
+
+# Column groups of a comparison frame, one table each on the Compare Agents page
+COMPARISON_GROUPS = ("basic", "features", "resources", "llms")
+
+# Cell of an LLM column for agents that do not support that LLM
+UNSUPPORTED = "✗"
+
+
+def provider_label(provider_id: Optional[str], providers: Dict[str, Provider]) -> str:
+    """Name of a provider, or "Unknown"."""
+    provider = providers.get(provider_id) if provider_id else None
+    return provider.name if provider else "Unknown"
+
+
+def llm_label(llm: LLMSupport, providers: Dict[str, Provider]) -> str:
+    """Column label of a supported LLM: model name and provider name."""
+    provider_name = llm.provider.name if llm.provider else provider_label(llm.provider_id, providers)
+    return f"{llm.model_name} ({provider_name})"
+
+
+def _yes_no(value: Any) -> str:
+    return "Yes" if value else "No"
+
+
+def agent_row(agent: AgentMetadata, providers: Dict[str, Provider]) -> Dict[Tuple[str, str], str]:
+    """Encode the basic, feature and resource columns of an agent as display strings."""
+    provider = providers.get(agent.provider_id)
+    features = agent.features
+    reqs = agent.resource_requirements
+    return {
+        ("basic", "Version"): agent.version,
+        ("basic", "Provider"): f"{provider.name} ({provider.provider_type.value})" if provider else "Unknown (Unknown)",
+        ("basic", "Domains"): ", ".join([d.value for d in agent.domains]),
+        ("basic", "Tags"): ", ".join(agent.tags) if agent.tags else "N/A",
+        ("features", "Planning"): features.planning.value,
+        ("features", "Tool Use"): features.tool_use.value,
+        ("features", "Memory Types"): ", ".join([m.value for m in features.memory]),
+        ("features", "Multi-agent"): _yes_no(features.multi_agent_collaboration),
+        ("features", "Human-in-loop"): _yes_no(features.human_in_the_loop),
+        ("features", "Autonomous"): _yes_no(features.autonomous),
+        ("features", "Fine-tuning"): _yes_no(features.fine_tuning_support),
+        ("features", "Streaming"): _yes_no(features.streaming_support),
+        ("features", "Vision"): _yes_no(features.supports_vision),
+        ("features", "Audio"): _yes_no(features.supports_audio),
+        ("features", "Reasoning"): ", ".join(features.reasoning_frameworks) if features.reasoning_frameworks else "N/A",
+        ("resources", "Min CPU"): reqs.min_cpu or "N/A",
+        ("resources", "Recommended CPU"): reqs.recommended_cpu or "N/A",
+        ("resources", "Min RAM"): reqs.min_ram or "N/A",
+        ("resources", "Recommended RAM"): reqs.recommended_ram or "N/A",
+        ("resources", "GPU Required"): _yes_no(reqs.gpu_required),
+        ("resources", "Recommended GPU"): reqs.recommended_gpu or "N/A",
+        ("resources", "Est. Cost/Hour"): f"${reqs.estimated_cost_per_hour:.2f}" if reqs.estimated_cost_per_hour else "N/A",
+    }
+
+
+def llm_cell(llm: LLMSupport) -> str:
+    """LLM column cell of a supporting agent: its rating (★n, or ✓ without one) and minimum version."""
+    rating_str = f"★{llm.performance_rating}" if llm.performance_rating else "✓"
+    version_str = f" (v{llm.min_version})" if llm.min_version else ""
+    return f"{rating_str}{version_str}"
+
+
+def comparison_frame(agents: List[AgentMetadata], providers: Dict[str, Provider]) -> pd.DataFrame:
+    """Encode agents into one frame for side-by-side comparison.
+
+    Every agent is visited once: its basic, feature and resource values become a
+    row, and its supported LLMs (row, label, cell) entries. All cells are then
+    placed in one object matrix, with the LLM entries scattered into one column
+    per LLM of any agent by fancy indexing (UNSUPPORTED elsewhere).
+
+    Args:
+        agents: Agents to compare, with detail fields loaded
+        providers: Providers by ID
+
+    Returns:
+        Frame with one row per agent (indexed by "Agent" name) and (group, column)
+        columns, groups being COMPARISON_GROUPS
+    """
+    rows = []
+    llm_rows, llm_labels, llm_cells = [], [], []
+    for position, agent in enumerate(agents):
+        rows.append(agent_row(agent, providers))
+        for llm in agent.supported_llms:
+            llm_rows.append(position)
+            llm_labels.append(llm_label(llm, providers))
+            llm_cells.append(llm_cell(llm))
+    if not rows:
+        return pd.DataFrame(index=pd.Index([], name="Agent"), columns=pd.MultiIndex.from_arrays([[], []]))
+
+    labels, label_columns = np.unique(np.array(llm_labels, dtype=object), return_inverse=True)
+    llms = np.full((len(rows), len(labels)), UNSUPPORTED, dtype=object)
+    # A label listed twice for an agent keeps its last entry
+    llms[np.array(llm_rows, dtype=np.intp), label_columns] = llm_cells
+
+    values = np.hstack([np.array([list(row.values()) for row in rows], dtype=object), llms])
+    columns = pd.MultiIndex.from_tuples(list(rows[0]) + [("llms", label) for label in labels])
+    return pd.DataFrame(values, index=pd.Index([agent.name for agent in agents], name="Agent"),
+                        columns=columns, dtype=object)
+
+
+def differing_columns(frame: pd.DataFrame) -> np.ndarray:
+    """Boolean mask of the columns whose value is not the same for all agents."""
+    values = frame.to_numpy()
+    return (values != values[:1]).any(axis=0)
+
+
+def comparison_tables(frame: pd.DataFrame, only_differences: bool = False) -> Dict[str, Optional[pd.DataFrame]]:
+    """Split a comparison frame into the tables of the Compare Agents page.
+
+    Args:
+        frame: Frame built by comparison_frame
+        only_differences: Keep only the columns whose values differ across agents
+
+    Returns:
+        Dict of COMPARISON_GROUPS tables, each with an "Agent" column and one row
+        per agent, or None for a group without (differing) columns
+    """
+    values = frame.to_numpy()
+    groups = frame.columns.get_level_values(0)
+    names = frame.columns.get_level_values(1)
+    differs = differing_columns(frame) if only_differences else None
+    tables: Dict[str, Optional[pd.DataFrame]] = {}
+    for group in COMPARISON_GROUPS:
+        mask = groups == group
+        if differs is not None:
+            mask &= differs
+        positions = np.flatnonzero(mask)
+        if not len(positions):
+            tables[group] = None
+            continue
+        table = pd.DataFrame(values[:, positions], columns=names[positions], dtype=object)
+        table.insert(0, "Agent", frame.index)
+        tables[group] = table
+    return tables
@@ -1,49 +1,892 @@
-import json
+import atexit
+import gc
+import heapq
+import multiprocessing
 import os
-from typing import List, Optional, Dict, Any
-from schema import AgentMetadata, Provider
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice, repeat
+from typing import FrozenSet, Iterable, List, Optional, Dict, Any, Set, Tuple, Union
+from pydantic import TypeAdapter
+from schema import AgentMetadata, CodeSnippet, Provider, ResourceRequirement
+from codec import JSONCodec, get_codec
+from snapshot import AGENT_SNAPSHOT, PROVIDER_SNAPSHOT, encode_snapshot, is_trusted
+from json_stream import iter_json
+from search_index import SearchIndex, document_terms, record_field_texts
+from facets import FacetIndex, FLAG_FACETS
+from similarity import SimilarityIndex
+from semantic_index import SemanticIndex
+from fuzzy_index import FuzzyIndex
+from sort_index import SortIndex
+from interning import InternPool
+
+
+# Sort orders supported by query_agents
+SORT_OPTIONS = ("name", "provider", "updated_at", "relevance")
+
+# Semantic searches return at most this many of the closest agents, with at least this similarity
+SEMANTIC_SEARCH_LIMIT = 200
+SEMANTIC_MIN_SCORE = 0.3
+
+# Facets whose catalog-wide agent counts are returned by get_catalog_counts
+CATALOG_COUNT_FACETS = ("provider", "domain", "planning", "tool_use")
+
+# Agent fields holding lists of items that reference a provider through provider_id
+NESTED_PROVIDER_FIELDS = ["supported_llms", "vector_stores", "memory_stores"]
+
+# Agent fields only shown by detail views; they are kept unparsed at load time
+# and parsed the first time the agent is requested with get_agent
+DETAIL_FIELDS = ("code_snippets", "example_prompts", "resource_requirements")
+
+# Linked provider objects are rebuilt from provider_id at load time, so they are never persisted
+AGENT_PROVIDER_EXCLUDE = {
+    "provider": True,
+    "supported_llms": {"__all__": {"provider"}},
+    "vector_stores": {"__all__": {"provider"}},
+    "memory_stores": {"__all__": {"provider"}},
+}
+
+
+# Agent fields written to the records of a snapshot; DETAIL_FIELDS are stored separately
+AGENT_SUMMARY_EXCLUDE = {**AGENT_PROVIDER_EXCLUDE, **dict.fromkeys(DETAIL_FIELDS, True)}
+
+# Validate a whole providers file or a chunk of agents from raw bytes in one pass
+PROVIDER_LIST = TypeAdapter(List[Provider])
+AGENT_LIST = TypeAdapter(List[AgentMetadata])
+
+# Smaller agents files are loaded in-process; starting worker processes and
+# sending the records back and forth would cost more than it saves
+PARALLEL_LOAD_MIN_BYTES = 50_000_000
+
+# Chunks per worker process, so the first results arrive early and no worker idles at the end
+PARALLEL_LOAD_CHUNKS_PER_WORKER = 4
+
+# With background_load, smaller agents files are still loaded before the constructor returns
+BACKGROUND_LOAD_MIN_BYTES = 10_000_000
+
+# Agents added to the catalog and its indexes at a time by a background load
+BACKGROUND_LOAD_BATCH_SIZE = 500
+
+
+def provider_to_dict(provider: Provider) -> Dict[str, Any]:
+    """Convert a provider to its persisted form (JSON types only)."""
+    return provider.model_dump(mode="json")
+
+
+def agent_to_dict(agent: AgentMetadata) -> Dict[str, Any]:
+    """Convert an agent to its persisted form (JSON types only), referencing providers by ID only."""
+    return agent.model_dump(mode="json", exclude=AGENT_PROVIDER_EXCLUDE)
+
+
+def agent_from_dict(data: Dict[str, Any]) -> AgentMetadata:
+    """Create an agent from its persisted form.
+    
+    Files written by older versions embed full provider objects; these copies are
+    dropped because the authoritative provider is linked from provider_id.
+    """
+    drop_provider_copies(data)
+    return AgentMetadata(**data)
+
+
+def drop_provider_copies(data: Dict[str, Any]):
+    """Remove provider objects embedded by older versions from a persisted agent."""
+    data.pop("provider", None)
+    for key in NESTED_PROVIDER_FIELDS:
+        for item in data.get(key) or []:
+            item.pop("provider", None)
+
+
+def split_agent_details(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Remove the DETAIL_FIELDS from a persisted agent and return them."""
+    return {field: data.pop(field) for field in DETAIL_FIELDS if field in data}
+
+
+@contextmanager
+def paused_gc():
+    """Pause the cyclic garbage collector.
+    
+    A load only allocates objects that stay alive; with the collector running it
+    would repeatedly rescan the growing catalog.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def prepare_agent_chunk(chunk: bytes, codec_name: str
+                        ) -> Tuple[bytes, List[Optional[bytes]], List[Optional[Dict[str, float]]]]:
+    """Prepare a chunk of persisted agents for loading; run by the worker processes of a parallel load.
+    
+    Args:
+        chunk: JSON array of [record, detail fields as JSON text or null] pairs
+        codec_name: Name of the database's codec
+    
+    Returns:
+        Tuple of (JSON array of the records without provider copies and detail fields,
+        detail fields of each record as compact JSON or None,
+        search terms of each record or None if the record is malformed)
+    """
+    codec = get_codec(codec_name)
+    records, details, terms = [], [], []
+    for record, detail in codec.loads(chunk):
+        if detail:
+            record.update(codec.loads(detail))
+        drop_provider_copies(record)
+        agent_details = split_agent_details(record)
+        try:
+            terms.append(document_terms(record_field_texts({**record, **agent_details})))
+        except (AttributeError, KeyError, TypeError):
+            # Left to the search index; the record fails validation in the loading process anyway
+            terms.append(None)
+        records.append(record)
+        details.append(codec.dumps(agent_details) if agent_details else None)
+    return codec.dumps(records), details, terms
 
 
 class JSONDatabase:
-    """A simple JSON-based database for storing Agent Hub data."""
+    """A simple JSON-based database for storing Agent Hub data.
+    
+    By default every mutation rewrites the snapshot files. With ``journal=True``
+    each mutation is instead appended as one line to ``journal.jsonl`` and the
+    journal is folded back into the snapshots once it reaches
+    ``compact_threshold`` entries (or when ``compact()`` is called).
+    
+    Compaction at the threshold runs on a background thread: the writer that
+    reaches it only renames the journal (new entries go to a fresh one) and
+    copies the record lists, and the snapshots are encoded and written without
+    holding the lock, so other writers are not held up by the rewrite. Until
+    it is done, loading replays the renamed journal before the current one.
+    
+    Files are read and written with ``codec`` (a codec.JSONCodec or its name;
+    the fastest installed one by default). Snapshots are compact unless
+    ``pretty=True``; see also export_json.
+    
+    Compact snapshots carry the schema version and a checksum (see snapshot.py).
+    Files passing that check were written by this code, so they are validated
+    in one pass from their raw bytes; other files (older formats, pretty
+    exports, edited or damaged files) are decoded and checked record by record.
+    
+    Other agents files of at least PARALLEL_LOAD_MIN_BYTES are split into chunks
+    that ``load_workers`` processes (all CPUs by default; 1 always loads
+    in-process) normalize and tokenize for the search index; each chunk is then
+    validated here in one pass, in file order.
+    
+    With ``background_load=True`` the constructor only loads the providers of a
+    large catalog and streams the agents in on a background thread: queries
+    see the agents loaded so far (see is_loading and get_metrics), while
+    changes wait until the load is complete.
+    
+    Mutations inside ``with db.batch():`` are persisted together when the
+    outermost batch exits: one snapshot rewrite, or one journal append with a
+    single fsync. With ``flush_interval`` (seconds) every mutation is held back
+    the same way and written by a timer that flushes all changes made since the
+    previous flush; changes not flushed yet are lost if the process dies.
     
-    def __init__(self, data_dir: str = "../data"):
+    With ``compact_records`` (the default) every agent entering the catalog
+    shares its repeated strings and its models' sets of explicitly set fields
+    with the other agents (see interning.InternPool).
+    """
+    
+    def __init__(self, data_dir: str = "../data", journal: bool = False, compact_threshold: int = 1000,
+                 codec: Optional[Union[str, JSONCodec]] = None, pretty: bool = False,
+                 load_workers: Optional[int] = None, background_load: bool = False,
+                 flush_interval: Optional[float] = None, compact_records: bool = True):
         self.data_dir = data_dir
+        self.codec = codec if isinstance(codec, JSONCodec) else get_codec(codec)
+        self.pretty = pretty
+        self.load_workers = load_workers
         self.providers_file = os.path.join(data_dir, "providers.json")
         self.agents_file = os.path.join(data_dir, "agents.json")
+        self.journal_file = os.path.join(data_dir, "journal.jsonl")
+        # The journal being folded into the snapshots by a background compaction
+        self.compacting_journal_file = os.path.join(data_dir, "journal.compacting.jsonl")
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+        self._journal_entries = 0
+        self._compaction: Optional[threading.Thread] = None
+        # Incremented by every synchronous compaction, which supersedes a background one in progress
+        self._compactions = 0
+        self.flush_interval = flush_interval
+        # Incremented on every change to the loaded records, so derived data can be cached per generation
+        self.generation = 0
+        # Shares the values repeated across agents (see interning.py)
+        self.intern_pool = InternPool()
+        self.compact_records = compact_records
+        
+        # (kind, record_id) -> latest record (None if deleted) not persisted yet
+        self._pending: Dict[Tuple[str, str], Optional[Any]] = {}
+        self._batch_depth = 0
+        self._flush_timer: Optional[threading.Timer] = None
         
         # Initialize data storage
         self.providers: Dict[str, Provider] = {}
         self.agents: Dict[str, AgentMetadata] = {}
+        # agent_id -> persisted DETAIL_FIELDS not parsed into the agent yet, as compact JSON
+        self._agent_details: Dict[str, bytes] = {}
+        # agent_id -> search terms computed by a parallel load, used by the next index rebuild
+        self._loaded_terms: Dict[str, Dict[str, float]] = {}
+        
+        # Reverse index: provider_id -> {agent_id -> agent fields referencing the provider}
+        # ("provider" for the agent's own provider, or a NESTED_PROVIDER_FIELDS name)
+        self._provider_refs: Dict[str, Dict[str, FrozenSet[str]]] = {}
+        self._agent_provider_ids: Dict[str, Tuple[str, ...]] = {}
+        # provider_type -> IDs of the providers of that type, in insertion order
+        self._providers_by_type: Dict[str, Dict[str, None]] = {}
+        self._provider_types: Dict[str, str] = {}
+        self.search_index = SearchIndex()
+        self.facet_index = FacetIndex()
+        self.sort_indexes = self._new_sort_indexes()
+        # Built by the first get_similar_agents call, then kept up to date
+        self.similarity_index: Optional[SimilarityIndex] = None
+        # Opened (and brought up to date with the catalog) by the first semantic search
+        self.semantic_index: Optional[SemanticIndex] = None
+        # Built by the first fuzzy search, then kept up to date
+        self.fuzzy_index: Optional[FuzzyIndex] = None
+        
+        # Guards reloads and writes when the instance is shared across sessions
+        self._lock = threading.RLock()
+        self._loaded = threading.Event()
+        self._load_error: Optional[BaseException] = None
+        self._file_signature: Tuple = ()
+        self.metrics: Dict[str, Any] = {
+            "load_count": 0,
+            "last_load_seconds": 0.0,
+            "last_loaded_at": None,
+            "reload_checks": 0,
+            "last_load_trusted": False,
+            "last_load_workers": 1,
+            "load_progress": 0.0,
+            "changes": 0,
+            "flushes": 0,
+        }
         
         # Ensure data directory exists
         os.makedirs(data_dir, exist_ok=True)
         
+        # Write changes still held back by the flush timer when the process exits
+        if flush_interval:
+            atexit.register(self.flush)
+        
         # Load existing data if available
-        self._load_data()
+        if background_load and os.path.exists(self.agents_file) \
+                and os.path.getsize(self.agents_file) >= BACKGROUND_LOAD_MIN_BYTES:
+            self._start_background_load()
+        else:
+            self._timed_load()
+    
+    def _data_files(self) -> List[str]:
+        """Files whose on-disk state determines the loaded data."""
+        return [self.providers_file, self.agents_file, self.compacting_journal_file, self.journal_file]
+    
+    def _get_file_signature(self) -> Tuple:
+        """Return (path, mtime, size) for each data file, used to detect external changes."""
+        signature = []
+        for path in self._data_files():
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((path, None, None))
+        return tuple(signature)
+    
+    def _reset(self):
+        """Clear the loaded records before a load."""
+        self.providers = {}
+        self.agents = {}
+        self._agent_details = {}
+        self._loaded_terms = {}
+    
+    def _timed_load(self):
+        """Load data from disk and record how long it took."""
+        with self._lock:
+            start = time.perf_counter()
+            self._reset()
+            with paused_gc():
+                self._load_data()
+                self._replay_journal()
+                self._rebuild_indexes()
+            self._file_signature = self._get_file_signature()
+            self._finish_load(start)
+    
+    def _finish_load(self, start: float):
+        """Record a completed load that began at perf_counter() time start."""
+        self.generation += 1
+        self.metrics["load_count"] += 1
+        self.metrics["last_load_seconds"] = time.perf_counter() - start
+        self.metrics["last_loaded_at"] = time.time()
+        self.metrics["load_progress"] = 1.0
+        self._loaded.set()
+    
+    def _start_background_load(self):
+        """Load the providers, then stream the agents in on a background thread."""
+        with self._lock:
+            start = time.perf_counter()
+            self._reset()
+            self._rebuild_indexes()
+            self._loaded.clear()
+            self.metrics["load_progress"] = 0.0
+            # Taken before reading, so changes made during the load trigger a reload later
+            self._file_signature = self._get_file_signature()
+            self._load_providers()
+            for provider_id in self.providers:
+                self._index_provider(provider_id)
+        threading.Thread(target=self._background_load, args=(start,), name="agent-hub-load", daemon=True).start()
+    
+    def _background_load(self, start: float):
+        """Stream the agents file into the catalog in batches, then apply the journal."""
+        try:
+            batch = []
+            details = {}
+            progress = 0.0
+            with paused_gc():
+                # Parsed a chunk at a time, so the first agents show up before the file is read
+                with open(self.agents_file, encoding="utf-8") as f:
+                    # Offsets count characters; the byte size is close enough for progress
+                    size = os.fstat(f.fileno()).st_size or 1
+                    for key, value, offset in iter_json(f, "records"):
+                        if key is None:
+                            batch.append(value)
+                            progress = min(offset / size, 1.0)
+                            if len(batch) >= BACKGROUND_LOAD_BATCH_SIZE:
+                                self._add_loaded_batch(batch, progress)
+                                batch = []
+                        elif key == "details":
+                            details = value
+                self._add_loaded_batch(batch, progress)
+                
+                # Detail fields of a snapshot follow its records; index their text now
+                items = list(details.items())
+                for i in range(0, len(items), BACKGROUND_LOAD_BATCH_SIZE):
+                    with self._lock:
+                        for agent_id, agent_details in items[i:i + BACKGROUND_LOAD_BATCH_SIZE]:
+                            agent = self.agents.get(agent_id)
+                            if agent is not None:
+                                self._agent_details[agent_id] = agent_details.encode()
+                                self.search_index.add(agent, self.codec.loads(agent_details))
+                        self.metrics["load_progress"] = progress + (1 - progress) * (i + 1) / len(items)
+                
+                with self._lock:
+                    agent_ids, provider_ids = self._replay_journal()
+                    for agent_id in agent_ids:
+                        self._unindex_agent(agent_id, keep_slot=agent_id in self.agents)
+                        if agent_id in self.agents:
+                            self._index_agent(self.agents[agent_id])
+                    for provider_id in provider_ids:
+                        self._index_provider(provider_id)
+                        self._update_provider_sort_keys(provider_id)
+                    self.metrics["last_load_trusted"] = False
+                    self.metrics["last_load_workers"] = 1
+                    self._finish_load(start)
+        except Exception as e:
+            # Raised by wait_until_loaded, so nothing is saved over the files
+            self._load_error = e
+            self._loaded.set()
+    
+    def _add_loaded_batch(self, records: List[Dict[str, Any]], progress: float):
+        """Validate streamed agent records and add them to the catalog and its indexes."""
+        loaded = {}
+        for record in records:
+            details = split_agent_details(record)
+            agent = agent_from_dict(record)
+            loaded[agent.id] = (agent, details)
+        
+        with self._lock:
+            for agent, details in loaded.values():
+                if agent.id in self.agents:
+                    self._unindex_agent(agent.id, keep_slot=True)
+                self._link_provider_references(agent)
+                self.agents[agent.id] = agent
+                self._set_agent_details(agent.id, details)
+            self._index_agents([agent for agent, _ in loaded.values()])
+            self.generation += 1
+            self.metrics["load_progress"] = progress
+    
+    def is_loading(self) -> bool:
+        """Check whether a background load is still adding agents."""
+        return not self._loaded.is_set()
+    
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background load to complete.
+        
+        Returns:
+            False if the timeout expired first
+        
+        Raises:
+            RuntimeError: If the background load failed
+        """
+        if not self._loaded.wait(timeout):
+            return False
+        if self._load_error is not None:
+            raise RuntimeError("Loading the catalog failed") from self._load_error
+        return True
+    
+    def reload_if_changed(self) -> bool:
+        """Reload data if the files on disk changed since the last load or save.
+        
+        Returns:
+            True if the data was reloaded
+        """
+        with self._lock:
+            self.metrics["reload_checks"] += 1
+            # Changes not written yet would be lost by a reload
+            self.flush()
+            if self.is_loading() or self._get_file_signature() == self._file_signature:
+                return False
+            self._timed_load()
+            return True
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get load/cache metrics together with current catalog sizes."""
+        metrics = dict(self.metrics)
+        metrics["providers"] = len(self.providers)
+        metrics["agents"] = len(self.agents)
+        metrics["agents_with_unloaded_details"] = len(self._agent_details)
+        metrics["pending_changes"] = len(self._pending)
+        metrics["interned_values"] = len(self.intern_pool)
+        return metrics
     
     def _load_data(self):
         """Load data from JSON files if they exist."""
-        # Load providers
-        if os.path.exists(self.providers_file):
-            with open(self.providers_file, 'r') as f:
-                providers_data = json.load(f)
-                for provider_dict in providers_data:
-                    provider = Provider(**provider_dict)
-                    self.providers[provider.id] = provider
+        trusted = [self._load_providers()] if os.path.exists(self.providers_file) else []
+        workers = 1
         
         # Load agents
         if os.path.exists(self.agents_file):
-            with open(self.agents_file, 'r') as f:
-                agents_data = json.load(f)
-                for agent_dict in agents_data:
-                    agent = AgentMetadata(**agent_dict)
-                    # Link provider references
+            with open(self.agents_file, 'rb') as f:
+                raw = f.read()
+            trusted.append(is_trusted(raw))
+            # The single validation pass of a trusted snapshot beats splitting it up for workers
+            workers = 1 if trusted[-1] else self._parallel_load_workers(len(raw))
+            if trusted[-1]:
+                snapshot = AGENT_SNAPSHOT.validate_json(raw)
+                del raw
+                for agent in snapshot.records:
+                    self._link_provider_references(agent)
+                    self.agents[agent.id] = agent
+                    details = snapshot.details.pop(agent.id, None)
+                    if details:
+                        self._agent_details[agent.id] = details.encode()
+            else:
+                data = self.codec.loads(raw)
+                del raw
+                details = {}
+                if isinstance(data, dict):
+                    details = data.get("details", {})
+                    data = data["records"]
+                if workers > 1:
+                    self._load_agents_parallel(data, details, workers)
+                else:
+                    # A snapshot that failed the check: rejoin the details and validate everything
+                    for agent_dict in data:
+                        agent_dict.update(self.codec.loads(details.get(agent_dict.get("id")) or "{}"))
+                        self._load_agent(agent_dict)
+        
+        self.metrics["last_load_trusted"] = bool(trusted) and all(trusted)
+        self.metrics["last_load_workers"] = workers
+    
+    def _load_providers(self) -> bool:
+        """Load the providers file if it exists.
+        
+        Returns:
+            Whether the file was a trusted snapshot
+        """
+        if not os.path.exists(self.providers_file):
+            return False
+        with open(self.providers_file, 'rb') as f:
+            raw = f.read()
+        trusted = is_trusted(raw)
+        if trusted:
+            providers = PROVIDER_SNAPSHOT.validate_json(raw).records
+        else:
+            data = self.codec.loads(raw)
+            providers = [Provider(**record) for record in (data["records"] if isinstance(data, dict) else data)]
+        for provider in providers:
+            self.providers[provider.id] = provider
+        return trusted
+    
+    def _parallel_load_workers(self, size: int) -> int:
+        """Get the number of processes to load an agents file of size bytes with (1: in-process)."""
+        if size < PARALLEL_LOAD_MIN_BYTES:
+            return 1
+        return max(1, self.load_workers or os.cpu_count() or 1)
+    
+    def _load_agents_parallel(self, records: List[Dict[str, Any]], details: Dict[str, str], workers: int):
+        """Load persisted agents in chunks prepared by worker processes.
+        
+        Building the models stays in this process: receiving finished models from a
+        worker costs more than validating the prepared chunk here. Chunks are added
+        in file order and providers are linked here, so agents share this process's
+        provider objects.
+        """
+        size = max(1, -(-len(records) // (workers * PARALLEL_LOAD_CHUNKS_PER_WORKER)))
+        chunks = [
+            self.codec.dumps([[record, details.get(record.get("id"))] for record in records[i:i + size]])
+            for i in range(0, len(records), size)
+        ]
+        
+        # Spawned workers do not inherit the locks of other threads (e.g. Streamlit's)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            for chunk, chunk_details, chunk_terms in executor.map(prepare_agent_chunk, chunks,
+                                                                  repeat(self.codec.name)):
+                for agent, agent_details, terms in zip(AGENT_LIST.validate_json(chunk), chunk_details, chunk_terms):
                     self._link_provider_references(agent)
                     self.agents[agent.id] = agent
+                    if agent_details:
+                        self._agent_details[agent.id] = agent_details
+                    if terms is not None:
+                        self._loaded_terms[agent.id] = terms
+    
+    def _load_agent(self, data: Dict[str, Any]) -> AgentMetadata:
+        """Add a persisted agent to the catalog, deferring its detail fields."""
+        details = split_agent_details(data)
+        agent = agent_from_dict(data)
+        self._loaded_terms.pop(agent.id, None)
+        # Link provider references
+        self._link_provider_references(agent)
+        self.agents[agent.id] = agent
+        self._set_agent_details(agent.id, details)
+        return agent
+    
+    def _set_agent_details(self, agent_id: str, details: Dict[str, Any]):
+        """Store the unparsed detail fields of an agent (none if empty)."""
+        if details:
+            self._agent_details[agent_id] = self.codec.dumps(details)
+        else:
+            self._agent_details.pop(agent_id, None)
+    
+    def _get_agent_details(self, agent_id: str) -> Dict[str, Any]:
+        """Get the unparsed detail fields of an agent (empty once loaded)."""
+        data = self._agent_details.get(agent_id)
+        return self.codec.loads(data) if data else {}
+    
+    def _load_details(self, agent: AgentMetadata) -> AgentMetadata:
+        """Parse the deferred detail fields of an agent into it."""
+        with self._lock:
+            details = self._get_agent_details(agent.id)
+            self._agent_details.pop(agent.id, None)
+            self._apply_details(agent, details)
+        return agent
+    
+    @staticmethod
+    def _apply_details(agent: AgentMetadata, details: Dict[str, Any]):
+        """Set persisted detail fields on an agent."""
+        if "code_snippets" in details:
+            agent.code_snippets = [CodeSnippet(**snippet) for snippet in details["code_snippets"]]
+        if "example_prompts" in details:
+            agent.example_prompts = list(details["example_prompts"])
+        if details.get("resource_requirements"):
+            agent.resource_requirements = ResourceRequirement(**details["resource_requirements"])
+    
+    def _agent_json(self, agent: AgentMetadata, stored_details: Optional[Dict[str, bytes]] = None) -> bytes:
+        """Get the persisted form of an agent as compact JSON, including unloaded detail fields.
+        
+        Args:
+            stored_details: Unloaded detail fields to use instead of the live ones (see _agents_json)
+        """
+        details = (self._agent_details if stored_details is None else stored_details).get(agent.id)
+        if not details:
+            return agent.model_dump_json(exclude=AGENT_PROVIDER_EXCLUDE).encode()
+        # The agent only holds defaults for its unloaded fields; splice in the stored object instead
+        data = agent.model_dump_json(exclude=AGENT_SUMMARY_EXCLUDE)
+        return data.encode()[:-1] + b"," + details[1:]
+    
+    def _agent_record(self, agent: AgentMetadata, stored_details: Optional[Dict[str, bytes]] = None) -> Dict[str, Any]:
+        """Get the persisted form of an agent, including unloaded detail fields."""
+        return self.codec.loads(self._agent_json(agent, stored_details))
+    
+    def get_agent_record(self, agent: AgentMetadata, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Get the persisted form of an agent as JSON values, without parsing its unloaded detail fields.
+        
+        Args:
+            agent: The agent
+            fields: Top-level fields to include (all if None)
+        """
+        include = set(fields) if fields is not None else None
+        stored = self._agent_details.get(agent.id)
+        record = agent.model_dump(mode="json", include=include,
+                                  exclude=AGENT_SUMMARY_EXCLUDE if stored else AGENT_PROVIDER_EXCLUDE)
+        if stored and (include is None or not include.isdisjoint(DETAIL_FIELDS)):
+            record.update(
+                (field, value) for field, value in self.codec.loads(stored).items()
+                if include is None or field in include
+            )
+        return record
+    
+    def _providers_json(self, pretty: bool = False, providers: Optional[List[Provider]] = None) -> bytes:
+        """Encode all providers (or the given ones) as a snapshot, or as an indented JSON array if pretty."""
+        if providers is None:
+            providers = list(self.providers.values())
+        if pretty:
+            return PROVIDER_LIST.dump_json(providers, indent=2)
+        return encode_snapshot(b'"records":' + PROVIDER_LIST.dump_json(providers) + b"}")
+    
+    def _agents_json(self, pretty: bool = False, agents: Optional[List[AgentMetadata]] = None,
+                     stored_details: Optional[Dict[str, bytes]] = None) -> bytes:
+        """Encode all agents (or the given ones) as a snapshot, or as an indented JSON array if pretty.
+        
+        Args:
+            agents: Agents to encode (all agents if None)
+            stored_details: Their unloaded detail fields, taken with them under the lock
+                when encoding outside it (the live ones if None)
+        """
+        if agents is None:
+            agents = list(self.agents.values())
+        if stored_details is None:
+            stored_details = self._agent_details
+        if pretty:
+            return self.codec.dumps([self._agent_record(agent, stored_details) for agent in agents], pretty=True)
+        
+        records = []
+        details = {}
+        for agent in agents:
+            records.append(agent.model_dump_json(exclude=AGENT_SUMMARY_EXCLUDE).encode())
+            stored = stored_details.get(agent.id)
+            details[agent.id] = stored.decode() if stored else agent.model_dump_json(include=set(DETAIL_FIELDS))
+        return encode_snapshot(
+            b'"records":[' + b",".join(records) + b'],"details":' + self.codec.dumps(details) + b"}"
+        )
+    
+    def _replay_journal(self) -> Tuple[Set[str], Set[str]]:
+        """Apply journal entries written since the last snapshot.
+        
+        Returns:
+            Tuple of (IDs of the changed agents, IDs of the changed providers)
+        """
+        self._journal_entries = 0
+        agent_ids: Set[str] = set()
+        provider_ids: Set[str] = set()
+        # A journal renamed by a background compaction holds the older entries
+        interrupted = os.path.exists(self.compacting_journal_file)
+        for path in (self.compacting_journal_file, self.journal_file):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb+') as f:
+                valid_end = 0
+                for line in f:
+                    try:
+                        entry = self.codec.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted append; the mutation never
+                        # completed, so drop it before further entries are appended after it
+                        f.truncate(valid_end)
+                        break
+                    valid_end += len(line)
+                    self._journal_entries += 1
+                    
+                    if entry["kind"] == "provider":
+                        provider_ids.add(entry["id"])
+                        if entry["op"] == "put":
+                            provider = Provider(**entry["data"])
+                            self.providers[provider.id] = provider
+                        else:
+                            self.providers.pop(entry["id"], None)
+                    else:
+                        agent_ids.add(entry["id"])
+                        if entry["op"] == "put":
+                            self._load_agent(entry["data"])
+                        else:
+                            self.agents.pop(entry["id"], None)
+                            self._agent_details.pop(entry["id"], None)
+        
+        if provider_ids:
+            deleted = provider_ids.difference(self.providers)
+            for agent in self.agents.values():
+                self._link_provider_references(agent)
+                # Linking skips unknown IDs; drop the objects of providers deleted in the journal
+                if deleted:
+                    self._unlink_providers(agent, deleted)
+        
+        # Fold a leftover journal into the snapshots when journaling is off, and
+        # finish a compaction that did not complete (before the journal is renamed again)
+        if (not self.journal or interrupted) and self._journal_entries:
+            self._compact()
+        return agent_ids, provider_ids
+    
+    def _rebuild_indexes(self):
+        """Rebuild all in-memory indexes from the loaded records."""
+        self._provider_refs = {}
+        self._agent_provider_ids = {}
+        self._providers_by_type = {}
+        self._provider_types = {}
+        for provider_id in self.providers:
+            self._index_provider(provider_id)
+        self.search_index = SearchIndex()
+        self.facet_index = FacetIndex()
+        self.sort_indexes = self._new_sort_indexes()
+        self.similarity_index = None
+        if self.semantic_index is not None:
+            self.semantic_index.save()
+            self.semantic_index = None
+        self.fuzzy_index = None
+        self._index_agents(list(self.agents.values()))
+    
+    def _index_agents(self, agents: List[AgentMetadata]):
+        """Add agents not indexed yet to the in-memory indexes (a bulk variant of _index_agent)."""
+        for agent in agents:
+            self._index_provider_refs(agent)
+            terms = self._loaded_terms.pop(agent.id, None)
+            if terms is None:
+                self.search_index.add(agent, self._get_agent_details(agent.id))
+            else:
+                self.search_index.add_terms(agent.id, terms)
+        self.facet_index.add_all(agents)
+        if self.similarity_index is not None:
+            self.similarity_index.add_all(agents)
+        if self.semantic_index is not None:
+            self.semantic_index.add_all(agents)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.add_all(agents)
+        keys = [(agent.id, self._sort_keys(agent)) for agent in agents]
+        for sort, sort_index in self.sort_indexes.items():
+            sort_index.set_many((agent_id, agent_keys[sort]) for agent_id, agent_keys in keys)
+    
+    def _index_agent(self, agent: AgentMetadata):
+        """Add an agent to the in-memory indexes."""
+        self._index_provider_refs(agent)
+        self.search_index.add(agent, self._get_agent_details(agent.id))
+        self.facet_index.add(agent)
+        if self.similarity_index is not None:
+            self.similarity_index.add(agent)
+        if self.semantic_index is not None:
+            self.semantic_index.add(agent)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.add(agent)
+        for sort, key in self._sort_keys(agent).items():
+            self.sort_indexes[sort].set(agent.id, key)
+    
+    def _index_provider_refs(self, agent: AgentMetadata):
+        """Add an agent to the provider reverse index."""
+        refs: Dict[str, Set[str]] = {}
+        if agent.provider_id:
+            refs.setdefault(agent.provider_id, set()).add("provider")
+        for field in NESTED_PROVIDER_FIELDS:
+            for item in getattr(agent, field):
+                if item.provider_id:
+                    refs.setdefault(item.provider_id, set()).add(field)
+        
+        # Agents share their (few distinct) sets of referencing fields
+        for provider_id, fields in refs.items():
+            self._provider_refs.setdefault(provider_id, {})[agent.id] = self.intern_pool.intern(frozenset(fields))
+        self._agent_provider_ids[agent.id] = tuple(refs)
+    
+    def _unindex_agent(self, agent_id: str, keep_slot: bool = False):
+        """Remove an agent from the in-memory indexes.
+        
+        Works from what was indexed rather than the agent object, which may
+        already have been modified in place.
+        
+        Args:
+            agent_id: Agent to remove
+            keep_slot: The agent is indexed again right after (an update), so it keeps
+                its facet slot, and with it its place in catalog order and sort ties
+        """
+        for provider_id in self._agent_provider_ids.pop(agent_id, ()):
+            agent_refs = self._provider_refs.get(provider_id)
+            if agent_refs is not None:
+                agent_refs.pop(agent_id, None)
+                if not agent_refs:
+                    del self._provider_refs[provider_id]
+        
+        self.search_index.remove(agent_id)
+        if not keep_slot:
+            self.facet_index.remove(agent_id)
+        if self.similarity_index is not None:
+            self.similarity_index.remove(agent_id)
+        if self.semantic_index is not None:
+            self.semantic_index.remove(agent_id)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.remove(agent_id)
+        for sort_index in self.sort_indexes.values():
+            sort_index.remove(agent_id)
+    
+    @staticmethod
+    def _new_sort_indexes() -> Dict[str, SortIndex]:
+        """Create empty sort indexes for the sort options backed by a stored key."""
+        return {sort: SortIndex() for sort in SORT_OPTIONS if sort != "relevance"}
+    
+    def _sort_keys(self, agent: AgentMetadata) -> Dict[str, Any]:
+        """Compute the sort keys of an agent (ascending order).
+        
+        Keys end with the agent's facet slot so ties keep catalog order.
+        """
+        slot = self.facet_index.slot(agent.id)
+        return {
+            "name": (agent.name.casefold(), slot),
+            "provider": (self._provider_sort_key(agent.provider_id), slot),
+            # Most recently updated first
+            "updated_at": (-agent.updated_at.timestamp(), slot),
+        }
+    
+    def _provider_sort_key(self, provider_id: str) -> str:
+        """Sort key of a provider name; agents without a known provider sort first."""
+        provider = self.providers.get(provider_id)
+        return provider.name.casefold() if provider else ""
+    
+    def _update_provider_sort_keys(self, provider_id: str):
+        """Refresh the provider sort key of the agents of a provider after it changed."""
+        key = self._provider_sort_key(provider_id)
+        for agent in self.get_agents_by_provider(provider_id):
+            self.sort_indexes["provider"].set(agent.id, (key, self.facet_index.slot(agent.id)))
+    
+    def _index_provider(self, provider_id: str):
+        """Update the provider indexes after a provider was added, changed or deleted."""
+        self._index_provider_type(provider_id)
+        if self.fuzzy_index is not None:
+            provider = self.providers.get(provider_id)
+            self.fuzzy_index.set_provider(provider_id, provider.name if provider else None)
+    
+    def _index_provider_type(self, provider_id: str):
+        """Move a provider to the type index entry of its current type (or drop it if deleted)."""
+        provider = self.providers.get(provider_id)
+        provider_type = provider.provider_type.value if provider else None
+        old_type = self._provider_types.get(provider_id)
+        if old_type == provider_type:
+            return
+        if old_type is not None:
+            ids = self._providers_by_type[old_type]
+            del ids[provider_id]
+            if not ids:
+                del self._providers_by_type[old_type]
+            del self._provider_types[provider_id]
+        if provider_type is not None:
+            self._providers_by_type.setdefault(provider_type, {})[provider_id] = None
+            self._provider_types[provider_id] = provider_type
+    
+    def _set_provider_references(self, provider_id: str, provider: Optional[Provider]):
+        """Point every reference to provider_id at the given provider object (or None)."""
+        for agent_id, fields in self._provider_refs.get(provider_id, {}).items():
+            agent = self.agents[agent_id]
+            if "provider" in fields:
+                agent.provider = provider
+            for field in NESTED_PROVIDER_FIELDS:
+                if field in fields:
+                    for item in getattr(agent, field):
+                        if item.provider_id == provider_id:
+                            item.provider = provider
+    
+    @staticmethod
+    def _unlink_providers(agent: AgentMetadata, provider_ids: Set[str]):
+        """Clear the provider objects of an agent's references to the given providers."""
+        if agent.provider_id in provider_ids and agent.provider is not None:
+            agent.provider = None
+        for field in NESTED_PROVIDER_FIELDS:
+            for item in getattr(agent, field):
+                if item.provider_id in provider_ids and item.provider is not None:
+                    item.provider = None
     
     def _link_provider_references(self, agent: AgentMetadata):
-        """Link all provider references in an agent object."""
+        """Link all provider references in an agent object.
+        
+        Every agent entering the catalog passes here, so with compact_records it
+        also shares its repeated values with the other agents at this point.
+        """
         # Link main provider
         if agent.provider_id and agent.provider_id in self.providers:
             agent.provider = self.providers[agent.provider_id]
@@ -62,23 +905,226 @@ class JSONDatabase:
         for ms in agent.memory_stores:
             if ms.provider_id and ms.provider_id in self.providers:
                 ms.provider = self.providers[ms.provider_id]
+        
+        # Share repeated values with the other agents
+        if self.compact_records:
+            self.intern_pool.compact_agent(agent)
     
     def _save_data(self):
         """Save all data to JSON files."""
-        # Save providers
-        with open(self.providers_file, 'w') as f:
-            json.dump([provider.dict() for provider in self.providers.values()], f, default=str, indent=2)
+        with self._lock:
+            # Save providers
+            self._write_atomic(self.providers_file, self._providers_json(self.pretty))
+            
+            # Save agents
+            self._write_atomic(self.agents_file, self._agents_json(self.pretty))
+            
+            # Our own writes should not trigger a reload
+            self._file_signature = self._get_file_signature()
+    
+    def _write_atomic(self, path: str, content: bytes):
+        """Write to a temporary file and move it into place."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    
+    def migrate_from_json(self, data_dir: Optional[str] = None) -> Dict[str, int]:
+        """Import all records from the JSON files of a data directory, replacing the stored ones.
+        
+        The SQLite and sharded backends create their store from data/*.json with it.
+        
+        Args:
+            data_dir: Directory with providers.json and agents.json (defaults to this database's data_dir)
+        
+        Returns:
+            Number of migrated providers and agents
+        """
+        source = JSONDatabase(data_dir or self.data_dir)
+        with self._lock:
+            self.providers = dict(source.providers)
+            self.agents = dict(source.agents)
+            self._agent_details = dict(source._agent_details)
+            for agent in self.agents.values():
+                self._link_provider_references(agent)
+            self._rebuild_indexes()
+            self._save_data()
+        return {"providers": len(self.providers), "agents": len(self.agents)}
+    
+    def export_json(self, data_dir: str, pretty: bool = True):
+        """Write providers.json and agents.json snapshots to another directory.
+        
+        Args:
+            data_dir: Target directory (created if missing)
+            pretty: Indent the output for reading and diffing
+        """
+        self.wait_until_loaded()
+        os.makedirs(data_dir, exist_ok=True)
+        with self._lock:
+            self._write_atomic(os.path.join(data_dir, "providers.json"), self._providers_json(pretty))
+            self._write_atomic(os.path.join(data_dir, "agents.json"), self._agents_json(pretty))
+    
+    def _commit(self, kind: str, record_id: str, record: Optional[Any] = None):
+        """Persist a single mutation, or queue it while a batch is open or flushes are timed.
+        
+        Args:
+            kind: "provider" or "agent"
+            record_id: ID of the changed record
+            record: The new record, or None if it was deleted
+        """
+        with self._lock:
+            self.generation += 1
+            self.metrics["changes"] += 1
+            if not self._batch_depth and not self.flush_interval:
+                self._write_changes([(kind, record_id, record)])
+                return
+            # Only the latest version of a record is written
+            self._pending[(kind, record_id)] = record
+            if not self._batch_depth and self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    @contextmanager
+    def batch(self):
+        """Persist all mutations made inside the block at once when it exits.
+        
+        Batches can be nested; the outermost one flushes. This is not a
+        transaction: the in-memory changes stay applied (and are flushed) if
+        the block raises.
+        """
+        self.wait_until_loaded()
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield self
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self.flush()
+    
+    def flush(self):
+        """Persist the changes queued by batch or flush_interval."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return
+            changes = [(kind, record_id, record) for (kind, record_id), record in self._pending.items()]
+            self._pending = {}
+            self._write_changes(changes)
+    
+    def _write_changes(self, changes: List[Tuple[str, str, Optional[Any]]]):
+        """Persist mutations with the backend's _persist, along with the semantic index files."""
+        with self._lock:
+            self.metrics["flushes"] += 1
+            if self.semantic_index is not None:
+                self.semantic_index.save()
+            self._persist(changes)
+    
+    def _persist(self, changes: List[Tuple[str, str, Optional[Any]]]):
+        """Write mutations to disk in one go.
         
-        # Save agents
-        with open(self.agents_file, 'w') as f:
-            json.dump([agent.dict() for agent in self.agents.values()], f, default=str, indent=2)
+        Args:
+            changes: (kind, record_id, record or None if deleted) tuples, oldest first
+        """
+        with self._lock:
+            if not self.journal:
+                self._save_data()
+                return
+            
+            lines = []
+            for kind, record_id, record in changes:
+                entry = {
+                    "op": "put" if record is not None else "delete",
+                    "kind": kind,
+                    "id": record_id,
+                    "data": None,
+                }
+                if record is not None:
+                    entry["data"] = self._agent_record(record) if kind == "agent" else provider_to_dict(record)
+                lines.append(self.codec.dumps(entry) + b"\n")
+            with open(self.journal_file, 'ab') as f:
+                f.write(b"".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_entries += len(lines)
+            self._file_signature = self._get_file_signature()
+            
+            if self._journal_entries >= self.compact_threshold and self._compaction is None:
+                self._start_compaction()
+    
+    def compact(self):
+        """Fold the journal into the snapshot files and truncate it."""
+        self.wait_until_loaded()
+        self.flush()
+        self._compact()
+    
+    def _compact(self):
+        """Fold the journal into the snapshot files (see compact)."""
+        with self._lock:
+            self._compactions += 1
+            # Snapshots are replaced atomically first, so a crash before the
+            # journal is removed only means replaying idempotent entries again
+            self._save_data()
+            for path in (self.compacting_journal_file, self.journal_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._journal_entries = 0
+            self._file_signature = self._get_file_signature()
+    
+    def _start_compaction(self):
+        """Rename the journal and fold it into the snapshot files on a background thread."""
+        with self._lock:
+            # The renamed journal of a compaction that failed is still needed; fold both in now
+            if os.path.exists(self.compacting_journal_file):
+                self._compact()
+                return
+            os.replace(self.journal_file, self.compacting_journal_file)
+            self._journal_entries = 0
+            self._file_signature = self._get_file_signature()
+            # Records changed from here on are appended to the new journal, which is replayed over these snapshots
+            records = (list(self.providers.values()), list(self.agents.values()), dict(self._agent_details))
+            self._compaction = threading.Thread(target=self._background_compact, args=(self._compactions, *records),
+                                                name="agent-hub-compact", daemon=True)
+            self._compaction.start()
+    
+    def _background_compact(self, compactions: int, providers: List[Provider], agents: List[AgentMetadata],
+                            stored_details: Dict[str, bytes]):
+        """Write snapshots of the given records, then drop the renamed journal they include."""
+        try:
+            snapshots = {
+                self.providers_file: self._providers_json(self.pretty, providers),
+                self.agents_file: self._agents_json(self.pretty, agents, stored_details),
+            }
+            for path, content in snapshots.items():
+                with open(path + ".compacting", 'wb') as f:
+                    f.write(content)
+            with self._lock:
+                for path in snapshots:
+                    # A synchronous compaction since has already written newer snapshots
+                    if compactions != self._compactions:
+                        os.remove(path + ".compacting")
+                    else:
+                        os.replace(path + ".compacting", path)
+                if compactions == self._compactions:
+                    os.remove(self.compacting_journal_file)
+                    self._file_signature = self._get_file_signature()
+        finally:
+            with self._lock:
+                self._compaction = None
     
     # Provider operations
     def add_provider(self, provider: Provider) -> Provider:
         """Add a new provider to the database."""
-        self.providers[provider.id] = provider
-        self._save_data()
-        return provider
+        self.wait_until_loaded()
+        with self._lock:
+            self.providers[provider.id] = provider
+            self._index_provider(provider.id)
+            self._update_provider_sort_keys(provider.id)
+            self._commit("provider", provider.id, provider)
+            return provider
     
     def get_provider(self, provider_id: str) -> Optional[Provider]:
         """Get a provider by ID."""
@@ -90,128 +1136,455 @@ class JSONDatabase:
     
     def get_providers_by_type(self, provider_type: str) -> List[Provider]:
         """Get providers filtered by type."""
-        return [p for p in self.providers.values() if p.provider_type == provider_type]
+        provider_type = getattr(provider_type, "value", provider_type)
+        return [self.providers[provider_id] for provider_id in self._providers_by_type.get(provider_type, {})]
     
     def update_provider(self, provider: Provider) -> Provider:
         """Update an existing provider."""
-        if provider.id not in self.providers:
-            raise ValueError(f"Provider with ID {provider.id} not found")
-        self.providers[provider.id] = provider
-        
-        # Update provider references in all agents
-        for agent in self.agents.values():
-            self._link_provider_references(agent)
-        
-        self._save_data()
-        return provider
+        self.wait_until_loaded()
+        with self._lock:
+            if provider.id not in self.providers:
+                raise ValueError(f"Provider with ID {provider.id} not found")
+            self.providers[provider.id] = provider
+            
+            # Update provider references in the agents using this provider
+            self._set_provider_references(provider.id, provider)
+            self._index_provider(provider.id)
+            self._update_provider_sort_keys(provider.id)
+            
+            self._commit("provider", provider.id, provider)
+            return provider
     
     def delete_provider(self, provider_id: str) -> bool:
         """Delete a provider by ID."""
-        if provider_id not in self.providers:
-            return False
-        del self.providers[provider_id]
-        
-        # Remove provider references in all agents
-        for agent in self.agents.values():
-            if agent.provider_id == provider_id:
-                agent.provider = None
+        self.wait_until_loaded()
+        with self._lock:
+            if provider_id not in self.providers:
+                return False
+            del self.providers[provider_id]
             
-            # Clear LLM providers
-            for llm in agent.supported_llms:
-                if llm.provider_id == provider_id:
-                    llm.provider = None
+            # Remove provider references in the agents using this provider
+            self._set_provider_references(provider_id, None)
+            self._index_provider(provider_id)
+            self._update_provider_sort_keys(provider_id)
             
-            # Clear vector store providers
-            for vs in agent.vector_stores:
-                if vs.provider_id == provider_id:
-                    vs.provider = None
+            self._commit("provider", provider_id)
+            return True
+    
+    def get_agents_by_provider(self, provider_id: str, include_nested: bool = False) -> List[AgentMetadata]:
+        """Get agents referencing a provider.
+        
+        Args:
+            provider_id: Provider ID
+            include_nested: Also include agents that only reference the provider
+                through an LLM, vector store or memory store
             
-            # Clear memory store providers
-            for ms in agent.memory_stores:
-                if ms.provider_id == provider_id:
-                    ms.provider = None
+        Returns:
+            List of agents
+        """
+        with self._lock:
+            return [
+                self.agents[agent_id]
+                for agent_id, fields in self._provider_refs.get(provider_id, {}).items()
+                if include_nested or "provider" in fields
+            ]
+    
+    def get_agents_by_name_prefix(self, prefix: str, limit: Optional[int] = None) -> List[AgentMetadata]:
+        """Get agents whose name starts with prefix (ignoring case), in name order.
         
-        self._save_data()
-        return True
+        Looked up in the name sort index, so the cost depends on the number of
+        results, not on the size of the catalog. An empty prefix lists all agents.
+        """
+        prefix = prefix.casefold()
+        with self._lock:
+            agents = []
+            for (name, _), agent_id in self.sort_indexes["name"].iter_from((prefix,)):
+                if not name.startswith(prefix) or len(agents) == limit:
+                    break
+                agents.append(self.agents[agent_id])
+            return agents
     
     # Agent operations
     def add_agent(self, agent: AgentMetadata) -> AgentMetadata:
         """Add a new agent to the database."""
-        # Link all provider references
-        self._link_provider_references(agent)
+        self.wait_until_loaded()
+        with self._lock:
+            # Link all provider references
+            self._link_provider_references(agent)
+            
+            self._unindex_agent(agent.id, keep_slot=True)
+            self._agent_details.pop(agent.id, None)
+            self.agents[agent.id] = agent
+            self._index_agent(agent)
+            self._commit("agent", agent.id, agent)
+            return agent
+    
+    def add_agents(self, agents: List[AgentMetadata]) -> List[AgentMetadata]:
+        """Add many agents, indexing them in bulk and writing them in one batch.
         
-        self.agents[agent.id] = agent
-        self._save_data()
-        return agent
+        Agents whose ID exists already replace the stored version.
+        """
+        # The last version of an ID given more than once wins
+        agents = list({agent.id: agent for agent in agents}.values())
+        # Locked only once loaded, as the background load needs the lock to finish
+        self.wait_until_loaded()
+        with self._lock, self.batch():
+            for agent in agents:
+                self._link_provider_references(agent)
+                self._unindex_agent(agent.id, keep_slot=True)
+                self._agent_details.pop(agent.id, None)
+                self.agents[agent.id] = agent
+            self._index_agents(agents)
+            for agent in agents:
+                self._commit("agent", agent.id, agent)
+        return agents
     
     def get_agent(self, agent_id: str) -> Optional[AgentMetadata]:
-        """Get an agent by ID."""
-        return self.agents.get(agent_id)
+        """Get an agent by ID, with all fields loaded."""
+        agent = self.agents.get(agent_id)
+        return self._load_details(agent) if agent else None
     
     def get_all_agents(self) -> List[AgentMetadata]:
-        """Get all agents."""
+        """Get all agents.
+        
+        Like the other list and query methods, this returns summary records: the
+        DETAIL_FIELDS of agents not yet requested with get_agent are left empty.
+        """
         return list(self.agents.values())
     
     def update_agent(self, agent: AgentMetadata) -> AgentMetadata:
         """Update an existing agent."""
-        if agent.id not in self.agents:
-            raise ValueError(f"Agent with ID {agent.id} not found")
-        
-        # Link all provider references
-        self._link_provider_references(agent)
-        
-        self.agents[agent.id] = agent
-        self._save_data()
-        return agent
+        self.wait_until_loaded()
+        with self._lock:
+            if agent.id not in self.agents:
+                raise ValueError(f"Agent with ID {agent.id} not found")
+            
+            # Link all provider references
+            self._link_provider_references(agent)
+            
+            self._unindex_agent(agent.id, keep_slot=True)
+            # Keep stored details the caller never loaded nor set (an update of a summary record)
+            details = self._get_agent_details(agent.id)
+            self._agent_details.pop(agent.id, None)
+            self._apply_details(agent, {
+                field: value for field, value in details.items() if field not in agent.model_fields_set
+            })
+            self.agents[agent.id] = agent
+            self._index_agent(agent)
+            self._commit("agent", agent.id, agent)
+            return agent
     
     def delete_agent(self, agent_id: str) -> bool:
         """Delete an agent by ID."""
-        if agent_id not in self.agents:
-            return False
-        del self.agents[agent_id]
-        self._save_data()
-        return True
+        self.wait_until_loaded()
+        with self._lock:
+            if agent_id not in self.agents:
+                return False
+            del self.agents[agent_id]
+            self._agent_details.pop(agent_id, None)
+            self._unindex_agent(agent_id)
+            self._commit("agent", agent_id)
+            return True
+    
+    def search_agents(self, query: str, limit: Optional[int] = None, semantic: bool = False,
+                      fuzzy: bool = False) -> List[AgentMetadata]:
+        """Search agents by name, description, tags, example prompts, reasoning frameworks
+        and code snippet descriptions.
+        
+        Args:
+            query: Search text; words also match longer words starting with them
+            limit: Maximum number of results
+            semantic: Match by meaning instead of by words (see semantic_matches)
+            fuzzy: If no agent has all the query words, return close matches instead (see fuzzy_matches)
+            
+        Returns:
+            Matching agents, most relevant first (all agents for an empty query)
+        """
+        with self._lock:
+            if not query.strip():
+                return list(islice(self.agents.values(), limit))
+            
+            if semantic:
+                matches = self.semantic_matches(query)[:limit]
+            else:
+                matches = self.search_index.search(query, limit=limit)
+                if fuzzy and not matches:
+                    matches = self.fuzzy_matches(query)[:limit]
+            return [self.agents[agent_id] for agent_id, _ in matches]
     
-    def search_agents(self, query: str) -> List[AgentMetadata]:
-        """Search agents by name or description."""
-        query = query.lower()
-        results = []
+    def semantic_matches(self, query: str) -> List[Tuple[str, float]]:
+        """Find the agents whose name, description and tags are closest in meaning to a query.
         
-        for agent in self.agents.values():
-            if query in agent.name.lower() or query in agent.description.lower():
-                results.append(agent)
+        Uses embeddings computed offline (see semantic_index.py), stored under
+        semantic/ in the data directory. The first call embeds the agents added
+        or changed since the stored embeddings were made (all of them the first
+        time); later changes are embedded as they are made. The embedder is
+        fitted again once the catalog outgrew it (see SemanticIndex.sync).
         
-        return results
+        Returns:
+            Up to SEMANTIC_SEARCH_LIMIT (agent ID, similarity) pairs with a similarity
+            of at least SEMANTIC_MIN_SCORE, most similar first
+        """
+        with self._lock:
+            if self.semantic_index is None or self.semantic_index.needs_fit(len(self.agents)):
+                if self.semantic_index is None:
+                    self.semantic_index = SemanticIndex(os.path.join(self.data_dir, "semantic"))
+                with paused_gc():
+                    self.semantic_index.sync(self.agents.values())
+                    self.semantic_index.save()
+            return [
+                (agent_id, score) for agent_id, score in self.semantic_index.search(query, SEMANTIC_SEARCH_LIMIT)
+                if score >= SEMANTIC_MIN_SCORE
+            ]
+    
+    def fuzzy_matches(self, query: str) -> List[Tuple[str, float]]:
+        """Find the agents with a name, tag, LLM model name or provider name close to a
+        possibly misspelled query, e.g. "autogne" or "lama index".
+        
+        Uses a trigram index (see fuzzy_index.py) built for the whole catalog on the
+        first call and updated with every change after that.
+        
+        Returns:
+            (agent ID, similarity between 0 and 1) pairs, most similar first
+        """
+        with self._lock:
+            if self.fuzzy_index is None:
+                self.fuzzy_index = FuzzyIndex()
+                with paused_gc():
+                    self.fuzzy_index.add_all(self.agents.values())
+                    for provider_id, provider in self.providers.items():
+                        self.fuzzy_index.set_provider(provider_id, provider.name)
+            return self.fuzzy_index.search(query)
+    
+    def get_similar_agents(self, agent_id: str, limit: int = 5) -> List[Tuple[AgentMetadata, float]]:
+        """Find the agents most similar to an agent by their features.
+        
+        Agents are compared by planning and tool use level, memory types, feature
+        flags, domains, tags, supported LLMs and reasoning frameworks (see
+        similarity.py). The feature vectors are computed for the whole catalog on
+        the first call and updated with every change after that.
+        
+        Returns:
+            (agent, similarity between 0 and 1) pairs, most similar first
+        """
+        with self._lock:
+            if self.similarity_index is None:
+                self.similarity_index = SimilarityIndex()
+                with paused_gc():
+                    self.similarity_index.add_all(self.agents.values())
+            return [
+                (self.agents[similar_id], score)
+                for similar_id, score in self.similarity_index.similar(agent_id, limit)
+            ]
     
     def filter_agents(self, 
                      provider_id: Optional[str] = None,
                      domains: Optional[List[str]] = None,
-                     features: Optional[Dict[str, Any]] = None) -> List[AgentMetadata]:
-        """Filter agents by various criteria."""
-        results = list(self.agents.values())
+                     features: Optional[Dict[str, Any]] = None,
+                     tags: Optional[List[str]] = None) -> List[AgentMetadata]:
+        """Filter agents by various criteria.
         
-        if provider_id:
-            results = [agent for agent in results if agent.provider_id == provider_id]
+        Args:
+            provider_id: Only agents of this provider
+            domains: Agents in any of these domains
+            features: AgentFeatures values to match; list features match if any value is present
+            tags: Agents with any of these tags
+            
+        Returns:
+            Matching agents in catalog order
+        """
+        with self._lock:
+            selections, remaining_features = self._facet_selections(provider_id, domains, features, tags)
+            mask = self.facet_index.match(selections)
+            results = [self.agents[agent_id] for agent_id in self.facet_index.ids(mask)]
+            
+            if remaining_features:
+                results = [agent for agent in results if self._matches_features(agent, remaining_features)]
+            
+            return results
+    
+    def get_catalog_counts(self) -> Dict[str, Any]:
+        """Get catalog totals for dashboards without scanning the catalog.
+        
+        The counts are maintained on every change. Returns the number of "providers"
+        and "agents", providers per "provider_type", and agents per value of the
+        CATALOG_COUNT_FACETS (raw values; "provider" is keyed by provider ID).
+        """
+        with self._lock:
+            counts: Dict[str, Any] = {
+                "providers": len(self.providers),
+                "agents": len(self.agents),
+                "provider_type": {
+                    provider_type: len(ids) for provider_type, ids in self._providers_by_type.items()
+                },
+            }
+            for facet in CATALOG_COUNT_FACETS:
+                counts[facet] = dict(self.facet_index.totals[facet])
+            return counts
+    
+    def get_facet_counts(self,
+                         provider_id: Optional[str] = None,
+                         domains: Optional[List[str]] = None,
+                         features: Optional[Dict[str, Any]] = None,
+                         tags: Optional[List[str]] = None) -> Dict[str, Dict[Any, int]]:
+        """Count agents per facet value for the given filters (same arguments as filter_agents).
         
+        Each facet is counted with the filters of the other facets applied. Facets are
+        "provider", "domain", "planning", "tool_use", "memory", "tag" and the boolean
+        feature flags (counted per True/False); values are raw strings, not enums.
+        """
+        with self._lock:
+            selections, _ = self._facet_selections(provider_id, domains, features, tags)
+            return self.facet_index.counts(selections)
+    
+    def query_agents(self,
+                     query: str = "",
+                     provider_id: Optional[str] = None,
+                     domains: Optional[List[str]] = None,
+                     features: Optional[Dict[str, Any]] = None,
+                     tags: Optional[List[str]] = None,
+                     sort: str = "name",
+                     offset: int = 0,
+                     limit: Optional[int] = None,
+                     semantic: bool = False,
+                     fuzzy: bool = False) -> Tuple[int, List[AgentMetadata]]:
+        """Filter, search, sort and paginate agents.
+        
+        Only the agents of the requested page are returned; the total is taken
+        from the indexes.
+        
+        Args:
+            query: Optional search text (see search_agents)
+            provider_id, domains, features, tags: Filters (see filter_agents)
+            sort: One of SORT_OPTIONS; "relevance" only differs from "name" with a query
+            offset: Number of matches to skip
+            limit: Page size (all remaining matches if None)
+            semantic: Match the query by meaning (see semantic_matches)
+            fuzzy: If no agent has all the query words, match close ones instead (see fuzzy_matches)
+            
+        Returns:
+            Tuple of (total number of matches, agents on the page)
+        """
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"Unknown sort option: {sort}")
+        
+        with self._lock:
+            selections, remaining_features = self._facet_selections(provider_id, domains, features, tags)
+            mask = self.facet_index.match(selections)
+            end = offset + limit if limit is not None else None
+            
+            if not query.strip() and not remaining_features:
+                # Walk the pre-sorted order and keep the agents in the filter bitmap
+                total = self.facet_index.size(mask)
+                if sort == "relevance":
+                    sort = "name"
+                order = self.sort_indexes[sort].slot_order(self.facet_index.slot)
+                page_slots = order[self.facet_index.membership(mask)[order]][offset:end]
+                return total, [self.agents[self.facet_index.agent_id(slot)] for slot in page_slots]
+            
+            if query.strip():
+                matches = self.semantic_matches(query) if semantic else self.search_index.search(query)
+                if fuzzy and not semantic and not matches:
+                    matches = self.fuzzy_matches(query)
+                ids = [agent_id for agent_id, _ in matches if self.facet_index.contains(mask, agent_id)]
+            else:
+                ids = self.facet_index.ids(mask)
+            if remaining_features:
+                ids = [agent_id for agent_id in ids if self._matches_features(self.agents[agent_id], remaining_features)]
+            
+            total = len(ids)
+            if sort != "relevance" or not query.strip():
+                # Top-k selection of the matches up to the end of the page
+                key = self.sort_indexes["name" if sort == "relevance" else sort].key
+                ids = heapq.nsmallest(end, ids, key=key) if end is not None else sorted(ids, key=key)
+            
+            return total, [self.agents[agent_id] for agent_id in ids[offset:end]]
+    
+    @staticmethod
+    def _facet_selections(provider_id, domains, features, tags) -> Tuple[Dict[str, List[Any]], Dict[str, Any]]:
+        """Translate filter_agents arguments into facet selections.
+        
+        Returns:
+            Tuple of (facet selections, feature criteria without a facet)
+        """
+        selections: Dict[str, List[Any]] = {}
+        remaining_features = {}
+        
+        if provider_id:
+            selections["provider"] = [provider_id]
         if domains:
-            results = [agent for agent in results if any(domain in agent.domains for domain in domains)]
-        
-        if features:
-            filtered_results = []
-            for agent in results:
-                match = True
-                for key, value in features.items():
-                    if hasattr(agent.features, key):
-                        agent_value = getattr(agent.features, key)
-                        if isinstance(agent_value, list):
-                            if not any(v in agent_value for v in value):
-                                match = False
-                                break
-                        elif agent_value != value:
-                            match = False
-                            break
-                if match:
-                    filtered_results.append(agent)
-            results = filtered_results
-        
-        return results
\ No newline at end of file
+            selections["domain"] = list(domains)
+        if tags:
+            selections["tag"] = list(tags)
+        
+        for key, value in (features or {}).items():
+            if key in ("planning", "tool_use"):
+                selections[key] = [value]
+            elif key == "memory":
+                selections[key] = list(value)
+            elif key in FLAG_FACETS:
+                selections[key] = [bool(value)]
+            else:
+                # e.g. reasoning_frameworks or custom_features
+                remaining_features[key] = value
+        
+        return selections, remaining_features
+    
+    @staticmethod
+    def _matches_features(agent: AgentMetadata, features: Dict[str, Any]) -> bool:
+        """Check an agent against feature criteria (list features match if any value is present)."""
+        for key, value in features.items():
+            if hasattr(agent.features, key):
+                agent_value = getattr(agent.features, key)
+                if isinstance(agent_value, list):
+                    if not any(v in agent_value for v in value):
+                        return False
+                elif agent_value != value:
+                    return False
+        return True
+
+
+# Process-wide database instances, shared by all sessions and pages
+_instances: Dict[Tuple[str, str], JSONDatabase] = {}
+_instances_lock = threading.Lock()
+
+
+def get_database(data_dir: str = "../data", backend: Optional[str] = None) -> JSONDatabase:
+    """Get the shared database for a data directory.
+    
+    The first call loads the data (the agents of a large JSON catalog in the
+    background, see JSONDatabase); later calls reuse the same instance and only
+    reload it when the files on disk changed (e.g. edited by another process).
+    
+    Args:
+        data_dir: Directory holding the data files
+        backend: "json", "sqlite" or "sharded"; defaults to the AGENT_HUB_BACKEND environment
+            variable, then "json". Set AGENT_HUB_JOURNAL=1 to use the append-only
+            journal with the JSON backend, AGENT_HUB_LOAD_WORKERS to limit the
+            processes used to load large catalogs, and AGENT_HUB_FLUSH_INTERVAL
+            (seconds) to coalesce writes (see JSONDatabase).
+    """
+    backend = (backend or os.environ.get("AGENT_HUB_BACKEND") or "json").lower()
+    if backend not in ("json", "sqlite", "sharded"):
+        raise ValueError(f"Unknown database backend: {backend}")
+    
+    key = (os.path.abspath(data_dir), backend)
+    with _instances_lock:
+        db = _instances.get(key)
+        if db is None:
+            flush_interval = float(os.environ.get("AGENT_HUB_FLUSH_INTERVAL") or 0) or None
+            if backend == "sqlite":
+                from sqlite_database import SQLiteDatabase
+                db = SQLiteDatabase(data_dir, flush_interval=flush_interval)
+            elif backend == "sharded":
+                from sharded_database import ShardedDatabase
+                db = ShardedDatabase(data_dir, flush_interval=flush_interval)
+            else:
+                journal = os.environ.get("AGENT_HUB_JOURNAL", "").lower() in ("1", "true", "yes")
+                load_workers = int(os.environ.get("AGENT_HUB_LOAD_WORKERS") or 0) or None
+                db = JSONDatabase(data_dir, journal=journal, load_workers=load_workers, background_load=True,
+                                  flush_interval=flush_interval)
+            _instances[key] = db
+            return db
+    db.reload_if_changed()
+    return db
@@ -0,0 +1,222 @@
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from schema import AgentMetadata
+
+
+# Boolean AgentFeatures flags available as facets
+FLAG_FACETS = [
+    "multi_agent_collaboration",
+    "human_in_the_loop",
+    "autonomous",
+    "fine_tuning_support",
+    "streaming_support",
+    "supports_vision",
+    "supports_audio",
+]
+
+FACETS = ["provider", "domain", "planning", "tool_use", "memory", "tag"] + FLAG_FACETS
+
+
+def _value(value: Any) -> Any:
+    """Return the raw value of an enum member, or the value unchanged."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def agent_facet_values(agent: AgentMetadata) -> List[Tuple[str, Any]]:
+    """Get the (facet, value) pairs of an agent."""
+    features = agent.features
+    values = [
+        ("provider", agent.provider_id),
+        ("planning", _value(features.planning)),
+        ("tool_use", _value(features.tool_use)),
+    ]
+    values += [("domain", _value(d)) for d in agent.domains]
+    values += [("memory", _value(m)) for m in features.memory]
+    values += [("tag", tag) for tag in agent.tags]
+    values += [(flag, bool(getattr(features, flag))) for flag in FLAG_FACETS]
+    return list(dict.fromkeys(values))
+
+
+class FacetIndex:
+    """Bitmap index over agent facets.
+
+    Every agent gets a fixed slot (bit position); each facet value keeps a Python
+    int whose set bits are the agents having that value. A filter is resolved with
+    bitwise OR within a facet and AND across facets, and counts are popcounts.
+    Slots are assigned in insertion order, so results keep catalog order.
+    Counts over the whole catalog are kept in totals as agents come and go.
+    """
+
+    def __init__(self):
+        # facet -> value -> bitmap
+        self.bitmaps: Dict[str, Dict[Any, int]] = {facet: {} for facet in FACETS}
+        # facet -> value -> number of indexed agents having it
+        self.totals: Dict[str, Dict[Any, int]] = {facet: {} for facet in FACETS}
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._agent_values: Dict[str, Tuple[Tuple[str, Any], ...]] = {}
+        # Each distinct (facet, value) pair is stored once and shared by the agents having it
+        self._pairs: Dict[Tuple[str, Any], Tuple[str, Any]] = {}
+        self.all = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, agent: AgentMetadata):
+        """Index an agent, replacing any previous version of it (and keeping its slot)."""
+        slot = self._slots.get(agent.id)
+        if slot is None:
+            slot = len(self._ids)
+            self._slots[agent.id] = slot
+            self._ids.append(agent.id)
+        else:
+            self._clear_values(agent.id, slot)
+
+        bit = 1 << slot
+        values = self._shared_values(agent)
+        for facet, value in values:
+            bitmaps = self.bitmaps[facet]
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+            totals = self.totals[facet]
+            totals[value] = totals.get(value, 0) + 1
+        self._agent_values[agent.id] = values
+        self.all |= bit
+
+    def add_all(self, agents: Iterable[AgentMetadata]):
+        """Index many agents; those already indexed are replaced in their slot.
+
+        Builds each bitmap once from all its slots instead of growing it agent by
+        agent, which would copy the whole bitmap for every bit set.
+        """
+        slots: Dict[Tuple[str, Any], List[int]] = {}
+        first_slot = len(self._ids)
+        for agent in agents:
+            if agent.id in self._slots:
+                self.add(agent)
+                continue
+            slot = len(self._ids)
+            self._slots[agent.id] = slot
+            self._ids.append(agent.id)
+            values = self._shared_values(agent)
+            for value in values:
+                slots.setdefault(value, []).append(slot)
+            self._agent_values[agent.id] = values
+
+        for (facet, value), value_slots in slots.items():
+            bitmaps = self.bitmaps[facet]
+            bitmaps[value] = bitmaps.get(value, 0) | self._bitmap(value_slots)
+            totals = self.totals[facet]
+            totals[value] = totals.get(value, 0) + len(value_slots)
+        self.all |= self._bitmap(range(first_slot, len(self._ids)))
+
+    def _shared_values(self, agent: AgentMetadata) -> Tuple[Tuple[str, Any], ...]:
+        """Get the (facet, value) pairs of an agent as shared tuples."""
+        pairs = self._pairs
+        return tuple(pairs.setdefault(pair, pair) for pair in agent_facet_values(agent))
+
+    @staticmethod
+    def _bitmap(slots: Iterable[int]) -> int:
+        """Build a bitmap with the given bits set."""
+        slots = np.fromiter(slots, dtype=np.int64)
+        if not len(slots):
+            return 0
+        bits = np.zeros(int(slots.max()) + 1, dtype=bool)
+        bits[slots] = True
+        return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+    def remove(self, agent_id: str):
+        """Remove an agent from the index if present."""
+        slot = self._slots.pop(agent_id, None)
+        if slot is None:
+            return
+        self._clear_values(agent_id, slot)
+        self._ids[slot] = None
+        self.all &= ~(1 << slot)
+
+    def _clear_values(self, agent_id: str, slot: int):
+        """Clear an agent's bit from the bitmaps of its indexed values."""
+        mask = ~(1 << slot)
+        for facet, value in self._agent_values.pop(agent_id, ()):
+            bitmaps = self.bitmaps[facet]
+            bitmap = bitmaps[value] & mask
+            if bitmap:
+                bitmaps[value] = bitmap
+                self.totals[facet][value] -= 1
+            else:
+                del bitmaps[value]
+                del self.totals[facet][value]
+
+    def match(self, selections: Dict[str, Iterable[Any]], exclude: Optional[str] = None) -> int:
+        """Get the bitmap of agents matching the selections.
+
+        Args:
+            selections: facet -> accepted values (an agent matches a facet if it has any of them)
+            exclude: Facet whose selection is ignored (used for that facet's counts)
+
+        Returns:
+            Bitmap of matching agents
+        """
+        mask = self.all
+        for facet, values in selections.items():
+            if facet == exclude:
+                continue
+            bitmaps = self.bitmaps[facet]
+            facet_mask = 0
+            for value in values:
+                facet_mask |= bitmaps.get(_value(value), 0)
+            mask &= facet_mask
+            if not mask:
+                break
+        return mask
+
+    def count(self, facet: str, mask: int) -> Dict[Any, int]:
+        """Count the agents in mask per value of a facet."""
+        if mask == self.all:
+            return dict(self.totals[facet])
+        counts = {}
+        for value, bitmap in self.bitmaps[facet].items():
+            count = self.size(bitmap & mask)
+            if count:
+                counts[value] = count
+        return counts
+
+    def counts(self, selections: Dict[str, Iterable[Any]]) -> Dict[str, Dict[Any, int]]:
+        """Count agents per value of every facet.
+
+        Each facet is counted with the selections of all other facets applied, so
+        the counts show how many results choosing that value would give.
+        """
+        return {facet: self.count(facet, self.match(selections, exclude=facet)) for facet in FACETS}
+
+    def contains(self, mask: int, agent_id: str) -> bool:
+        """Check whether an agent's bit is set in a bitmap."""
+        slot = self._slots.get(agent_id)
+        return slot is not None and bool(mask >> slot & 1)
+
+    @staticmethod
+    def size(mask: int) -> int:
+        """Number of agents in a bitmap."""
+        return bin(mask).count("1")
+
+    def slot(self, agent_id: str) -> int:
+        """Get the bit position of an agent."""
+        return self._slots[agent_id]
+
+    def agent_id(self, slot: int) -> Optional[str]:
+        """Get the agent ID at a bit position."""
+        return self._ids[slot]
+
+    def membership(self, mask: int) -> np.ndarray:
+        """Expand a bitmap into a boolean array indexed by slot."""
+        bits = np.unpackbits(
+            np.frombuffer(mask.to_bytes((len(self._ids) + 7) // 8, "little"), dtype=np.uint8),
+            bitorder="little"
+        )
+        return bits[:len(self._ids)].astype(bool)
+
+    def ids(self, mask: int) -> List[str]:
+        """Get the agent IDs of a bitmap, in slot order."""
+        if not mask:
+            return []
+        return [self._ids[slot] for slot in np.flatnonzero(self.membership(mask))]
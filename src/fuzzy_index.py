@@ -0,0 +1,342 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from schema import AgentMetadata
+from search_index import tokenize
+
+
+# Relative weight of a match in each indexed field
+FIELD_WEIGHTS = {
+    "name": 1.0,
+    "tag": 0.9,
+    "llm": 0.9,
+    "provider": 0.8,
+}
+
+# Terms less similar to a query word, and agents with a lower score, do not match
+MIN_SIMILARITY = 0.4
+
+# Only this many of the most similar terms are expanded into agents
+MAX_TERMS = 500
+
+# The terms sharing most trigrams with a query word are also compared by edit distance
+EDIT_CANDIDATES = 50
+
+# Edits allowed for a match by edit distance: one up to this query word length, two above
+MAX_ONE_EDIT_LENGTH = 5
+
+# Shorter query words only match equal terms
+MIN_FUZZY_LENGTH = 3
+
+
+def trigrams(term: str) -> Set[str]:
+    """Get the trigrams of a term, padded as in pg_trgm so word starts and ends weigh more."""
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Get the number of inserted, deleted, replaced or swapped adjacent letters turning a into b."""
+    before_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before_previous[j - 2] + 1)
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """Trigram index for typo-tolerant matching of agent names, tags, LLM model names
+    and provider names.
+
+    Every distinct word of those fields is a term, stored once with its trigrams
+    and, per field, the agents (for provider names: the providers) having it,
+    until the last of them is removed. A
+    query word is compared with all terms at once: the trigrams it shares with
+    each term are counted with one bincount over the trigram postings. A term's
+    similarity is the mean of the Jaccard similarity of the trigram sets and the
+    share of the query's trigrams found in the term, so "lama" also matches
+    "llamaindex". Trigrams miss swapped letters ("agnet"), so the closest terms
+    are compared by edit distance as well.
+
+    Every agent has a fixed slot (reused after removal), so agent scores are
+    numpy arrays indexed by slot.
+    """
+
+    def __init__(self):
+        self._term_ids: Dict[str, int] = {}
+        # term_id -> term (None for released IDs, reused by new terms)
+        self._terms: List[Optional[str]] = []
+        self._free_terms: List[int] = []
+        self._term_sizes = np.zeros(1024, dtype=np.int32)
+        # term_id -> field -> slots of the agents (IDs of the providers for "provider") having the term;
+        # a term is released when the last of them is removed
+        self._term_members: List[Dict[str, Dict]] = []
+        # trigram -> IDs of the terms having it
+        self._postings: Dict[str, List[int]] = {}
+        # Term IDs of the tags, model names and provider names seen, which repeat across agents
+        self._shared_value_terms: Dict[str, Tuple[int, ...]] = {}
+        # Arrays of postings and of the slots having a (term_id, field), built on first use after a change
+        self._posting_arrays: Dict[str, np.ndarray] = {}
+        self._member_arrays: Dict[Tuple[int, str], np.ndarray] = {}
+
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        # slot / provider_id -> its indexed (term_id, field) pairs, needed to remove it
+        self._agent_terms: Dict[int, Tuple[Tuple[int, str], ...]] = {}
+        self._provider_terms: Dict[str, Tuple[Tuple[int, str], ...]] = {}
+        # provider_id -> slots of its agents, and back
+        self._provider_agents: Dict[str, Dict[int, None]] = {}
+        self._agent_providers: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _term_id(self, term: str) -> int:
+        """Get the ID of a term, adding new terms to the trigram postings."""
+        term_id = self._term_ids.get(term)
+        if term_id is not None:
+            return term_id
+        if self._free_terms:
+            term_id = self._free_terms.pop()
+            self._terms[term_id] = term
+        else:
+            term_id = len(self._terms)
+            self._terms.append(term)
+            self._term_members.append({})
+        self._term_ids[term] = term_id
+        grams = trigrams(term)
+        if term_id == len(self._term_sizes):
+            self._term_sizes = np.concatenate([self._term_sizes, np.zeros_like(self._term_sizes)])
+        self._term_sizes[term_id] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(term_id)
+        if self._posting_arrays:
+            self._posting_arrays = {}
+        return term_id
+
+    def _value_term_ids(self, field: str, value: str) -> Tuple[int, ...]:
+        """Get the IDs of the terms of a value: its words and, for values other than names, the
+        words run together ("gpt4o"), which is cheap as those values repeat across agents."""
+        if field == "name":
+            return tuple(self._term_id(term) for term in dict.fromkeys(tokenize(value)))
+        term_ids = self._shared_value_terms.get(value)
+        if term_ids is None:
+            words = tokenize(value)
+            terms = dict.fromkeys(words + ["".join(words)] if len(words) > 1 else words)
+            term_ids = self._shared_value_terms[value] = tuple(self._term_id(term) for term in terms)
+        return term_ids
+
+    def _add_terms(self, member, values: Iterable[Tuple[str, str]]) -> Tuple[Tuple[int, str], ...]:
+        """Index the (field, value) pairs of an agent slot or provider, returning its (term_id, field) pairs."""
+        pairs = tuple(dict.fromkeys(
+            (term_id, field) for field, value in values for term_id in self._value_term_ids(field, value)
+        ))
+        for pair in pairs:
+            term_id, field = pair
+            self._term_members[term_id].setdefault(field, {})[member] = None
+            self._member_arrays.pop(pair, None)
+        return pairs
+
+    def _remove_terms(self, member, pairs: Tuple[Tuple[int, str], ...]):
+        for pair in pairs:
+            term_id, field = pair
+            members = self._term_members[term_id]
+            del members[field][member]
+            if not members[field]:
+                del members[field]
+                if not members:
+                    self._release_term(term_id)
+            self._member_arrays.pop(pair, None)
+
+    def _release_term(self, term_id: int):
+        """Drop a term no agent or provider has any more from the vocabulary and trigram postings."""
+        term = self._terms[term_id]
+        del self._term_ids[term]
+        self._terms[term_id] = None
+        self._term_sizes[term_id] = 0
+        for gram in trigrams(term):
+            postings = self._postings[gram]
+            postings.remove(term_id)
+            if not postings:
+                del self._postings[gram]
+        self._free_terms.append(term_id)
+        if self._posting_arrays:
+            self._posting_arrays = {}
+        # Cached value terms may include the released ID
+        if self._shared_value_terms:
+            self._shared_value_terms = {}
+
+    def _slot(self, agent_id: str) -> int:
+        """Get the slot of an agent, assigning a free one to new agents."""
+        slot = self._slots.get(agent_id)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = agent_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(agent_id)
+        self._slots[agent_id] = slot
+        return slot
+
+    def _clear_slot(self, slot: int):
+        """Drop the terms and provider of the agent in a slot."""
+        pairs = self._agent_terms.pop(slot, None)
+        if pairs is None:
+            return
+        self._remove_terms(slot, pairs)
+        provider_id = self._agent_providers.pop(slot, None)
+        if provider_id is not None:
+            agents = self._provider_agents[provider_id]
+            del agents[slot]
+            if not agents:
+                del self._provider_agents[provider_id]
+            self._invalidate_provider(provider_id)
+
+    def _invalidate_provider(self, provider_id: str):
+        """Drop the cached slot arrays of the terms of a provider's name."""
+        for pair in self._provider_terms.get(provider_id, ()):
+            self._member_arrays.pop(pair, None)
+
+    def add(self, agent: AgentMetadata):
+        """Index an agent, replacing any previous version of it."""
+        slot = self._slot(agent.id)
+        self._clear_slot(slot)
+        values = [("name", agent.name)]
+        values += [("tag", tag) for tag in agent.tags]
+        values += [("llm", llm.model_name) for llm in agent.supported_llms]
+        self._agent_terms[slot] = self._add_terms(slot, values)
+        if agent.provider_id:
+            self._provider_agents.setdefault(agent.provider_id, {})[slot] = None
+            self._agent_providers[slot] = agent.provider_id
+            self._invalidate_provider(agent.provider_id)
+
+    def add_all(self, agents: Iterable[AgentMetadata]):
+        """Index many agents."""
+        for agent in agents:
+            self.add(agent)
+
+    def remove(self, agent_id: str):
+        """Remove an agent if present."""
+        slot = self._slots.pop(agent_id, None)
+        if slot is None:
+            return
+        self._clear_slot(slot)
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def set_provider(self, provider_id: str, name: Optional[str]):
+        """Index the name of a provider, or drop it if name is None (a deleted provider)."""
+        pairs = self._provider_terms.pop(provider_id, None)
+        if pairs is not None:
+            self._remove_terms(provider_id, pairs)
+        if name is not None:
+            self._provider_terms[provider_id] = self._add_terms(provider_id, [("provider", name)])
+
+    def _posting_array(self, gram: str) -> np.ndarray:
+        array = self._posting_arrays.get(gram)
+        if array is None:
+            array = self._posting_arrays[gram] = np.array(self._postings[gram], dtype=np.intp)
+        return array
+
+    def _member_slots(self, term_id: int, field: str) -> np.ndarray:
+        """Get the slots of the agents having a term in a field."""
+        key = (term_id, field)
+        array = self._member_arrays.get(key)
+        if array is None:
+            members = self._term_members[term_id][field]
+            if field == "provider":
+                members = [slot for provider_id in members for slot in self._provider_agents.get(provider_id, ())]
+            array = self._member_arrays[key] = np.fromiter(members, dtype=np.intp, count=len(members))
+        return array
+
+    def _similar_terms(self, word: str, min_similarity: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the IDs and similarities of up to MAX_TERMS terms similar to a query word."""
+        if len(word) < MIN_FUZZY_LENGTH:
+            term_id = self._term_ids.get(word)
+            term_ids = np.array([] if term_id is None else [term_id], dtype=np.intp)
+            return term_ids, np.ones(len(term_ids))
+
+        grams = trigrams(word)
+        arrays = [self._posting_array(gram) for gram in grams if gram in self._postings]
+        if not arrays:
+            return np.zeros(0, dtype=np.intp), np.zeros(0)
+        shared = np.bincount(np.concatenate(arrays), minlength=len(self._terms))
+        term_ids = np.flatnonzero(shared)
+        shared = shared[term_ids]
+        jaccard = shared / (len(grams) + self._term_sizes[term_ids] - shared)
+        similarity = (jaccard + shared / len(grams)) / 2
+
+        closest = np.arange(len(term_ids))
+        if len(term_ids) > EDIT_CANDIDATES:
+            closest = np.argpartition(-similarity, EDIT_CANDIDATES - 1)[:EDIT_CANDIDATES]
+        max_edits = 1 if len(word) <= MAX_ONE_EDIT_LENGTH else 2
+        for i in closest:
+            term = self._terms[term_ids[i]]
+            edits = edit_distance(word, term)
+            if edits <= max_edits:
+                similarity[i] = max(similarity[i], 1 - edits / max(len(word), len(term)))
+
+        keep = similarity >= min_similarity
+        term_ids, similarity = term_ids[keep], similarity[keep]
+        if len(term_ids) > MAX_TERMS:
+            top = np.argpartition(-similarity, MAX_TERMS - 1)[:MAX_TERMS]
+            term_ids, similarity = term_ids[top], similarity[top]
+        return term_ids, similarity
+
+    def match_terms(self, word: str, min_similarity: float = MIN_SIMILARITY) -> List[Tuple[str, float]]:
+        """Get the indexed terms similar to a query word.
+
+        Returns:
+            Up to MAX_TERMS (term, similarity) pairs, most similar first
+        """
+        term_ids, similarity = self._similar_terms(word.lower(), min_similarity)
+        order = np.lexsort((term_ids, -similarity))
+        return [(self._terms[term_ids[i]], float(similarity[i])) for i in order]
+
+    def _word_scores(self, word: str, min_similarity: float) -> np.ndarray:
+        """Get the best field-weighted similarity to a query word of the terms of each slot."""
+        entries = [
+            (similarity * FIELD_WEIGHTS[field], term_id, field)
+            for term_id, similarity in zip(*self._similar_terms(word, min_similarity))
+            for field in self._term_members[term_id]
+        ]
+        scores = np.zeros(len(self._ids))
+        # Lowest score first, so each slot ends up with its best one
+        for score, term_id, field in sorted(entries):
+            scores[self._member_slots(term_id, field)] = score
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None,
+               min_similarity: float = MIN_SIMILARITY) -> List[Tuple[str, float]]:
+        """Find the agents with a name, tag, LLM or provider name similar to a query.
+
+        An agent scores the mean over the query words of its best match for each
+        word. The words run together are matched as well, so "lama index" finds
+        "LlamaIndex"; an agent keeps the better of both scores.
+
+        Args:
+            query: Search text, possibly misspelled
+            limit: Maximum number of results (all matches if None)
+            min_similarity: Similarity (0 to 1) a term, and an agent's score, needs to match
+
+        Returns:
+            (agent_id, score) pairs, best match first (ties in slot order)
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words or not self._slots:
+            return []
+        scores = sum(self._word_scores(word, min_similarity) for word in words) / len(words)
+        if len(words) > 1:
+            np.maximum(scores, self._word_scores("".join(words), min_similarity), out=scores)
+
+        slots = np.flatnonzero(scores >= min_similarity)
+        slots = slots[np.argsort(-scores[slots], kind="stable")][:limit]
+        ids = self._ids
+        return [(ids[slot], score) for slot, score in zip(slots.tolist(), scores[slots].tolist())]
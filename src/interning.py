@@ -0,0 +1,67 @@
+import sys
+from typing import Any, Dict, Hashable, Iterable, List, TypeVar
+from pydantic import BaseModel
+from schema import AgentMetadata, SharedFieldsSet
+
+
+T = TypeVar("T", bound=Hashable)
+
+
+class InternPool:
+    """Shares equal values between the records of a catalog.
+
+    Thousands of agents repeat the same tags, model names, provider IDs and
+    framework names, and their models the same sets of explicitly set fields.
+    Strings are interned with sys.intern; other immutable values and the
+    fields sets (as SharedFieldsSet, copied on write by CompactModel) are
+    kept here. Provider objects and enum members are shared already.
+    """
+
+    def __init__(self):
+        self._values: Dict[Any, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def intern(self, value: T) -> T:
+        """Get the shared instance of an immutable value."""
+        return self._values.setdefault(value, value)
+
+    def intern_strings(self, values: Iterable[str]) -> List[str]:
+        """Get a list of the interned strings."""
+        return [sys.intern(value) for value in values]
+
+    def share_fields_set(self, model: BaseModel):
+        """Replace a model's set of explicitly set fields with a shared equal one."""
+        fields = model.__pydantic_fields_set__
+        if type(fields) is SharedFieldsSet:
+            return
+        key = (SharedFieldsSet, frozenset(fields))
+        shared = self._values.get(key)
+        if shared is None:
+            shared = self._values[key] = SharedFieldsSet(fields)
+        object.__setattr__(model, "__pydantic_fields_set__", shared)
+
+    def compact_agent(self, agent: AgentMetadata):
+        """Share the repeated values of an agent, in place.
+
+        Values are replaced through the model's __dict__, which keeps the fields
+        sets shared (assigning an attribute would give the model its own copy).
+        """
+        fields = agent.__dict__
+        fields["version"] = sys.intern(agent.version)
+        fields["provider_id"] = sys.intern(agent.provider_id)
+        fields["tags"] = self.intern_strings(agent.tags)
+        agent.features.__dict__["reasoning_frameworks"] = self.intern_strings(agent.features.reasoning_frameworks)
+
+        for llm in agent.supported_llms:
+            llm.__dict__["model_name"] = sys.intern(llm.model_name)
+        for item in agent.supported_llms + agent.vector_stores + agent.memory_stores:
+            if item.provider_id:
+                item.__dict__["provider_id"] = sys.intern(item.provider_id)
+        for item in agent.vector_stores + agent.memory_stores:
+            item.__dict__["name"] = sys.intern(item.name)
+
+        for model in (agent, agent.features, agent.resource_requirements, *agent.supported_llms,
+                      *agent.vector_stores, *agent.memory_stores, *agent.code_snippets):
+            self.share_fields_set(model)
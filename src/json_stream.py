@@ -0,0 +1,138 @@
+import json
+import re
+from typing import Any, Generator, Iterator, Optional, TextIO, Tuple, Union
+
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Characters read from a file at a time
+CHUNK_SIZE = 1 << 20
+
+_decoder = json.JSONDecoder()
+
+
+class _Window:
+    """The part of a document read but not consumed yet.
+
+    Positions are relative to text, which starts at offset start of the document.
+    """
+
+    def __init__(self, source: Union[str, TextIO], chunk_size: int):
+        if isinstance(source, str):
+            self.text, self.file, self.eof = source, None, True
+        else:
+            self.text, self.file, self.eof = "", source, False
+        self.start = 0
+        self.chunk_size = chunk_size
+
+    def read(self, size: int = 0) -> bool:
+        """Append at least a chunk (or size characters) of the document; False at its end."""
+        if self.eof:
+            return False
+        chunk = self.file.read(max(size, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.text += chunk
+        return True
+
+    def trim(self, pos: int) -> int:
+        """Drop the text before pos once a chunk of it was consumed; returns pos in the new text."""
+        if pos < self.chunk_size:
+            return pos
+        self.text = self.text[pos:]
+        self.start += pos
+        return 0
+
+    def skip(self, pos: int) -> int:
+        """Get the position of the next non-whitespace character (the end of text at the end of the document)."""
+        while True:
+            pos = WHITESPACE.match(self.text, pos).end()
+            if pos < len(self.text) or not self.read():
+                return pos
+
+    def expect(self, pos: int, char: str) -> int:
+        """Check that the document has char at pos (after whitespace) and get the position after it."""
+        pos = self.skip(pos)
+        if not self.text.startswith(char, pos):
+            raise ValueError(f"Expected {char!r} at offset {self.start + pos}")
+        return pos + 1
+
+    def at(self, pos: int, char: str) -> bool:
+        """Check whether the next non-whitespace character from pos is char."""
+        return self.text.startswith(char, self.skip(pos))
+
+    def decode(self, pos: int) -> Tuple[Any, int]:
+        """Decode the JSON value at pos, reading on while it may continue past the text read so far."""
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, pos)
+                # A number or literal ending the text may go on in the next chunk
+                if end < len(self.text) or self.eof:
+                    return value, end
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Read at least as much again as the value has so far, so large values are decoded a few times only
+            self.read(len(self.text) - pos)
+
+
+def _iter_array(window: _Window, pos: int) -> Generator[Tuple[Optional[str], Any, int], None, int]:
+    """Decode the elements of the array starting at pos; returns the position after it."""
+    pos = window.skip(window.expect(pos, "["))
+    if window.at(pos, "]"):
+        return window.skip(pos) + 1
+    while True:
+        element, pos = window.decode(pos)
+        yield None, element, window.start + pos
+        pos = window.skip(window.trim(pos))
+        if window.at(pos, "]"):
+            return pos + 1
+        pos = window.skip(window.expect(pos, ","))
+
+
+def iter_json(source: Union[str, TextIO], stream_key: str,
+              chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[Optional[str], Any, int]]:
+    """Decode a JSON document incrementally.
+
+    The document is either an array or an object with an array member named
+    stream_key. Elements of that array are yielded one at a time as
+    (None, element, offset); other members of the object are decoded whole and
+    yielded as (key, value, offset). offset is the character offset in the
+    document after the yielded value, e.g. for progress reporting.
+
+    Args:
+        source: The document, or a text file it is read from a chunk at a time, so
+            elements are yielded before the rest of the file is read and only the
+            part not consumed yet is kept in memory
+        stream_key: Name of the streamed array member
+        chunk_size: Characters read from a file at a time
+
+    Raises:
+        ValueError: If the document is not valid JSON of that shape
+    """
+    window = _Window(source, chunk_size)
+    pos = window.skip(0)
+    if window.at(pos, "["):
+        pos = yield from _iter_array(window, pos)
+    else:
+        pos = window.skip(window.expect(pos, "{"))
+        closed = window.at(pos, "}")
+        if closed:
+            pos += 1
+        while not closed:
+            key, pos = window.decode(pos)
+            if not isinstance(key, str):
+                raise ValueError(f"Expected an object key before offset {window.start + pos}")
+            pos = window.skip(window.expect(pos, ":"))
+            if key == stream_key:
+                pos = yield from _iter_array(window, pos)
+            else:
+                value, pos = window.decode(pos)
+                yield key, value, window.start + pos
+                pos = window.trim(pos)
+            pos = window.skip(pos)
+            closed = window.at(pos, "}")
+            pos = pos + 1 if closed else window.skip(window.expect(pos, ","))
+    if window.skip(pos) != len(window.text):
+        raise ValueError(f"Extra data at offset {window.start + pos}")
@@ -7,7 +7,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from schema import Provider, ProviderType
-from database import JSONDatabase
+from database import get_database
 from utils import url_input
 
 # Set page configuration
@@ -19,7 +19,7 @@ st.set_page_config(
 )
 
 # Initialize database
-db = JSONDatabase()
+db = get_database()
 
 # Page title
 st.header("🏢 Agent Providers & Frameworks")
@@ -99,7 +99,8 @@ with tab1:
                 with cols[i % 3]:
                     with st.container(border=True):
                         st.subheader(provider.name)
-                        st.caption(provider.provider_type.value.capitalize())
+                        agent_count = len(db.get_agents_by_provider(provider.id))
+                        st.caption(f"{provider.provider_type.value.capitalize()} • {agent_count} agents")
                         
                         # Truncate description if too long
                         desc = provider.description
@@ -180,7 +181,7 @@ with tab1:
                         with col2:
                             if st.button("Delete", key=f"delete_{provider.id}"):
                                 # Check if provider has any agents
-                                agents_with_provider = [a for a in db.get_all_agents() if a.provider_id == provider.id]
+                                agents_with_provider = db.get_agents_by_provider(provider.id)
                                 
                                 if agents_with_provider:
                                     st.error(f"Cannot delete provider: {len(agents_with_provider)} agents are using this provider.")
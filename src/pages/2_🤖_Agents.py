@@ -2,6 +2,7 @@ import streamlit as st
 import datetime
 import os
 import sys
+import tempfile
 import uuid
 
 # Add the parent directory to the path so we can import our modules
@@ -13,7 +14,8 @@ from schema import (
     LLMSupport, VectorStore, MemoryStore, CodeSnippet,
     ResourceRequirement, ProviderType
 )
-from database import JSONDatabase
+from database import get_database
+from bulk_export import EXPORT_FIELDS, EXPORT_FORMATS, export_agents
 from utils import url_input, get_provider_options
 
 # Set page configuration
@@ -25,7 +27,7 @@ st.set_page_config(
 )
 
 # Initialize database
-db = JSONDatabase()
+db = get_database()
 
 # Page title
 st.header("🤖 Manage Agents")
@@ -142,21 +144,15 @@ with tab1:
         )
     
     # Get and filter agents
-    agents = db.get_all_agents()
-    
-    # Apply provider filter
-    if provider_filter != "all":
-        agents = [a for a in agents if a.provider_id == provider_filter]
-    
-    # Apply domain filter
-    if domain_filter != "all":
-        domain_enum = AgentDomain(domain_filter)
-        agents = [a for a in agents if domain_enum in a.domains]
+    agents = db.filter_agents(
+        provider_id=provider_filter if provider_filter != "all" else None,
+        domains=[domain_filter] if domain_filter != "all" else None
+    )
     
-    # Apply search query
+    # Apply search query (misspelled queries fall back to close matches)
     if search_query:
-        search_query = search_query.lower()
-        agents = [a for a in agents if search_query in a.name.lower() or search_query in a.description.lower()]
+        filtered_ids = {a.id for a in agents}
+        agents = [a for a in db.search_agents(search_query, fuzzy=True) if a.id in filtered_ids]
     
     # Display results
     if not agents:
@@ -240,7 +236,37 @@ with tab1:
                 },
                 hide_index=True
             )
-            
+
+            # Export the filtered agents, written to a temporary file when the download is clicked
+            with st.expander("Export"):
+                export_col1, export_col2 = st.columns([1, 3])
+                with export_col1:
+                    export_format = st.radio("Format", EXPORT_FORMATS, format_func=str.upper, horizontal=True)
+                with export_col2:
+                    export_fields = st.multiselect("Fields", EXPORT_FIELDS, placeholder="All fields")
+
+                # The same search (with its fuzzy fallback) and filters as the list above
+                export_filters = dict(
+                    query=search_query,
+                    provider_id=provider_filter if provider_filter != "all" else None,
+                    domains=[domain_filter] if domain_filter != "all" else None,
+                    fuzzy=True
+                )
+                export_count, _ = db.query_agents(**export_filters, limit=0)
+
+                def export_file():
+                    f = tempfile.TemporaryFile()
+                    export_agents(db, f, export_format, export_fields or None, **export_filters)
+                    f.seek(0)
+                    return f
+
+                st.download_button(
+                    f"Download {export_count} agents",
+                    data=export_file,
+                    file_name=f"agents.{export_format}",
+                    mime="text/csv" if export_format == "csv" else "application/x-ndjson"
+                )
+
             # Agent selection for actions
             selected_agent_id = st.selectbox(
                 "Select an agent for actions", 
@@ -1,4 +1,5 @@
 import streamlit as st
+import pandas as pd
 import os
 import sys
 
@@ -6,8 +7,8 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from schema import AgentDomain, PlanningCapability, ToolUseCapability, MemoryType
-from database import JSONDatabase
-from utils import get_provider_options
+from database import get_database
+from utils import get_provider_options, show_load_progress
 
 # Set page configuration
 st.set_page_config(
@@ -18,7 +19,7 @@ st.set_page_config(
 )
 
 # Initialize database
-db = JSONDatabase()
+db = get_database()
 
 # Page title
 st.header("🔍 Browse & Search Agents")
@@ -26,17 +27,60 @@ st.markdown("""
 Find AI agents based on their capabilities, features, and domains. Use the filters on the sidebar to narrow down your search.
 """)
 
-# Get all data
-agents = db.get_all_agents()
+# A large catalog is loaded in the background; the first results come from the agents loaded so far
+loading = db.is_loading()
+if loading:
+    show_load_progress(db)
+
+# Get all data; agents are only materialized a page at a time (see query_page)
 providers = db.get_all_providers()
 
-if not agents:
+if not db.get_catalog_counts()["agents"] and not loading:
     st.info("No agents added yet. Go to the Agents section to add some.")
     st.stop()
 
 # Convert to dictionaries for easier lookups
 provider_dict = {p.id: p for p in providers}
 
+# Boolean feature filters: AgentFeatures flag -> checkbox label
+BOOLEAN_FILTERS = {
+    "multi_agent_collaboration": "Multi-agent Collaboration",
+    "human_in_the_loop": "Human-in-the-loop",
+    "autonomous": "Autonomous",
+    "supports_vision": "Vision Support",
+    "supports_audio": "Audio Support",
+}
+
+def get_filter_args():
+    """Build filter_agents arguments from the current filter widget state."""
+    state = st.session_state
+    features = {}
+    for facet in ("planning", "tool_use"):
+        if state.get(f"filter_{facet}", "all") != "all":
+            features[facet] = state[f"filter_{facet}"]
+    if state.get("filter_memory", "all") != "all":
+        features["memory"] = [state["filter_memory"]]
+    for flag in BOOLEAN_FILTERS:
+        if state.get(f"filter_{flag}"):
+            features[flag] = True
+    
+    provider_id = state.get("filter_provider", "all")
+    domain = state.get("filter_domain", "all")
+    return {
+        "provider_id": provider_id if provider_id != "all" else None,
+        "domains": [domain] if domain != "all" else None,
+        "features": features or None,
+        "tags": state.get("filter_tags") or None,
+    }
+
+# Per-facet counts for the current filters, resolved from the facet index
+filter_args = get_filter_args()
+facet_counts = db.get_facet_counts(**filter_args)
+
+def with_count(label, facet, value):
+    """Format a filter option with the number of agents it would match."""
+    return f"{label} ({facet_counts[facet].get(value, 0):,})"
+
 # Sidebar filters
 st.sidebar.header("Filters")
 
@@ -45,9 +89,10 @@ provider_options = get_provider_options(db, include_none=False)
 provider_options["all"] = "All Providers"
 filter_provider = st.sidebar.selectbox(
     "Provider", 
-    options=["all"] + list(provider_options.keys()),
-    format_func=lambda x: provider_options[x] if x != "all" else "All Providers",
-    index=0
+    options=["all"] + list(provider_options.keys())[:-1],
+    format_func=lambda x: with_count(provider_options[x], "provider", x) if x != "all" else "All Providers",
+    index=0,
+    key="filter_provider"
 )
 
 # Domain filter
@@ -56,8 +101,9 @@ domain_options["all"] = "All Domains"
 filter_domain = st.sidebar.selectbox(
     "Domain", 
     options=list(domain_options.keys()),
-    format_func=lambda x: domain_options[x].capitalize() if x != "all" else "All Domains",
-    index=list(domain_options.keys()).index("all")
+    format_func=lambda x: with_count(domain_options[x].capitalize(), "domain", x) if x != "all" else "All Domains",
+    index=list(domain_options.keys()).index("all"),
+    key="filter_domain"
 )
 
 # Feature filters
@@ -69,8 +115,9 @@ planning_options["all"] = "Any Planning"
 filter_planning = st.sidebar.selectbox(
     "Planning Capability", 
     options=list(planning_options.keys()),
-    format_func=lambda x: planning_options[x].capitalize() if x != "all" else "Any Planning",
-    index=list(planning_options.keys()).index("all")
+    format_func=lambda x: with_count(planning_options[x].capitalize(), "planning", x) if x != "all" else "Any Planning",
+    index=list(planning_options.keys()).index("all"),
+    key="filter_planning"
 )
 
 # Tool use capability filter
@@ -79,8 +126,9 @@ tool_use_options["all"] = "Any Tool Use"
 filter_tool_use = st.sidebar.selectbox(
     "Tool Use Capability", 
     options=list(tool_use_options.keys()),
-    format_func=lambda x: tool_use_options[x].capitalize() if x != "all" else "Any Tool Use",
-    index=list(tool_use_options.keys()).index("all")
+    format_func=lambda x: with_count(tool_use_options[x].capitalize(), "tool_use", x) if x != "all" else "Any Tool Use",
+    index=list(tool_use_options.keys()).index("all"),
+    key="filter_tool_use"
 )
 
 # Memory type filter
@@ -89,28 +137,27 @@ memory_options["all"] = "Any Memory Type"
 filter_memory = st.sidebar.selectbox(
     "Memory Type", 
     options=list(memory_options.keys()),
-    format_func=lambda x: memory_options[x].capitalize() if x != "all" else "Any Memory Type",
-    index=list(memory_options.keys()).index("all")
+    format_func=lambda x: with_count(memory_options[x].capitalize(), "memory", x) if x != "all" else "Any Memory Type",
+    index=list(memory_options.keys()).index("all"),
+    key="filter_memory"
 )
 
 # Boolean feature filters
 st.sidebar.subheader("Additional Features")
-filter_multi_agent = st.sidebar.checkbox("Multi-agent Collaboration")
-filter_human_in_loop = st.sidebar.checkbox("Human-in-the-loop")
-filter_autonomous = st.sidebar.checkbox("Autonomous")
-filter_vision = st.sidebar.checkbox("Vision Support")
-filter_audio = st.sidebar.checkbox("Audio Support")
+for flag, label in BOOLEAN_FILTERS.items():
+    st.sidebar.checkbox(with_count(label, flag, True), key=f"filter_{flag}")
 
 # Tag filter
 st.sidebar.subheader("Tags")
-all_tags = set()
-for agent in agents:
-    all_tags.update(agent.tags)
+# Tags matching the other filters, plus the ones already selected
+all_tags = set(facet_counts["tag"]) | set(st.session_state.get("filter_tags", []))
 
 if all_tags:
     selected_tags = st.sidebar.multiselect(
         "Filter by Tags",
-        options=sorted(all_tags)
+        options=sorted(all_tags),
+        format_func=lambda x: with_count(x, "tag", x),
+        key="filter_tags"
     )
 else:
     selected_tags = []
@@ -119,89 +166,77 @@ else:
 st.sidebar.subheader("Display Options")
 display_mode = st.sidebar.radio(
     "View as",
-    options=["Cards", "Compact List"],
+    options=["Cards", "Compact List", "Table"],
     horizontal=True
 )
+page_size = st.sidebar.selectbox("Results per page", options=[12, 24, 48, 96], index=1)
 
 # Main content area
 # Search box
-search_query = st.text_input("Search Agents", placeholder="Enter name, description, or tags...")
-
-# Apply filters
-filtered_agents = agents
-
-# Provider filter
-if filter_provider != "all":
-    filtered_agents = [agent for agent in filtered_agents if agent.provider_id == filter_provider]
-
-# Domain filter
-if filter_domain != "all":
-    filtered_agents = [agent for agent in filtered_agents if any(d.value == filter_domain for d in agent.domains)]
-
-# Planning capability filter
-if filter_planning != "all":
-    filtered_agents = [agent for agent in filtered_agents if agent.features.planning.value == filter_planning]
-
-# Tool use capability filter
-if filter_tool_use != "all":
-    filtered_agents = [agent for agent in filtered_agents if agent.features.tool_use.value == filter_tool_use]
-
-# Memory type filter
-if filter_memory != "all":
-    filtered_agents = [agent for agent in filtered_agents if any(m.value == filter_memory for m in agent.features.memory)]
-
-# Boolean feature filters
-if filter_multi_agent:
-    filtered_agents = [agent for agent in filtered_agents if agent.features.multi_agent_collaboration]
-
-if filter_human_in_loop:
-    filtered_agents = [agent for agent in filtered_agents if agent.features.human_in_the_loop]
-
-if filter_autonomous:
-    filtered_agents = [agent for agent in filtered_agents if agent.features.autonomous]
-
-if filter_vision:
-    filtered_agents = [agent for agent in filtered_agents if agent.features.supports_vision]
-
-if filter_audio:
-    filtered_agents = [agent for agent in filtered_agents if agent.features.supports_audio]
-
-# Tag filter
-if selected_tags:
-    filtered_agents = [
-        agent for agent in filtered_agents 
-        if any(tag in agent.tags for tag in selected_tags)
-    ]
+search_col, mode_col = st.columns([4, 1])
+with search_col:
+    search_query = st.text_input("Search Agents", placeholder="Enter name, description, or tags...")
+with mode_col:
+    semantic = st.toggle(
+        "Semantic search",
+        help="Match descriptions by meaning, e.g. 'writes SQL reports' also finds data analysis agents"
+    )
 
-# Search query
+# Sort options: label -> query_agents sort key
+sort_options = {"Name": "name", "Provider": "provider", "Updated Date": "updated_at"}
 if search_query:
-    query = search_query.lower()
-    filtered_agents = [
-        agent for agent in filtered_agents 
-        if query in agent.name.lower() 
-        or query in agent.description.lower()
-        or any(query in tag.lower() for tag in agent.tags)
-    ]
+    sort_options = {"Relevance": "relevance", **sort_options}
 
 # Display results
 col1, col2 = st.columns([3, 1])
-with col1:
-    st.subheader(f"Results ({len(filtered_agents)} agents)")
 with col2:
     # Add option to sort
     sort_option = st.selectbox(
         "Sort by",
-        options=["Name", "Provider", "Updated Date"],
+        options=list(sort_options.keys()),
         index=0
     )
-    
-    # Apply sorting
-    if sort_option == "Name":
-        filtered_agents = sorted(filtered_agents, key=lambda a: a.name)
-    elif sort_option == "Provider":
-        filtered_agents = sorted(filtered_agents, key=lambda a: provider_dict.get(a.provider_id, "").name if a.provider_id else "")
-    elif sort_option == "Updated Date":
-        filtered_agents = sorted(filtered_agents, key=lambda a: a.updated_at, reverse=True)
+
+# Only the agents on the requested page are materialized; the total comes from the indexes
+def query_page(page):
+    return db.query_agents(
+        search_query,
+        sort=sort_options[sort_option],
+        offset=(page - 1) * page_size,
+        limit=page_size,
+        semantic=semantic,
+        fuzzy=True,
+        **filter_args
+    )
+
+if semantic and search_query and (db.semantic_index is None
+                                  or db.semantic_index.needs_fit(db.get_catalog_counts()["agents"])):
+    # The first semantic search embeds the agents not embedded yet
+    with st.spinner("Preparing semantic search..."):
+        db.semantic_matches(search_query)
+
+# A keyword search no agent fully matches falls back to close matches, e.g. for misspelled names
+close_matches = bool(search_query.strip()) and not semantic and not db.search_agents(search_query, limit=1)
+if close_matches and db.fuzzy_index is None:
+    with st.spinner("Preparing typo-tolerant search..."):
+        db.fuzzy_matches(search_query)
+
+page = st.session_state.get("browse_page", 1)
+total_results, filtered_agents = query_page(page)
+num_pages = max(1, -(-total_results // page_size))
+if page > num_pages:
+    # The filters changed and the page no longer exists
+    page = st.session_state["browse_page"] = num_pages
+    total_results, filtered_agents = query_page(page)
+
+with col1:
+    st.subheader(f"Results ({total_results:,} agents{' so far' if loading else ''})")
+    if close_matches and total_results:
+        st.caption(f"No exact matches for '{search_query}'; showing close matches.")
+
+# Page navigation
+if num_pages > 1:
+    st.number_input(f"Page (of {num_pages:,})", min_value=1, max_value=num_pages, step=1, key="browse_page")
 
 if not filtered_agents:
     st.info("No agents match the current filters. Try adjusting your search criteria.")
@@ -248,7 +283,7 @@ else:
                     if st.button("View Details", key=f"view_{agent.id}"):
                         st.session_state["selected_agent"] = agent.id
                         st.rerun()
-    else:  # Compact List
+    elif display_mode == "Compact List":
         for agent in filtered_agents:
             with st.container(border=True):
                 col1, col2 = st.columns([3, 1])
@@ -282,6 +317,32 @@ else:
                     if st.button("View", key=f"view_compact_{agent.id}"):
                         st.session_state["selected_agent"] = agent.id
                         st.rerun()
+    else:  # Table
+        # A single dataframe for the page instead of per-agent widgets
+        table_data = pd.DataFrame([
+            {
+                "Name": agent.name,
+                "Version": agent.version,
+                "Provider": provider_dict[agent.provider_id].name if agent.provider_id in provider_dict else "Unknown",
+                "Domains": ", ".join([d.value for d in agent.domains]),
+                "Planning": agent.features.planning.value,
+                "Tool Use": agent.features.tool_use.value,
+                "Updated": agent.updated_at.strftime('%Y-%m-%d'),
+            }
+            for agent in filtered_agents
+        ])
+        selection = st.dataframe(
+            table_data,
+            hide_index=True,
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode="single-row"
+        )
+        
+        # Selecting a row opens its details
+        selected_rows = selection.selection.rows
+        if selected_rows:
+            st.session_state["selected_agent"] = filtered_agents[selected_rows[0]].id
 
 # Agent details section
 if "selected_agent" in st.session_state:
@@ -481,5 +542,21 @@ if "selected_agent" in st.session_state:
                 else:
                     st.info("No code snippets available for this agent.")
             
+            # Agents with the most similar features
+            similar_agents = db.get_similar_agents(agent.id, limit=5)
+            if similar_agents:
+                st.subheader("Similar Agents")
+                similar_cols = st.columns(len(similar_agents))
+                for col, (similar_agent, score) in zip(similar_cols, similar_agents):
+                    with col:
+                        with st.container(border=True):
+                            st.markdown(f"**{similar_agent.name}**")
+                            similar_provider = provider_dict.get(similar_agent.provider_id)
+                            provider_name = similar_provider.name if similar_provider else "Unknown"
+                            st.caption(f"{provider_name} • {score:.0%} similar")
+                            if st.button("View", key=f"similar_{similar_agent.id}"):
+                                st.session_state["selected_agent"] = similar_agent.id
+                                st.rerun()
+            
             # Compare button at the bottom of the details
             st.button("Compare with other agents", on_click=lambda: st.switch_page("pages/4_📊_Compare_Agents.py"))
\ No newline at end of file
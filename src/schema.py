@@ -55,6 +55,25 @@ class AgentDomain(str, Enum):
     OTHER = "other"              # Defined but outside current categories
 
 
+class SharedFieldsSet(set):
+    """A model's set of explicitly set fields, shared by equal records (see CompactModel)."""
+
+
+class CompactModel(BaseModel):
+    """Model whose set of explicitly set fields may be shared with other instances.
+
+    Loading replaces equal sets with one SharedFieldsSet; assigning a field
+    not in it yet first gives the instance its own copy, so the others are not
+    affected.
+    """
+
+    def __setattr__(self, name: str, value: Any):
+        fields_set = self.__pydantic_fields_set__
+        if type(fields_set) is SharedFieldsSet and name not in fields_set:
+            object.__setattr__(self, "__pydantic_fields_set__", set(fields_set))
+        super().__setattr__(name, value)
+
+
 class Provider(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -71,7 +90,7 @@ class Provider(BaseModel):
     support_url: Optional[HttpUrl] = None
 
 
-class LLMSupport(BaseModel):
+class LLMSupport(CompactModel):
     model_name: str
     provider_id: Optional[str] = None
     provider: Optional[Provider] = None  # Populated from provider_id
@@ -80,7 +99,7 @@ class LLMSupport(BaseModel):
     performance_rating: Optional[int] = None  # 1-5 scale
 
 
-class VectorStore(BaseModel):
+class VectorStore(CompactModel):
     name: str
     provider_id: Optional[str] = None
     provider: Optional[Provider] = None  # Populated from provider_id
@@ -90,7 +109,7 @@ class VectorStore(BaseModel):
     notes: Optional[str] = None
 
 
-class MemoryStore(BaseModel):
+class MemoryStore(CompactModel):
     name: str
     type: MemoryType
     provider_id: Optional[str] = None
@@ -100,14 +119,14 @@ class MemoryStore(BaseModel):
     notes: Optional[str] = None
 
 
-class CodeSnippet(BaseModel):
+class CodeSnippet(CompactModel):
     language: str
     code: str
     description: str
     import_requirements: Optional[List[str]] = None
 
 
-class AgentFeatures(BaseModel):
+class AgentFeatures(CompactModel):
     planning: PlanningCapability = PlanningCapability.NONE
     memory: List[MemoryType] = [MemoryType.NONE]
     tool_use: ToolUseCapability = ToolUseCapability.NONE
@@ -122,7 +141,7 @@ class AgentFeatures(BaseModel):
     custom_features: Dict[str, Any] = {}
 
 
-class ResourceRequirement(BaseModel):
+class ResourceRequirement(CompactModel):
     min_cpu: Optional[str] = None
     recommended_cpu: Optional[str] = None
     min_ram: Optional[str] = None
@@ -134,7 +153,7 @@ class ResourceRequirement(BaseModel):
 
 
 
-class AgentMetadata(BaseModel):
+class AgentMetadata(CompactModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     description: str
@@ -149,7 +168,7 @@ class AgentMetadata(BaseModel):
     supported_llms: List[LLMSupport] = []
     vector_stores: List[VectorStore] = []
     memory_stores: List[MemoryStore] = []
-    resource_requirements: ResourceRequirement = ResourceRequirement()
+    resource_requirements: ResourceRequirement = Field(default_factory=ResourceRequirement)
     
     # Usage information
     domains: List[AgentDomain] = [AgentDomain.GENERAL]
@@ -0,0 +1,238 @@
+import math
+import sys
+import re
+import heapq
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from schema import AgentMetadata
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Relative weight of a term occurrence in each indexed agent field
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "tags": 2.0,
+    "reasoning_frameworks": 1.5,
+    "description": 1.0,
+    "example_prompts": 0.5,
+    "code_snippets": 0.5,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def agent_field_texts(agent: AgentMetadata, details: Optional[Dict[str, Any]] = None) -> Dict[str, List[str]]:
+    """Get the searchable text of an agent, grouped by field.
+    
+    Args:
+        agent: The agent
+        details: Persisted detail fields not parsed into the agent yet, if any
+    """
+    details = details or {}
+    if "code_snippets" in details:
+        snippet_descriptions = [snippet["description"] for snippet in details["code_snippets"]]
+    else:
+        snippet_descriptions = [snippet.description for snippet in agent.code_snippets]
+    return {
+        "name": [agent.name],
+        "tags": list(agent.tags),
+        "reasoning_frameworks": list(agent.features.reasoning_frameworks),
+        "description": [agent.description],
+        "example_prompts": list(details.get("example_prompts", agent.example_prompts)),
+        "code_snippets": snippet_descriptions,
+    }
+
+
+def record_field_texts(record: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Get the searchable text of a persisted agent (as in agent_field_texts), grouped by field."""
+    return {
+        "name": [record.get("name", "")],
+        "tags": list(record.get("tags", [])),
+        "reasoning_frameworks": list(record.get("features", {}).get("reasoning_frameworks", [])),
+        "description": [record.get("description", "")],
+        "example_prompts": list(record.get("example_prompts", [])),
+        "code_snippets": [snippet["description"] for snippet in record.get("code_snippets", [])],
+    }
+
+
+def document_terms(field_texts: Dict[str, List[str]]) -> Dict[str, float]:
+    """Get the field-weighted frequency of every term in an agent's searchable text."""
+    terms: Counter = Counter()
+    for field, texts in field_texts.items():
+        weight = FIELD_WEIGHTS[field]
+        for text in texts:
+            for token in tokenize(text):
+                terms[token] += weight
+    return terms
+
+
+class SearchIndex:
+    """Inverted index over agent text fields with BM25 ranking.
+
+    Term frequencies are weighted by field (see FIELD_WEIGHTS). Query terms are
+    combined with AND; each term also matches indexed terms it is a prefix of,
+    so partial words work while typing. Agents can be added and removed
+    individually.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_expansions: int = 50):
+        self.k1 = k1
+        self.b = b
+        self.max_expansions = max_expansions
+
+        # term -> {agent_id -> weighted term frequency}
+        self.postings: Dict[str, Dict[str, float]] = {}
+        # agent_id -> its indexed terms (the postings keys, shared), needed to remove it
+        self._doc_terms: Dict[str, Tuple[str, ...]] = {}
+        # Kept up to date on every add and remove, so length normalization needs no pass over all agents
+        self._doc_lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        # Sorted vocabulary for prefix lookups
+        self._terms: List[str] = []
+        # Derived from the current contents; reset whenever an agent is added or removed
+        self._score_cache: Dict[Tuple[str, bool], Dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def add(self, agent: AgentMetadata, details: Optional[Dict[str, Any]] = None):
+        """Index an agent, replacing any previous version of it.
+
+        Args:
+            agent: The agent
+            details: Persisted detail fields not parsed into the agent yet, if any
+        """
+        self.add_terms(agent.id, document_terms(agent_field_texts(agent, details)))
+
+    def add_terms(self, agent_id: str, terms: Dict[str, float]):
+        """Index an agent from its precomputed document_terms, replacing any previous version of it."""
+        self.remove(agent_id)
+
+        doc_terms = []
+        for term, frequency in terms.items():
+            # One string per term, however many agents use it
+            term = sys.intern(term)
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                insort(self._terms, term)
+            postings[agent_id] = frequency
+            doc_terms.append(term)
+
+        length = sum(terms.values())
+        self._doc_terms[agent_id] = tuple(doc_terms)
+        self._doc_lengths[agent_id] = length
+        self._total_length += length
+        self._invalidate()
+
+    def remove(self, agent_id: str):
+        """Remove an agent from the index if present."""
+        terms = self._doc_terms.pop(agent_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self.postings[term]
+            del postings[agent_id]
+            if not postings:
+                del self.postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+        self._total_length -= self._doc_lengths.pop(agent_id)
+        self._invalidate()
+
+    def _invalidate(self):
+        """Drop cached scores after the indexed contents changed."""
+        self._score_cache = {}
+
+    def _expand(self, token: str, prefix: bool) -> List[str]:
+        """Get the indexed terms matching a query token."""
+        if not prefix:
+            return [token] if token in self.postings else []
+
+        matches = []
+        i = bisect_left(self._terms, token)
+        while i < len(self._terms) and self._terms[i].startswith(token):
+            matches.append(self._terms[i])
+            i += 1
+
+        if len(matches) > self.max_expansions:
+            # Keep the exact term and the most common completions
+            completions = heapq.nlargest(
+                self.max_expansions, (t for t in matches if t != token),
+                key=lambda t: len(self.postings[t])
+            )
+            matches = ([token] if token in self.postings else []) + completions
+        return matches
+
+    def _norm_coefficients(self) -> Tuple[float, float]:
+        """Get (base, per_length) so an agent's BM25 length normalization is base + per_length * its length.
+
+        Computed from the running total length, so an edit costs nothing here.
+        """
+        avg_length = self._total_length / len(self._doc_lengths) or 1.0
+        return self.k1 * (1 - self.b), self.k1 * self.b / avg_length
+
+    def _token_scores(self, token: str, prefix: bool) -> Dict[str, float]:
+        """Get the BM25 score of every agent matching a query token."""
+        key = (token, prefix)
+        scores = self._score_cache.get(key)
+        if scores is not None:
+            return scores
+
+        base, per_length = self._norm_coefficients()
+        lengths = self._doc_lengths
+        num_docs = len(self._doc_terms)
+        scores = {}
+        for term in self._expand(token, prefix):
+            postings = self.postings[term]
+            idf = math.log(1 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            # Completions rank below exact matches of the same term
+            factor = idf * (self.k1 + 1) * (1.0 if term == token else 0.8)
+            term_scores = {
+                agent_id: factor * frequency / (frequency + base + per_length * lengths[agent_id])
+                for agent_id, frequency in postings.items()
+            }
+            if not scores:
+                scores = term_scores
+            else:
+                for agent_id, score in term_scores.items():
+                    if score > scores.get(agent_id, 0.0):
+                        scores[agent_id] = score
+
+        if len(self._score_cache) >= 1000:
+            self._score_cache.clear()
+        self._score_cache[key] = scores
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = None, prefix: bool = True) -> List[Tuple[str, float]]:
+        """Search the index.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results (all matches if None)
+            prefix: Whether query tokens also match longer terms starting with them
+
+        Returns:
+            List of (agent_id, score) pairs, best match first
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_terms:
+            return []
+
+        # Intersect starting from the rarest token so the candidate set shrinks quickly
+        token_scores = sorted((self._token_scores(token, prefix) for token in tokens), key=len)
+        scores = token_scores[0]
+        for other in token_scores[1:]:
+            scores = {agent_id: score + other[agent_id] for agent_id, score in scores.items() if agent_id in other}
+            if not scores:
+                return []
+
+        if limit is not None:
+            return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
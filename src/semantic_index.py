@@ -0,0 +1,441 @@
+import json
+import os
+import random
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from schema import AgentMetadata
+from search_index import tokenize
+
+
+# Hash buckets words are counted in, so no vocabulary has to be kept
+HASH_FEATURES = 2 ** 14
+
+# Size of an embedding (less for catalogs with fewer agents)
+EMBEDDING_DIM = 128
+
+# Extra random directions and power iterations of the randomized SVD
+SVD_OVERSAMPLING = 10
+SVD_POWER_ITERATIONS = 1
+
+# Agents sampled to fit the embedder and the ANN clusters
+FIT_SAMPLE_SIZE = 20_000
+
+# Agents embedded at a time
+EMBED_BATCH_SIZE = 4096
+
+# Smaller catalogs are searched exhaustively instead of through clusters
+ANN_MIN_AGENTS = 5000
+
+# Clusters scanned per query
+ANN_PROBES = 64
+
+# The embedder is fitted again once the catalog has grown this many times over
+REFIT_GROWTH = 2
+
+
+def semantic_text(agent: AgentMetadata) -> str:
+    """Get the text of an agent that is embedded: its name, description and tags."""
+    return "\n".join([agent.name, agent.description, *agent.tags])
+
+
+def text_fingerprint(agent_id: str, text: str) -> int:
+    """Checksum of an agent's embedded text, used to tell which stored embeddings are stale."""
+    return zlib.crc32(f"{agent_id}\n{text}".encode())
+
+
+@lru_cache(maxsize=200_000)
+def _term_bucket(term: str) -> int:
+    # crc32, unlike hash(), gives the same bucket in every process
+    return zlib.crc32(term.encode()) % HASH_FEATURES
+
+
+def hashed_counts(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count the words of texts per hash bucket.
+
+    Returns:
+        (text, bucket, count) arrays of a sparse matrix, sorted by text and bucket
+    """
+    buckets: List[int] = []
+    lengths: List[int] = []
+    for text in texts:
+        tokens = tokenize(text)
+        buckets.extend(map(_term_bucket, tokens))
+        lengths.append(len(tokens))
+    rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+    keys, counts = np.unique(rows * HASH_FEATURES + np.array(buckets, dtype=np.int64), return_counts=True)
+    return keys // HASH_FEATURES, keys % HASH_FEATURES, counts
+
+
+def _sparse_dot(index: np.ndarray, other: np.ndarray, weights: np.ndarray, dense: np.ndarray,
+                size: int, chunk: int = 1 << 17) -> np.ndarray:
+    """Multiply a sparse matrix given as (index, other, weight) entries by a dense one.
+
+    Row index of the result is the sum of weight * dense[other] over the
+    entries of that index, which must be sorted by index; the same entries
+    sorted by other multiply by the transpose. Entries are summed a chunk at
+    a time with reduceat, bounding the memory used.
+    """
+    out = np.zeros((size, dense.shape[1]), dtype=np.float32)
+    for start in range(0, len(index), chunk):
+        target = index[start:start + chunk]
+        values = dense[other[start:start + chunk]] * weights[start:start + chunk, None]
+        starts = np.flatnonzero(np.r_[True, target[1:] != target[:-1]])
+        out[target[starts]] += np.add.reduceat(values, starts, axis=0)
+    return out
+
+
+def _orthonormalize(vectors: np.ndarray) -> np.ndarray:
+    """Get an orthonormal basis of the columns of a tall matrix.
+
+    Uses the eigenvectors of the small Gram matrix, which is much faster than
+    a QR decomposition here, and drops directions the columns do not span.
+    """
+    values, directions = np.linalg.eigh((vectors.T @ vectors).astype(np.float64))
+    keep = values > values.max(initial=0) * 1e-6
+    return vectors @ (directions[:, keep] / np.sqrt(values[keep])).astype(np.float32)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+
+class TextEmbedder:
+    """Latent semantic analysis of hashed TF-IDF word counts.
+
+    Texts are mapped to the top singular directions of the TF-IDF matrix of the
+    catalog they were fitted on, so words that occur in the same descriptions
+    ("sql", "data", "analysis") end up close together even when a query and a
+    description share none of them. Runs offline on numpy alone.
+    """
+
+    def __init__(self, idf: np.ndarray, components: np.ndarray):
+        self.idf = idf
+        # HASH_FEATURES x dim projection
+        self.components = components
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[1]
+
+    def _tf_idf(self, rows: np.ndarray, cols: np.ndarray, counts: np.ndarray, size: int) -> np.ndarray:
+        """Get the unit-length (per text) TF-IDF weights of hashed_counts entries."""
+        weights = ((1 + np.log(counts)) * self.idf[cols]).astype(np.float32)
+        norms = np.sqrt(np.bincount(rows, weights * weights, minlength=size)).astype(np.float32)
+        return weights / norms[rows]
+
+    @classmethod
+    def fit(cls, texts: List[str], dim: int = EMBEDDING_DIM, seed: int = 0) -> "TextEmbedder":
+        """Fit an embedder to a corpus with a randomized SVD of its TF-IDF matrix."""
+        rows, cols, counts = hashed_counts(texts)
+        size = len(texts)
+        df = np.bincount(cols, minlength=HASH_FEATURES)
+        embedder = cls((np.log((1 + size) / (1 + df)) + 1).astype(np.float32), None)
+        weights = embedder._tf_idf(rows, cols, counts, size)
+        # The entries sorted by bucket, for products with the transpose
+        order = np.argsort(cols, kind="stable")
+        t_rows, t_cols, t_weights = cols[order], rows[order], weights[order]
+
+        rng = np.random.default_rng(seed)
+        rank = max(1, min(dim, size))
+        omega = rng.standard_normal((HASH_FEATURES, rank + SVD_OVERSAMPLING)).astype(np.float32)
+        basis = _orthonormalize(_sparse_dot(rows, cols, weights, omega, size))
+        for _ in range(SVD_POWER_ITERATIONS):
+            basis = _orthonormalize(_sparse_dot(t_rows, t_cols, t_weights, basis, HASH_FEATURES))
+            basis = _orthonormalize(_sparse_dot(rows, cols, weights, basis, size))
+        # The left singular vectors of X^T Q are the right singular vectors of X
+        projected = _sparse_dot(t_rows, t_cols, t_weights, basis, HASH_FEATURES)
+        embedder.components = np.ascontiguousarray(np.linalg.svd(projected, full_matrices=False)[0][:, :rank])
+        return embedder
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts as unit-length vectors, one row each (zero for texts without words)."""
+        rows, cols, counts = hashed_counts(texts)
+        weights = self._tf_idf(rows, cols, counts, len(texts))
+        return _normalize_rows(_sparse_dot(rows, cols, weights, self.components, len(texts)))
+
+
+def cluster_centroids(vectors: np.ndarray, num_clusters: int, iterations: int = 8, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors with spherical k-means, returning the unit-length centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), num_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = nearest_centroids(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        # A cluster that lost all its vectors keeps its centroid
+        empty = np.bincount(labels, minlength=num_clusters) == 0
+        sums[empty] = centroids[empty]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+    """Get the index of the closest centroid of each vector."""
+    labels = np.zeros(len(vectors), dtype=np.int32)
+    if len(centroids) > 1:
+        for start in range(0, len(vectors), chunk):
+            labels[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+    return labels
+
+
+class SemanticIndex:
+    """Approximate nearest-neighbour search over agent text embeddings.
+
+    Embeddings are rows of a memory-mapped matrix in a directory of their own,
+    next to the text fingerprint of every row, so reopening the index only
+    embeds the agents whose text changed since. Rows are grouped into clusters
+    (an inverted file): a query scans the rows of the ANN_PROBES clusters
+    closest to it. Rows of removed agents are kept until the row is needed,
+    so an update that leaves the text alone costs no embedding.
+
+    Files: model.npz (embedder and cluster centroids), embeddings.npy,
+    fingerprints.npy (both memory-mapped) and ids.json (agent ID per row).
+    """
+
+    def __init__(self, directory: str, dim: int = EMBEDDING_DIM, ann_min_agents: int = ANN_MIN_AGENTS):
+        self.directory = directory
+        self.dim = dim
+        self.ann_min_agents = ann_min_agents
+        self.embedder: Optional[TextEmbedder] = None
+        self.centroids = np.zeros((1, 0), dtype=np.float32)
+        # Catalog size the embedder was fitted at
+        self.fitted_size = 0
+
+        self._vectors: Optional[np.ndarray] = None
+        self._fingerprints: Optional[np.ndarray] = None
+        self._clusters = np.zeros(0, dtype=np.int32)
+        self._active = np.zeros(0, dtype=bool)
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        # agent_id -> row of a removed agent, still holding its embedding
+        self._released: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._ids_dirty = False
+        # Rows sorted by cluster and where each cluster starts; rebuilt after changes
+        self._order: Optional[np.ndarray] = None
+        self._bounds: Optional[np.ndarray] = None
+        self._open()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self):
+        """Map the stored embeddings, if there are any and they fit together."""
+        try:
+            with np.load(self._path("model.npz")) as model:
+                embedder = TextEmbedder(model["idf"], model["components"])
+                centroids = model["centroids"]
+                fitted_size = int(model["fitted_size"])
+            vectors = np.load(self._path("embeddings.npy"), mmap_mode="r+")
+            fingerprints = np.load(self._path("fingerprints.npy"), mmap_mode="r+")
+            with open(self._path("ids.json")) as f:
+                ids = json.load(f)
+        except (OSError, ValueError, KeyError):
+            return
+        if vectors.ndim != 2 or vectors.shape[1] != embedder.dim or centroids.shape[1] != embedder.dim \
+                or len(fingerprints) != len(vectors) or len(ids) > len(vectors):
+            return
+
+        self.embedder, self.centroids, self.fitted_size = embedder, centroids, fitted_size
+        self._vectors, self._fingerprints = vectors, fingerprints
+        self._ids = ids
+        self._slots = {agent_id: slot for slot, agent_id in enumerate(ids) if agent_id is not None}
+        self._free = [slot for slot, agent_id in enumerate(ids) if agent_id is None]
+        self._active = np.zeros(len(vectors), dtype=bool)
+        self._active[list(self._slots.values())] = True
+        self._clusters = np.zeros(len(vectors), dtype=np.int32)
+        self._clusters[:len(ids)] = nearest_centroids(vectors[:len(ids)], centroids)
+
+    def _create_storage(self, capacity: int):
+        """Replace the embedding files with empty ones of the given number of rows."""
+        os.makedirs(self.directory, exist_ok=True)
+        self._vectors = np.lib.format.open_memmap(
+            self._path("embeddings.npy"), mode="w+", dtype=np.float32, shape=(capacity, self.embedder.dim))
+        self._fingerprints = np.lib.format.open_memmap(
+            self._path("fingerprints.npy"), mode="w+", dtype=np.int64, shape=(capacity,))
+        self._fingerprints[:] = -1
+        self._clusters = np.zeros(capacity, dtype=np.int32)
+        self._active = np.zeros(capacity, dtype=bool)
+
+    def _grow(self):
+        """Double the number of rows, copying the embedding files."""
+        size = len(self._ids)
+        capacity = max(1024, 2 * len(self._vectors))
+        grown = {}
+        for name, array, fill in (("embeddings.npy", self._vectors, 0), ("fingerprints.npy", self._fingerprints, -1)):
+            tmp_path = self._path(name + ".tmp")
+            new = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=array.dtype,
+                                            shape=(capacity,) + array.shape[1:])
+            new[:size] = array[:size]
+            new[size:] = fill
+            new.flush()
+            os.replace(tmp_path, self._path(name))
+            grown[name] = new
+        self._vectors, self._fingerprints = grown["embeddings.npy"], grown["fingerprints.npy"]
+        self._clusters = np.concatenate([self._clusters, np.zeros(capacity - len(self._clusters), dtype=np.int32)])
+        self._active = np.concatenate([self._active, np.zeros(capacity - len(self._active), dtype=bool)])
+
+    def _slot(self, agent_id: str) -> int:
+        """Get the row of an agent, assigning one to new agents (its own old row if it has one)."""
+        slot = self._slots.get(agent_id)
+        if slot is None:
+            slot = self._released.pop(agent_id, None)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            elif self._released:
+                slot = self._released.pop(next(iter(self._released)))
+            else:
+                if len(self._ids) == len(self._vectors):
+                    self._grow()
+                slot = len(self._ids)
+                self._ids.append(None)
+            self._ids[slot] = agent_id
+            self._fingerprints[slot] = -1
+            self._ids_dirty = True
+        self._slots[agent_id] = slot
+        return slot
+
+    def fit(self, agents: List[AgentMetadata]):
+        """Fit the embedder and the clusters to a catalog and embed all its agents."""
+        texts = [semantic_text(agent) for agent in agents]
+        sample = texts if len(texts) <= FIT_SAMPLE_SIZE else random.Random(0).sample(texts, FIT_SAMPLE_SIZE)
+        self.embedder = TextEmbedder.fit(sample, self.dim)
+        # Rows of the previous fit must not be taken for rows of this one
+        if os.path.exists(self._path("ids.json")):
+            os.remove(self._path("ids.json"))
+
+        self.centroids = np.zeros((1, self.embedder.dim), dtype=np.float32)
+        self.fitted_size = len(agents)
+        self._slots, self._ids, self._released, self._free = {}, [], {}, []
+        self._create_storage(max(1024, len(agents)))
+        self.add_all(agents)
+
+        size = len(self._ids)
+        if size >= max(self.ann_min_agents, 2):
+            vectors = np.asarray(self._vectors[:size])
+            sample_rows = np.random.default_rng(0).permutation(size)[:FIT_SAMPLE_SIZE]
+            self.centroids = cluster_centroids(vectors[sample_rows], int(size ** 0.5))
+            self._clusters[:size] = nearest_centroids(vectors, self.centroids)
+            self._order = None
+
+        tmp_path = self._path("model.npz.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, idf=self.embedder.idf, components=self.embedder.components,
+                     centroids=self.centroids, fitted_size=self.fitted_size)
+        os.replace(tmp_path, self._path("model.npz"))
+        self.save()
+
+    def needs_fit(self, num_agents: int) -> bool:
+        """Check whether there is no embedder yet or a catalog of this size outgrew it."""
+        return self.embedder is None or num_agents > REFIT_GROWTH * max(self.fitted_size, 1)
+
+    def sync(self, agents: Iterable[AgentMetadata]):
+        """Bring the index up to date with a catalog.
+
+        Embeds the agents that are new or whose text changed since the stored
+        embeddings were made, and drops the rows of agents no longer present.
+        The embedder is (re)fitted when there is none yet or the catalog has
+        grown REFIT_GROWTH times over since it was fitted.
+        """
+        agents = list(agents)
+        if self.needs_fit(len(agents)):
+            self.fit(agents)
+            return
+        current = {agent.id for agent in agents}
+        for agent_id in [agent_id for agent_id in self._slots if agent_id not in current]:
+            slot = self._slots.pop(agent_id)
+            self._active[slot] = False
+            self._ids[slot] = None
+            self._free.append(slot)
+            self._ids_dirty = True
+        self.add_all(agents)
+
+    def add(self, agent: AgentMetadata):
+        """Index an agent, embedding its text unless it is unchanged."""
+        self.add_all([agent])
+
+    def add_all(self, agents: Iterable[AgentMetadata]):
+        """Index many agents, embedding the changed texts in batches of EMBED_BATCH_SIZE."""
+        agents = list(agents)
+        texts = [semantic_text(agent) for agent in agents]
+        fingerprints = np.array([text_fingerprint(agent.id, text) for agent, text in zip(agents, texts)],
+                                dtype=np.int64)
+        slots = np.array([self._slot(agent.id) for agent in agents], dtype=np.intp)
+        self._active[slots] = True
+        stale = np.flatnonzero(self._fingerprints[slots] != fingerprints)
+        for start in range(0, len(stale), EMBED_BATCH_SIZE):
+            batch = stale[start:start + EMBED_BATCH_SIZE]
+            vectors = self.embedder.embed([texts[i] for i in batch])
+            self._vectors[slots[batch]] = vectors
+            self._fingerprints[slots[batch]] = fingerprints[batch]
+            self._clusters[slots[batch]] = nearest_centroids(vectors, self.centroids)
+        self._order = None
+
+    def remove(self, agent_id: str):
+        """Remove an agent if present, keeping its row until it is needed."""
+        slot = self._slots.pop(agent_id, None)
+        if slot is None:
+            return
+        self._active[slot] = False
+        self._released[agent_id] = slot
+        self._order = None
+
+    def save(self):
+        """Write the embeddings and the row IDs to disk."""
+        if self._vectors is None:
+            return
+        self._vectors.flush()
+        self._fingerprints.flush()
+        if self._ids_dirty:
+            tmp_path = self._path("ids.json.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self._ids, f)
+            os.replace(tmp_path, self._path("ids.json"))
+            self._ids_dirty = False
+
+    def _candidates(self, vector: np.ndarray, probes: int) -> np.ndarray:
+        """Get the active rows of the clusters closest to a query vector."""
+        size = len(self._ids)
+        if len(self.centroids) == 1:
+            return np.flatnonzero(self._active[:size])
+        if self._order is None:
+            keys = np.where(self._active[:size], self._clusters[:size], -1)
+            self._order = np.argsort(keys, kind="stable")
+            self._bounds = np.searchsorted(keys[self._order], np.arange(len(self.centroids) + 1))
+        probes = min(probes, len(self.centroids))
+        closest = np.argpartition(-(self.centroids @ vector), probes - 1)[:probes]
+        return np.concatenate([self._order[self._bounds[c]:self._bounds[c + 1]] for c in closest])
+
+    def search(self, query: str, limit: int = 10, probes: int = ANN_PROBES) -> List[Tuple[str, float]]:
+        """Find the agents whose text is closest in meaning to a query.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+            probes: Clusters to scan; more finds more of the exact nearest agents
+
+        Returns:
+            (agent ID, cosine similarity) pairs, most similar first; agents with
+            a similarity of 0 or less are left out
+        """
+        if self.embedder is None or not self._slots or limit <= 0:
+            return []
+        vector = self.embedder.embed([query])[0]
+        if not vector.any():
+            return []
+        candidates = self._candidates(vector, probes)
+        scores = self._vectors[candidates] @ vector
+        limit = min(limit, len(candidates))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        # Highest score first, ties in row order
+        top = top[np.lexsort((candidates[top], -scores[top]))]
+        return [(self._ids[candidates[i]], float(scores[i])) for i in top if scores[i] > 0]
@@ -0,0 +1,209 @@
+import os
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from schema import Provider
+from codec import JSONCodec, get_codec
+from database import JSONDatabase, provider_to_dict
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; writes are then only serialized within the process
+    fcntl = None
+
+
+# Default number of shard files per record kind
+DEFAULT_SHARDS = {"provider": 16, "agent": 256}
+
+MANIFEST_FORMAT = "agent-hub-shards"
+MANIFEST_VERSION = 2
+
+
+class ShardedDatabase(JSONDatabase):
+    """JSON database that spreads records over hash-bucketed shard files.
+
+    Records live in ``providers/`` and ``agents/`` under the data directory, in
+    shard files mapping record IDs to ``{"seq": n, "data": record}`` entries
+    (seq keeps the catalog order across shards). ``manifest.json`` holds the
+    shard counts, the record IDs and counts in catalog order and the next
+    sequence number, so the catalog can be listed and counted from it alone
+    (see list_record_ids); loading still reads every shard.
+
+    A mutation rewrites only the shard holding the changed record (re-read from
+    disk, so edits of other records by other processes are kept) and, when
+    records are added or removed, the manifest; a batch rewrites each touched
+    shard once. If the manifest does not exist
+    yet, the catalog is migrated from providers.json and agents.json.
+    """
+
+    def __init__(self, data_dir: str = "../data", codec: Optional[Union[str, JSONCodec]] = None,
+                 shards: Optional[Dict[str, int]] = None, flush_interval: Optional[float] = None):
+        self.manifest_file = os.path.join(data_dir, "manifest.json")
+        self.shard_dirs = {"provider": os.path.join(data_dir, "providers"), "agent": os.path.join(data_dir, "agents")}
+        self.lock_file = os.path.join(data_dir, "shards.lock")
+        self.shards = dict(shards or DEFAULT_SHARDS)
+        is_new = not os.path.exists(self.manifest_file)
+
+        super().__init__(data_dir, codec=codec, flush_interval=flush_interval)
+
+        if is_new:
+            self.migrate_from_json()
+
+    def _data_files(self) -> List[str]:
+        """Files whose on-disk state determines the loaded data.
+
+        Shards are replaced atomically, which updates the modification time of their directory.
+        """
+        return [self.manifest_file, *self.shard_dirs.values()]
+
+    def _shard_path(self, kind: str, record_id: str) -> str:
+        """Get the shard file holding a record."""
+        bucket = zlib.crc32(record_id.encode()) % self.shards[kind]
+        return os.path.join(self.shard_dirs[kind], f"shard-{bucket:03d}.json")
+
+    def _read_json(self, path: str, default: Any) -> Any:
+        """Read a JSON file, or return default if it does not exist."""
+        try:
+            with open(path, 'rb') as f:
+                return self.codec.loads(f.read())
+        except FileNotFoundError:
+            return default
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        """Read the manifest (a new one if none was written yet)."""
+        manifest = self._read_json(self.manifest_file, None)
+        if manifest is None:
+            return {
+                "format": MANIFEST_FORMAT,
+                "version": MANIFEST_VERSION,
+                "shards": dict(self.shards),
+                "counts": {"provider": 0, "agent": 0},
+                "ids": {"provider": [], "agent": []},
+                "next_seq": 0,
+            }
+        if manifest.get("format") != MANIFEST_FORMAT or manifest.get("version") not in (1, MANIFEST_VERSION):
+            raise ValueError(f"Unsupported shard manifest: {self.manifest_file}")
+        if manifest["version"] == 1:
+            # Version 1 had no ID lists; they are listed from the shards once and written with the next change
+            manifest["version"] = MANIFEST_VERSION
+            manifest["ids"] = {kind: [data["id"] for data in self._read_entries(kind)] for kind in self.shard_dirs}
+        return manifest
+
+    def _read_entries(self, kind: str) -> List[Dict[str, Any]]:
+        """Read the records of all shards of a kind, in catalog order."""
+        entries = []
+        if os.path.isdir(self.shard_dirs[kind]):
+            for name in os.listdir(self.shard_dirs[kind]):
+                if name.startswith("shard-") and name.endswith(".json"):
+                    entries.extend(self._read_json(os.path.join(self.shard_dirs[kind], name), {}).values())
+        entries.sort(key=lambda entry: entry["seq"])
+        return [entry["data"] for entry in entries]
+
+    def _load_data(self):
+        """Load all records from the shard files."""
+        manifest = self._read_manifest()
+        self.shards = manifest["shards"]
+        for data in self._read_entries("provider"):
+            provider = Provider(**data)
+            self.providers[provider.id] = provider
+        for data in self._read_entries("agent"):
+            self._load_agent(data)
+
+    def _replay_journal(self) -> Tuple[Set[str], Set[str]]:
+        """Each mutation already touches a single shard; there is no journal to replay."""
+        return set(), set()
+
+    @contextmanager
+    def _file_lock(self):
+        """Hold an exclusive lock on the shard files across processes (where supported)."""
+        with self._lock, open(self.lock_file, 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _record_dict(self, kind: str, record: Any) -> Dict[str, Any]:
+        """Get the persisted form of a provider or agent."""
+        return self._agent_record(record) if kind == "agent" else provider_to_dict(record)
+
+    def _save_data(self):
+        """Rewrite all shards and the manifest from the in-memory records."""
+        with self._file_lock():
+            records = {"provider": list(self.providers.values()), "agent": list(self.agents.values())}
+            for kind, kind_records in records.items():
+                shards: Dict[str, Dict[str, Any]] = {}
+                for seq, record in enumerate(kind_records):
+                    shard = shards.setdefault(self._shard_path(kind, record.id), {})
+                    shard[record.id] = {"seq": seq, "data": self._record_dict(kind, record)}
+
+                os.makedirs(self.shard_dirs[kind], exist_ok=True)
+                for name in os.listdir(self.shard_dirs[kind]):
+                    path = os.path.join(self.shard_dirs[kind], name)
+                    if name.startswith("shard-") and path not in shards:
+                        os.remove(path)
+                for path, shard in shards.items():
+                    self._write_atomic(path, self.codec.dumps(shard, pretty=self.pretty))
+
+            manifest = self._read_manifest()
+            manifest["shards"] = self.shards
+            manifest["ids"] = {kind: [record.id for record in kind_records] for kind, kind_records in records.items()}
+            manifest["counts"] = {kind: len(kind_records) for kind, kind_records in records.items()}
+            manifest["next_seq"] = max(manifest["counts"].values())
+            self._write_atomic(self.manifest_file, self.codec.dumps(manifest, pretty=True))
+            self._file_signature = self._get_file_signature()
+
+    def _persist(self, changes: List[Tuple[str, str, Optional[Any]]]):
+        """Persist mutations by rewriting only the shards of the changed records, each once."""
+        with self._file_lock():
+            manifest = self._read_manifest()
+            ids = {kind: dict.fromkeys(kind_ids) for kind, kind_ids in manifest["ids"].items()}
+            counts_changed = False
+            shards: Dict[Tuple[str, str], Dict[str, Any]] = {}
+            for kind, record_id, record in changes:
+                path = self._shard_path(kind, record_id)
+                if (kind, path) not in shards:
+                    shards[kind, path] = self._read_json(path, {})
+                shard = shards[kind, path]
+                existing = shard.pop(record_id, None)
+
+                if record is not None:
+                    if existing is not None:
+                        seq = existing["seq"]
+                    else:
+                        seq = manifest["next_seq"]
+                        manifest["next_seq"] += 1
+                    shard[record_id] = {"seq": seq, "data": self._record_dict(kind, record)}
+                if (existing is None) != (record is None):
+                    if record is not None:
+                        ids[kind][record_id] = None
+                    else:
+                        ids[kind].pop(record_id, None)
+                    counts_changed = True
+
+            for (kind, path), shard in shards.items():
+                os.makedirs(self.shard_dirs[kind], exist_ok=True)
+                self._write_atomic(path, self.codec.dumps(shard, pretty=self.pretty))
+            if counts_changed:
+                manifest["ids"] = {kind: list(kind_ids) for kind, kind_ids in ids.items()}
+                manifest["counts"] = {kind: len(kind_ids) for kind, kind_ids in ids.items()}
+                self._write_atomic(self.manifest_file, self.codec.dumps(manifest, pretty=True))
+            self._file_signature = self._get_file_signature()
+
+
+def list_record_ids(data_dir: str, kind: str = "agent", codec: Optional[Union[str, JSONCodec]] = None) -> List[str]:
+    """List the IDs of a sharded catalog's records in catalog order, reading only its manifest.
+
+    Args:
+        data_dir: Data directory of a ShardedDatabase
+        kind: "agent" or "provider"
+        codec: Codec (or its name) to read the manifest with
+    """
+    codec = codec if isinstance(codec, JSONCodec) else get_codec(codec)
+    with open(os.path.join(data_dir, "manifest.json"), 'rb') as f:
+        manifest = codec.loads(f.read())
+    if manifest.get("format") != MANIFEST_FORMAT or manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported shard manifest in {data_dir}")
+    return manifest["ids"][kind]
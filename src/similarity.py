@@ -0,0 +1,204 @@
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from schema import AgentDomain, AgentMetadata, MemoryType, PlanningCapability, ToolUseCapability
+from facets import FLAG_FACETS
+
+
+# Feature groups encoded with one dimension per enum member
+ENUM_GROUPS = {
+    "planning": PlanningCapability,
+    "tool_use": ToolUseCapability,
+    "memory": MemoryType,
+    "domains": AgentDomain,
+}
+
+# Open-ended feature groups, hashed into this many dimensions each
+HASHED_GROUPS = {
+    "tags": 48,
+    "llms": 24,
+    "reasoning_frameworks": 20,
+}
+
+# Length of each group's part of a vector; weights can favour some groups
+GROUP_WEIGHTS = {
+    "planning": 1.0,
+    "tool_use": 1.0,
+    "memory": 1.0,
+    "flags": 1.0,
+    "domains": 1.5,
+    "tags": 1.5,
+    "llms": 1.0,
+    "reasoning_frameworks": 1.0,
+}
+
+
+def _layout() -> Tuple[Dict[str, int], int]:
+    """Get the first dimension of each feature group and the vector size."""
+    sizes = {group: len(enum) for group, enum in ENUM_GROUPS.items()}
+    sizes["flags"] = len(FLAG_FACETS)
+    sizes.update(HASHED_GROUPS)
+    offsets = {}
+    size = 0
+    for group, group_size in sizes.items():
+        offsets[group] = size
+        size += group_size
+    return offsets, size
+
+
+GROUP_OFFSETS, VECTOR_SIZE = _layout()
+
+# Dimension of each enum member and feature flag
+_FIXED_DIMS = {
+    (group, member.value): GROUP_OFFSETS[group] + i
+    for group, enum in ENUM_GROUPS.items() for i, member in enumerate(enum)
+}
+_FIXED_DIMS.update({("flags", flag): GROUP_OFFSETS["flags"] + i for i, flag in enumerate(FLAG_FACETS)})
+
+
+@lru_cache(maxsize=100_000)
+def _group_entries(group: str, values: Tuple[str, ...]) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+    """Get the dimensions and weights of a group's values, each distinct value once.
+
+    Open-ended values are hashed with crc32, which unlike hash() is stable across
+    processes; enum members and flags have a fixed dimension each.
+    """
+    if group not in HASHED_GROUPS:
+        dims = tuple(_FIXED_DIMS[group, value] for value in dict.fromkeys(values))
+    else:
+        dims = tuple(
+            GROUP_OFFSETS[group] + zlib.crc32(value.encode()) % HASHED_GROUPS[group]
+            for value in dict.fromkeys(value.casefold() for value in values)
+        )
+    return dims, (GROUP_WEIGHTS[group] / len(dims) ** 0.5,) * len(dims)
+
+
+def agent_feature_values(agent: AgentMetadata) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+    """Yield each feature group of an agent with its values (enum members compare equal to their values)."""
+    features = agent.features
+    yield "planning", (features.planning,)
+    yield "tool_use", (features.tool_use,)
+    yield "memory", tuple(features.memory)
+    yield "flags", tuple(flag for flag in FLAG_FACETS if getattr(features, flag))
+    yield "domains", tuple(agent.domains)
+    yield "tags", tuple(agent.tags)
+    yield "llms", tuple(llm.model_name for llm in agent.supported_llms)
+    yield "reasoning_frameworks", tuple(features.reasoning_frameworks)
+
+
+def encode_agents(agents: List[AgentMetadata]) -> np.ndarray:
+    """Encode agents as unit-length feature vectors, one row each.
+
+    Each feature group with values contributes a part of length GROUP_WEIGHTS[group],
+    spread evenly over its values, so the dot product of two vectors is their cosine
+    similarity and no group outweighs the others by having more values.
+    """
+    counts: List[int] = []
+    dims: List[int] = []
+    weights: List[float] = []
+    for agent in agents:
+        count = len(dims)
+        for group, values in agent_feature_values(agent):
+            if values:
+                group_dims, group_weights = _group_entries(group, values)
+                dims.extend(group_dims)
+                weights.extend(group_weights)
+        counts.append(len(dims) - count)
+
+    vectors = np.zeros((len(agents), VECTOR_SIZE), dtype=np.float32)
+    rows = np.repeat(np.arange(len(agents)), counts)
+    # Hashed values may share a dimension, so weights are accumulated
+    np.add.at(vectors, (rows, np.array(dims, dtype=np.intp)), weights)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+class SimilarityIndex:
+    """Nearest-neighbour index over agent feature vectors (see encode_agents).
+
+    Vectors are rows of one float32 matrix, so a lookup is one matrix-vector
+    product followed by a partial sort. Every agent has a fixed row; rows of
+    removed agents are reused, and the matrix grows by doubling.
+    """
+
+    def __init__(self):
+        self._vectors = np.zeros((0, VECTOR_SIZE), dtype=np.float32)
+        self._active = np.zeros(0, dtype=bool)
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def _slot(self, agent_id: str) -> int:
+        """Get the row of an agent, assigning a free one to new agents."""
+        slot = self._slots.get(agent_id)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = agent_id
+        else:
+            slot = len(self._ids)
+            self._ids.append(agent_id)
+            if slot == len(self._vectors):
+                capacity = max(1024, 2 * len(self._vectors))
+                vectors = np.zeros((capacity, VECTOR_SIZE), dtype=np.float32)
+                vectors[:slot] = self._vectors
+                active = np.zeros(capacity, dtype=bool)
+                active[:slot] = self._active
+                self._vectors, self._active = vectors, active
+        self._slots[agent_id] = slot
+        return slot
+
+    def add(self, agent: AgentMetadata):
+        """Index an agent, replacing any previous vector of it."""
+        self.add_all([agent])
+
+    def add_all(self, agents: Iterable[AgentMetadata]):
+        """Index many agents, encoding them in one pass."""
+        agents = list(agents)
+        if not agents:
+            return
+        slots = np.array([self._slot(agent.id) for agent in agents], dtype=np.intp)
+        self._vectors[slots] = encode_agents(agents)
+        self._active[slots] = True
+
+    def remove(self, agent_id: str):
+        """Remove an agent if present."""
+        slot = self._slots.pop(agent_id, None)
+        if slot is None:
+            return
+        self._active[slot] = False
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def similar(self, agent_id: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Find the agents most similar to an indexed agent.
+
+        Args:
+            agent_id: Agent to find neighbours of
+            limit: Maximum number of results
+
+        Returns:
+            (agent ID, cosine similarity) pairs, most similar first; agents
+            sharing no feature with the given one are left out
+        """
+        slot = self._slots.get(agent_id)
+        if slot is None or limit <= 0:
+            return []
+        size = len(self._ids)
+        scores = self._vectors[:size] @ self._vectors[slot]
+        scores[~self._active[:size]] = -np.inf
+        scores[slot] = -np.inf
+
+        limit = min(limit, size - 1)
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        # Highest score first, ties in row order
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(self._ids[i], float(scores[i])) for i in top if scores[i] > 0]
@@ -0,0 +1,55 @@
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Dict, List
+from pydantic import BaseModel, TypeAdapter
+from schema import AgentMetadata, Provider
+
+
+# Bump when the snapshot layout changes; model changes are detected by the schema fingerprint
+SNAPSHOT_VERSION = 1
+
+HEADER_TEMPLATE = b'{"format":"agent-hub","schema_version":"%s","checksum":"%s",'
+HEADER_PATTERN = re.compile(rb'\{"format":"agent-hub","schema_version":"([^"]*)","checksum":"([0-9a-f]{64})",')
+
+
+class ProviderSnapshot(BaseModel):
+    records: List[Provider]
+
+
+class AgentSnapshot(BaseModel):
+    # Agents without their detail fields, which are kept as JSON text per agent ID
+    records: List[AgentMetadata]
+    details: Dict[str, str] = {}
+
+
+PROVIDER_SNAPSHOT = TypeAdapter(ProviderSnapshot)
+AGENT_SNAPSHOT = TypeAdapter(AgentSnapshot)
+
+
+@lru_cache(maxsize=None)
+def schema_version() -> str:
+    """Get the version written to snapshots: SNAPSHOT_VERSION plus a fingerprint of the models."""
+    schemas = [Provider.model_json_schema(), AgentMetadata.model_json_schema()]
+    fingerprint = hashlib.sha256(json.dumps(schemas, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{SNAPSHOT_VERSION}-{fingerprint}"
+
+
+def encode_snapshot(body: bytes) -> bytes:
+    """Prefix the members of a snapshot object with a header holding the schema version and a checksum.
+
+    Args:
+        body: The remaining JSON object members and the closing brace, e.g. b'"records":[...]}'
+    """
+    checksum = hashlib.sha256(body).hexdigest()
+    return HEADER_TEMPLATE % (schema_version().encode(), checksum.encode()) + body
+
+
+def is_trusted(raw: bytes) -> bool:
+    """Check whether file contents are an intact snapshot written with the current schema."""
+    match = HEADER_PATTERN.match(raw)
+    if not match or match.group(1).decode() != schema_version():
+        return False
+    return hashlib.sha256(memoryview(raw)[match.end():]).hexdigest() == match.group(2).decode()
+
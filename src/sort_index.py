@@ -0,0 +1,67 @@
+from bisect import bisect_left, insort
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+
+class SortIndex:
+    """Agent IDs kept in sorted order of a precomputed sort key.
+
+    Keys are stored per agent so an entry can be moved when its key changes.
+    Entries are (key, agent_id) tuples, which makes ties deterministic.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, Any] = {}
+        self._entries: List[Tuple[Any, str]] = []
+        self._slot_order: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set(self, agent_id: str, key: Any):
+        """Insert an agent, or move it if its key changed."""
+        old_key = self._keys.get(agent_id)
+        if agent_id in self._keys:
+            if old_key == key:
+                return
+            self.remove(agent_id)
+        self._keys[agent_id] = key
+        insort(self._entries, (key, agent_id))
+        self._slot_order = None
+
+    def set_many(self, items: Iterable[Tuple[str, Any]]):
+        """Insert or move many agents, then re-sort once."""
+        items = dict(items)
+        moved = not self._keys.keys().isdisjoint(items)
+        self._keys.update(items)
+        if moved:
+            self._entries = sorted((key, agent_id) for agent_id, key in self._keys.items())
+        else:
+            # Sorting two sorted runs only merges them
+            self._entries = sorted(self._entries + sorted((key, agent_id) for agent_id, key in items.items()))
+        self._slot_order = None
+
+    def remove(self, agent_id: str):
+        """Remove an agent if present."""
+        if agent_id not in self._keys:
+            return
+        entry = (self._keys.pop(agent_id), agent_id)
+        del self._entries[bisect_left(self._entries, entry)]
+        self._slot_order = None
+
+    def key(self, agent_id: str) -> Any:
+        """Get the sort key of an agent."""
+        return self._keys[agent_id]
+
+    def iter_from(self, key: Any) -> Iterator[Tuple[Any, str]]:
+        """Iterate over the (key, agent_id) entries in sorted order, starting at the first key >= key."""
+        return islice(self._entries, bisect_left(self._entries, (key,)), None)
+
+    def slot_order(self, slot_of: Callable[[str], int]) -> np.ndarray:
+        """Get the facet index slots of all agents in sorted order (cached until the next change)."""
+        if self._slot_order is None:
+            self._slot_order = np.fromiter(
+                (slot_of(agent_id) for _, agent_id in self._entries), dtype=np.int64, count=len(self._entries)
+            )
+        return self._slot_order
@@ -0,0 +1,301 @@
+import os
+import sqlite3
+from enum import Enum
+from typing import List, Optional, Dict, Any, Set, Tuple, Union
+from schema import AgentMetadata, Provider
+from codec import JSONCodec
+from database import JSONDatabase, PROVIDER_LIST
+
+
+# Boolean AgentFeatures flags stored as indexed agent columns
+FEATURE_FLAGS = [
+    "multi_agent_collaboration",
+    "human_in_the_loop",
+    "autonomous",
+    "fine_tuning_support",
+    "streaming_support",
+    "supports_vision",
+    "supports_audio",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS providers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    provider_type TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_providers_type ON providers(provider_type);
+
+CREATE TABLE IF NOT EXISTS agents (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    provider_id TEXT,
+    planning TEXT NOT NULL,
+    tool_use TEXT NOT NULL,
+    multi_agent_collaboration INTEGER NOT NULL,
+    human_in_the_loop INTEGER NOT NULL,
+    autonomous INTEGER NOT NULL,
+    fine_tuning_support INTEGER NOT NULL,
+    streaming_support INTEGER NOT NULL,
+    supports_vision INTEGER NOT NULL,
+    supports_audio INTEGER NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_agents_provider ON agents(provider_id);
+CREATE INDEX IF NOT EXISTS idx_agents_planning ON agents(planning);
+CREATE INDEX IF NOT EXISTS idx_agents_tool_use ON agents(tool_use);
+
+CREATE TABLE IF NOT EXISTS agent_llms (
+    agent_id TEXT NOT NULL,
+    model_name TEXT NOT NULL,
+    provider_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_agent_llms_agent ON agent_llms(agent_id);
+CREATE INDEX IF NOT EXISTS idx_agent_llms_provider ON agent_llms(provider_id);
+CREATE INDEX IF NOT EXISTS idx_agent_llms_model ON agent_llms(model_name);
+
+CREATE TABLE IF NOT EXISTS agent_vector_stores (
+    agent_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    provider_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_agent_vector_stores_agent ON agent_vector_stores(agent_id);
+CREATE INDEX IF NOT EXISTS idx_agent_vector_stores_provider ON agent_vector_stores(provider_id);
+
+CREATE TABLE IF NOT EXISTS agent_memory_stores (
+    agent_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    provider_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_agent_memory_stores_agent ON agent_memory_stores(agent_id);
+CREATE INDEX IF NOT EXISTS idx_agent_memory_stores_provider ON agent_memory_stores(provider_id);
+
+CREATE TABLE IF NOT EXISTS agent_memory_types (
+    agent_id TEXT NOT NULL,
+    memory_type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_agent_memory_types ON agent_memory_types(memory_type, agent_id);
+CREATE INDEX IF NOT EXISTS idx_agent_memory_types_agent ON agent_memory_types(agent_id);
+
+CREATE TABLE IF NOT EXISTS agent_domains (
+    agent_id TEXT NOT NULL,
+    domain TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_agent_domains ON agent_domains(domain, agent_id);
+CREATE INDEX IF NOT EXISTS idx_agent_domains_agent ON agent_domains(agent_id);
+
+CREATE TABLE IF NOT EXISTS agent_tags (
+    agent_id TEXT NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_agent_tags ON agent_tags(tag, agent_id);
+CREATE INDEX IF NOT EXISTS idx_agent_tags_agent ON agent_tags(agent_id);
+"""
+
+# Child tables holding one row per nested agent value
+AGENT_CHILD_TABLES = [
+    "agent_llms",
+    "agent_vector_stores",
+    "agent_memory_stores",
+    "agent_memory_types",
+    "agent_domains",
+    "agent_tags",
+]
+
+
+def _value(value: Any) -> Any:
+    """Return the raw value of an enum member, or the value unchanged."""
+    return value.value if isinstance(value, Enum) else value
+
+
+class SQLiteDatabase(JSONDatabase):
+    """SQLite-backed database with the same API as JSONDatabase.
+
+    Records are kept in normalized, indexed tables; each mutation only touches
+    the rows of the changed record. Provider and feature filters run as
+    indexed queries. If the database file does not exist yet, it is created
+    from the JSON files in the same data directory.
+    """
+
+    def __init__(self, data_dir: str = "../data", db_file: Optional[str] = None,
+                 codec: Optional[Union[str, JSONCodec]] = None, flush_interval: Optional[float] = None):
+        os.makedirs(data_dir, exist_ok=True)
+        self.db_file = db_file or os.path.join(data_dir, "agent_hub.db")
+        is_new = not os.path.exists(self.db_file)
+
+        # Shared across Streamlit sessions; access is serialized by self._lock
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+        super().__init__(data_dir, codec=codec, flush_interval=flush_interval)
+
+        if is_new:
+            self.migrate_from_json()
+
+    def _data_files(self) -> List[str]:
+        """Files whose on-disk state determines the loaded data."""
+        return [self.db_file]
+
+    def _load_data(self):
+        """Load all records from the database."""
+        rows = self.conn.execute("SELECT data FROM providers ORDER BY rowid").fetchall()
+        for provider in PROVIDER_LIST.validate_json("[" + ",".join(data for (data,) in rows) + "]"):
+            self.providers[provider.id] = provider
+
+        for (data,) in self.conn.execute("SELECT data FROM agents ORDER BY rowid"):
+            self._load_agent(self.codec.loads(data))
+
+    def _replay_journal(self) -> Tuple[Set[str], Set[str]]:
+        """SQLite commits are durable on their own; there is no journal to replay."""
+        return set(), set()
+
+    def _save_data(self):
+        """Rewrite all tables from the in-memory records."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM providers")
+            self.conn.execute("DELETE FROM agents")
+            for table in AGENT_CHILD_TABLES:
+                self.conn.execute(f"DELETE FROM {table}")
+            for provider in self.providers.values():
+                self._write_provider(provider)
+            for agent in self.agents.values():
+                self._write_agent(agent)
+        self._file_signature = self._get_file_signature()
+
+    def _persist(self, changes: List[Tuple[str, str, Optional[Any]]]):
+        """Persist mutations in one transaction, touching only the rows of the changed records."""
+        with self._lock, self.conn:
+            for kind, record_id, record in changes:
+                if kind == "provider":
+                    if record is None:
+                        self.conn.execute("DELETE FROM providers WHERE id = ?", (record_id,))
+                    else:
+                        self._write_provider(record)
+                else:
+                    self._delete_agent_children(record_id)
+                    if record is None:
+                        self.conn.execute("DELETE FROM agents WHERE id = ?", (record_id,))
+                    else:
+                        self._write_agent(record)
+        self._file_signature = self._get_file_signature()
+
+    def _write_provider(self, provider: Provider):
+        """Insert or update a provider row."""
+        self.conn.execute(
+            "INSERT INTO providers (id, name, provider_type, data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, "
+            "provider_type = excluded.provider_type, data = excluded.data",
+            (provider.id, provider.name, _value(provider.provider_type),
+             provider.model_dump_json())
+        )
+
+    def _delete_agent_children(self, agent_id: str):
+        """Delete the normalized child rows of an agent."""
+        for table in AGENT_CHILD_TABLES:
+            self.conn.execute(f"DELETE FROM {table} WHERE agent_id = ?", (agent_id,))
+
+    def _write_agent(self, agent: AgentMetadata):
+        """Insert or update an agent row and insert its normalized child rows."""
+        features = agent.features
+        columns = ["id", "name", "provider_id", "planning", "tool_use", *FEATURE_FLAGS, "updated_at", "data"]
+        self.conn.execute(
+            f"INSERT INTO agents ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in columns[1:])}",
+            (agent.id, agent.name, agent.provider_id, _value(features.planning), _value(features.tool_use),
+             *[int(getattr(features, flag)) for flag in FEATURE_FLAGS],
+             str(agent.updated_at), self._agent_json(agent).decode())
+        )
+        self.conn.executemany(
+            "INSERT INTO agent_llms (agent_id, model_name, provider_id) VALUES (?, ?, ?)",
+            [(agent.id, llm.model_name, llm.provider_id) for llm in agent.supported_llms]
+        )
+        self.conn.executemany(
+            "INSERT INTO agent_vector_stores (agent_id, name, provider_id) VALUES (?, ?, ?)",
+            [(agent.id, vs.name, vs.provider_id) for vs in agent.vector_stores]
+        )
+        self.conn.executemany(
+            "INSERT INTO agent_memory_stores (agent_id, name, type, provider_id) VALUES (?, ?, ?, ?)",
+            [(agent.id, ms.name, _value(ms.type), ms.provider_id) for ms in agent.memory_stores]
+        )
+        self.conn.executemany(
+            "INSERT INTO agent_memory_types (agent_id, memory_type) VALUES (?, ?)",
+            [(agent.id, _value(m)) for m in features.memory]
+        )
+        self.conn.executemany(
+            "INSERT INTO agent_domains (agent_id, domain) VALUES (?, ?)",
+            [(agent.id, _value(d)) for d in agent.domains]
+        )
+        self.conn.executemany(
+            "INSERT INTO agent_tags (agent_id, tag) VALUES (?, ?)",
+            [(agent.id, tag) for tag in agent.tags]
+        )
+
+    def get_providers_by_type(self, provider_type: str) -> List[Provider]:
+        """Get providers filtered by type."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id FROM providers WHERE provider_type = ? ORDER BY rowid",
+                (_value(provider_type),)
+            ).fetchall()
+        return [self.providers[row[0]] for row in rows if row[0] in self.providers]
+
+    def filter_agents(self,
+                     provider_id: Optional[str] = None,
+                     domains: Optional[List[str]] = None,
+                     features: Optional[Dict[str, Any]] = None,
+                     tags: Optional[List[str]] = None) -> List[AgentMetadata]:
+        """Filter agents by various criteria."""
+        clauses = []
+        params: List[Any] = []
+        remaining_features = {}
+
+        if provider_id:
+            clauses.append("a.provider_id = ?")
+            params.append(provider_id)
+
+        if domains:
+            clauses.append(
+                f"EXISTS (SELECT 1 FROM agent_domains d WHERE d.agent_id = a.id "
+                f"AND d.domain IN ({', '.join(['?'] * len(domains))}))"
+            )
+            params.extend(_value(d) for d in domains)
+
+        if tags:
+            clauses.append(
+                f"EXISTS (SELECT 1 FROM agent_tags t WHERE t.agent_id = a.id "
+                f"AND t.tag IN ({', '.join(['?'] * len(tags))}))"
+            )
+            params.extend(tags)
+
+        for key, value in (features or {}).items():
+            if key in ("planning", "tool_use"):
+                clauses.append(f"a.{key} = ?")
+                params.append(_value(value))
+            elif key in FEATURE_FLAGS:
+                clauses.append(f"a.{key} = ?")
+                params.append(int(bool(value)))
+            elif key == "memory":
+                clauses.append(
+                    f"EXISTS (SELECT 1 FROM agent_memory_types m WHERE m.agent_id = a.id "
+                    f"AND m.memory_type IN ({', '.join(['?'] * len(value))}))"
+                )
+                params.extend(_value(v) for v in value)
+            else:
+                # Not indexed (e.g. reasoning_frameworks); checked on the matching rows below
+                remaining_features[key] = value
+
+        query = "SELECT a.id FROM agents a"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY a.rowid"
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        results = [self.agents[row[0]] for row in rows if row[0] in self.agents]
+
+        if remaining_features:
+            results = [agent for agent in results if self._matches_features(agent, remaining_features)]
+
+        return results
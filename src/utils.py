@@ -33,3 +33,18 @@ def get_provider_options(db, filter_type=None, include_none=True):
         options["none"] = "None (Unspecified)"
         
     return options
+
+# Progress of a background catalog load, refreshed every second
+@st.fragment(run_every=1)
+def show_load_progress(db):
+    """Show how much of the catalog is loaded while the database loads in the background.
+    
+    Reruns the whole page once loading is complete, so its results cover all agents.
+    """
+    if not db.is_loading():
+        st.rerun()
+    metrics = db.get_metrics()
+    st.progress(
+        metrics["load_progress"],
+        text=f"Loading catalog... {metrics['agents']:,} agents so far. Results cover the agents loaded until now."
+    )
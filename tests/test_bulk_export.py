@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+import io
+import json
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from schema import AgentDomain, CodeSnippet, LLMSupport
+from database import JSONDatabase
+from bulk_export import export_agents, iter_agent_records, iter_export
+from bulk_import import import_file
+from tests.test_database import DatabaseTestCase, make_agent, make_provider
+
+
+class TestBulkExport(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        db = JSONDatabase(self.data_dir)
+        self.provider = db.add_provider(make_provider())
+        self.coder = db.add_agent(make_agent(
+            self.provider.id,
+            name="Coder",
+            domains=[AgentDomain.CODING],
+            tags=["python", "review"],
+            supported_llms=[LLMSupport(model_name="gpt-4", provider_id=self.provider.id)],
+            code_snippets=[CodeSnippet(language="python", code="print(1)\nprint(2)", description="Run")]
+        ))
+        self.writer = db.add_agent(make_agent(self.provider.id, name="Writer", domains=[AgentDomain.CREATIVE]))
+        # A fresh instance, so detail fields are still unparsed
+        self.db = JSONDatabase(self.data_dir)
+
+    def test_ndjson_projection_and_filters(self):
+        """Test that records hold only the requested fields of the matching agents."""
+        output = io.BytesIO()
+        count = export_agents(self.db, output, "ndjson", ["name", "features.planning", "supported_llms.model_name"],
+                              domains=["coding"])
+        self.assertEqual(count, 1)
+        self.assertEqual([json.loads(line) for line in output.getvalue().splitlines()], [{
+            "name": "Coder",
+            "features": {"planning": "basic"},
+            "supported_llms": [{"model_name": "gpt-4"}],
+        }])
+
+        with self.assertRaises(ValueError):
+            list(iter_export(self.db, "ndjson", ["nope"]))
+
+    def test_misspelled_query_exports_close_matches(self):
+        """Test that an export with the fuzzy fallback writes the agents the Agents page lists."""
+        filters = dict(query="wirter", fuzzy=True)
+        listed = [agent.id for agent in self.db.search_agents("wirter", fuzzy=True)]
+        self.assertEqual(self.db.query_agents(**filters, limit=0)[0], len(listed))
+        output = io.BytesIO()
+        self.assertEqual(export_agents(self.db, output, "ndjson", ["id"], **filters), 1)
+        self.assertEqual([json.loads(line)["id"] for line in output.getvalue().splitlines()], listed)
+        self.assertEqual(export_agents(self.db, io.BytesIO(), "ndjson", query="wirter"), 0)
+
+    def test_matches_are_taken_a_page_at_a_time(self):
+        """Test that an export queries the database a bounded page at a time, in the requested order."""
+        names = [f"Agent {i:02d}" for i in range(5)]
+        for name in reversed(names):
+            self.db.add_agent(make_agent(self.provider.id, name=name, domains=[AgentDomain.CODING]))
+        with mock.patch("bulk_export.QUERY_PAGE_SIZE", 2), \
+                mock.patch.object(self.db, "query_agents", wraps=self.db.query_agents) as query:
+            records = iter_agent_records(self.db, ["name"], domains=["coding"])
+            self.assertEqual([next(records)["name"] for _ in range(2)], names[:2])
+            self.assertEqual(query.call_count, 1)
+            self.assertEqual([record["name"] for record in records], names[2:] + ["Coder"])
+            self.assertEqual([call.kwargs["limit"] for call in query.call_args_list], [2, 2, 2])
+
+            records = iter_agent_records(self.db, ["name"], query="agent", offset=1, limit=3)
+            self.assertEqual([record["name"] for record in records], names[1:4])
+            self.assertEqual([call.kwargs["limit"] for call in query.call_args_list[3:]], [2, 1])
+
+    def test_detail_fields_are_exported_without_loading(self):
+        """Test that unloaded detail fields are exported from their stored form."""
+        records = [json.loads(line) for line in iter_export(self.db, fields=["name", "code_snippets"])]
+        self.assertEqual(records[0]["code_snippets"][0]["code"], "print(1)\nprint(2)")
+        self.assertIn(self.coder.id, self.db._agent_details)
+
+    def test_csv_round_trip(self):
+        """Test that an exported CSV imports back into an equal catalog."""
+        output = io.BytesIO()
+        self.assertEqual(export_agents(self.db, output, "csv"), 2)
+
+        other_dir = os.path.join(self.data_dir, "other")
+        other = JSONDatabase(other_dir)
+        other.add_provider(self.provider)
+        result = import_file(other, io.StringIO(output.getvalue().decode(), newline=""), fmt="csv")
+        self.assertEqual((result["imported"], result["failed"]), (2, 0))
+
+        coder = other.get_agent(self.coder.id)
+        self.assertEqual(coder.tags, ["python", "review"])
+        self.assertEqual(coder.domains, [AgentDomain.CODING])
+        self.assertEqual(coder.supported_llms[0].provider.id, self.provider.id)
+        self.assertEqual(coder.created_at, self.coder.created_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
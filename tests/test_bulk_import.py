@@ -0,0 +1,97 @@
+import unittest
+import sys
+import os
+import io
+import json
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from schema import AgentDomain, MemoryType, PlanningCapability
+from database import JSONDatabase
+from bulk_import import import_file, import_rows, read_rows
+from tests.test_database import DatabaseTestCase, make_provider
+
+
+def jsonl(*records, extra=""):
+    return io.StringIO("".join(json.dumps(record) + "\n" for record in records) + extra)
+
+
+class TestBulkImport(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = JSONDatabase(self.data_dir)
+        self.provider = self.db.add_provider(make_provider("Acme AI"))
+
+    def test_jsonl_import_resolves_providers_and_reports_errors(self):
+        """Test that valid rows are imported in one write and invalid rows are reported."""
+        source = jsonl(
+            {"name": "By Name", "description": "d", "version": "1", "provider": "acme ai", "features": {}},
+            {"name": "By ID", "description": "d", "version": "1", "provider_id": self.provider.id, "features": {},
+             "supported_llms": [{"model_name": "gpt-4", "provider_id": "Acme AI"}]},
+            {"name": "Unknown Provider", "description": "d", "version": "1", "provider": "Nobody", "features": {}},
+            {"name": "Missing Fields", "provider": "Acme AI"},
+            extra="{not json\n",
+        )
+
+        with mock.patch.object(self.db, "_save_data", wraps=self.db._save_data) as save:
+            result = import_file(self.db, source)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(result["imported"], 2)
+        self.assertEqual([number for number, _ in result["errors"]], [3, 4, 5])
+        self.assertIn("Unknown provider: Nobody", result["errors"][0][1])
+        self.assertIn("description: Field required", result["errors"][1][1])
+        self.assertGreater(result["records_per_second"], 0)
+
+        reloaded = JSONDatabase(self.data_dir)
+        agents = reloaded.get_all_agents()
+        self.assertEqual([a.name for a in agents], ["By Name", "By ID"])
+        self.assertEqual({a.provider_id for a in agents}, {self.provider.id})
+        self.assertEqual(reloaded.get_agent(agents[1].id).supported_llms[0].provider.name, "Acme AI")
+
+    def test_csv_import(self):
+        """Test that CSV rows fill nested fields and lists."""
+        source = io.StringIO(
+            "name,description,version,provider,features.planning,features.memory,domains,tags,supported_llms\n"
+            'Coder,Writes code,1.0,Acme AI,advanced,short_term;long_term,coding,"a; b",'
+            '"[{""model_name"": ""gpt-4""}]"\n'
+            "Bad,Bad planning,1.0,Acme AI,sometimes,,,,\n"
+        )
+        result = import_file(self.db, source, fmt="csv")
+        self.assertEqual(result["imported"], 1)
+        self.assertEqual([number for number, _ in result["errors"]], [3])
+
+        agent = self.db.get_all_agents()[0]
+        self.assertEqual(agent.features.planning, PlanningCapability.ADVANCED)
+        self.assertEqual(agent.features.memory, [MemoryType.SHORT_TERM, MemoryType.LONG_TERM])
+        self.assertEqual(agent.domains, [AgentDomain.CODING])
+        self.assertEqual(agent.tags, ["a", "b"])
+        self.assertEqual(agent.supported_llms[0].model_name, "gpt-4")
+
+    def test_providers_then_agents(self):
+        """Test that providers imported first can be named by agents imported later."""
+        providers = jsonl({"name": "Other Lab", "description": "d", "url": "https://example.com"})
+        self.assertEqual(import_file(self.db, providers, kind="provider")["imported"], 1)
+        agents = jsonl({"name": "Agent", "description": "d", "version": "1", "provider": "Other Lab", "features": {}})
+        self.assertEqual(import_file(self.db, agents)["imported"], 1)
+        self.assertEqual(self.db.get_all_agents()[0].provider.name, "Other Lab")
+
+    def test_parallel_import_matches_serial_import(self):
+        """Test that worker processes validate large inputs with the same results, in order."""
+        records = [
+            {"name": f"Agent {i}", "description": "d", "version": "1", "provider": "Acme AI", "features": {}}
+            for i in range(30)
+        ]
+        records[7]["features"] = {"planning": "sometimes"}
+        source = jsonl(*records)
+
+        with mock.patch("bulk_import.PARALLEL_IMPORT_MIN_ROWS", 10), mock.patch("bulk_import.IMPORT_CHUNK_SIZE", 4):
+            result = import_rows(self.db, read_rows(source, "jsonl"), workers=2)
+        self.assertEqual(result["workers"], 2)
+        self.assertEqual(result["imported"], 29)
+        self.assertEqual([number for number, _ in result["errors"]], [8])
+        self.assertEqual([a.name for a in self.db.get_all_agents()],
+                         [r["name"] for i, r in enumerate(records) if i != 7])
+
+
+if __name__ == "__main__":
+    unittest.main()
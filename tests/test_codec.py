@@ -0,0 +1,37 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from codec import CODECS, JSONCodec, get_codec
+
+
+class TestCodecs(unittest.TestCase):
+    def test_round_trip(self):
+        """Test that every installed codec decodes what it encodes, compact or pretty."""
+        for name in CODECS:
+            with self.subTest(codec=name):
+                codec = get_codec(name)
+                data = {"name": "Agent", "tags": ["a", "b"], "rating": 4.5, "notes": None}
+                compact = codec.dumps(data)
+                self.assertNotIn(b"\n", compact)
+                self.assertNotIn(b", ", compact)
+                self.assertEqual(codec.loads(compact), data)
+                self.assertIn(b"\n  ", codec.dumps(data, pretty=True))
+
+    def test_non_json_values_become_strings(self):
+        """Test that values without a JSON type are written as strings."""
+        value = get_codec("json").loads(get_codec("json").dumps({"at": datetime(2025, 1, 2)}))
+        self.assertEqual(value["at"], "2025-01-02 00:00:00")
+
+    def test_default_and_unknown_codecs(self):
+        """Test that the fastest installed codec is the default and unknown names are rejected."""
+        self.assertIsInstance(get_codec(), JSONCodec)
+        self.assertEqual(get_codec().name, "orjson" if "orjson" in CODECS else "json")
+        with self.assertRaises(ValueError):
+            get_codec("yaml")
+
+
+if __name__ == '__main__':
+    unittest.main()
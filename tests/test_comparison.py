@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from schema import AgentDomain, LLMSupport, ResourceRequirement
+from comparison import UNSUPPORTED, comparison_frame, comparison_tables, differing_columns
+from tests.test_database import make_agent, make_provider
+
+
+class TestComparisonTables(unittest.TestCase):
+    def setUp(self):
+        self.provider = make_provider("OpenAI")
+        self.providers = {self.provider.id: self.provider}
+        self.coder = make_agent(
+            self.provider.id, name="Coder",
+            domains=[AgentDomain.CODING],
+            supported_llms=[LLMSupport(model_name="gpt-4", provider_id=self.provider.id, performance_rating=5)],
+            resource_requirements=ResourceRequirement(min_ram="8GB")
+        )
+        self.writer = make_agent("missing", name="Writer", tags=["prose"])
+
+    def tables(self, agents, only_differences=False):
+        return comparison_tables(comparison_frame(agents, self.providers), only_differences)
+
+    def test_tables_have_one_row_per_agent(self):
+        """Test that every table lists the agents in the given order."""
+        tables = self.tables([self.coder, self.writer])
+        for table in tables.values():
+            self.assertEqual(table["Agent"].tolist(), ["Coder", "Writer"])
+        self.assertEqual(tables["basic"]["Provider"].tolist(), ["OpenAI (company)", "Unknown (Unknown)"])
+        self.assertEqual(tables["resources"]["Min RAM"].tolist(), ["8GB", "N/A"])
+        self.assertEqual(tables["llms"]["gpt-4 (OpenAI)"].tolist(), ["★5", UNSUPPORTED])
+
+    def test_llm_columns_span_all_agents(self):
+        """Test that each LLM of any agent gets one sorted column, the last entry of a repeated LLM winning."""
+        self.writer.supported_llms = [
+            LLMSupport(model_name="claude", provider_id=self.provider.id),
+            LLMSupport(model_name="gpt-4", provider_id=self.provider.id, min_version="2"),
+            LLMSupport(model_name="gpt-4", provider_id=self.provider.id, min_version="3"),
+        ]
+        llms = self.tables([self.coder, self.writer, make_agent("missing")])["llms"]
+        self.assertEqual(llms.columns.tolist(), ["Agent", "claude (OpenAI)", "gpt-4 (OpenAI)"])
+        self.assertEqual(llms["claude (OpenAI)"].tolist(), [UNSUPPORTED, "✓", UNSUPPORTED])
+        self.assertEqual(llms["gpt-4 (OpenAI)"].tolist(), ["★5", "✓ (v3)", UNSUPPORTED])
+
+    def test_only_differences(self):
+        """Test that columns equal for all agents are dropped, and groups left empty are None."""
+        frame = comparison_frame([self.coder, self.writer], self.providers)
+        differing = frame.columns[differing_columns(frame)]
+        self.assertIn(("basic", "Domains"), differing)
+        self.assertNotIn(("basic", "Version"), differing)
+
+        tables = comparison_tables(frame, only_differences=True)
+        self.assertEqual(tables["basic"].columns.tolist(), ["Agent", "Provider", "Domains", "Tags"])
+        self.assertEqual(tables["resources"].columns.tolist(), ["Agent", "Min RAM"])
+        self.assertIsNone(tables["features"])
+
+        same = self.tables([self.writer, self.writer], only_differences=True)
+        self.assertTrue(all(table is None for table in same.values()))
+
+    def test_llm_table_needs_an_llm(self):
+        """Test that the LLM table is left out when no agent lists an LLM."""
+        self.assertIsNone(self.tables([self.writer, self.writer])["llms"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,657 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from schema import (
+    Provider, AgentMetadata, AgentFeatures, LLMSupport, PlanningCapability, ToolUseCapability, AgentDomain,
+    CodeSnippet, ResourceRequirement, ProviderType
+)
+from database import JSONDatabase, get_database
+
+
+def make_provider(name="Test Provider", **kwargs):
+    return Provider(name=name, description=f"{name} description", url="https://example.com", **kwargs)
+
+
+def make_agent(provider_id, name="Test Agent", **kwargs):
+    kwargs.setdefault("features", AgentFeatures(
+        planning=PlanningCapability.BASIC,
+        tool_use=ToolUseCapability.PREDEFINED
+    ))
+    return AgentMetadata(
+        name=name,
+        description=kwargs.pop("description", f"{name} description"),
+        version="1.0.0",
+        provider_id=provider_id,
+        **kwargs
+    )
+
+
+class DatabaseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir, ignore_errors=True)
+
+
+class TestJSONDatabase(DatabaseTestCase):
+    def test_add_and_reload(self):
+        """Test that providers and agents survive a reload with references linked."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        agent = db.add_agent(make_agent(
+            provider.id,
+            supported_llms=[LLMSupport(model_name="gpt-4", provider_id=provider.id)],
+            domains=[AgentDomain.CODING]
+        ))
+
+        reloaded = JSONDatabase(self.data_dir)
+        loaded_agent = reloaded.get_agent(agent.id)
+        self.assertEqual(loaded_agent.name, "Test Agent")
+        self.assertEqual(loaded_agent.provider.name, "Test Provider")
+        self.assertEqual(loaded_agent.supported_llms[0].provider.id, provider.id)
+
+    def test_agents_are_saved_without_provider_objects(self):
+        """Test that only provider IDs are persisted and old embedded files still load."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        db.add_agent(make_agent(
+            provider.id,
+            supported_llms=[LLMSupport(model_name="gpt-4", provider_id=provider.id)]
+        ))
+
+        with open(db.agents_file) as f:
+            saved = json.load(f)["records"]
+        self.assertNotIn("provider", saved[0])
+        self.assertNotIn("provider", saved[0]["supported_llms"][0])
+        self.assertEqual(saved[0]["provider_id"], provider.id)
+
+        # Older files embedded full provider objects, possibly stale ones
+        saved[0]["provider"] = dict(provider.model_dump(), name="Stale Name")
+        with open(db.agents_file, 'w') as f:
+            json.dump(saved, f, default=str)
+        loaded = JSONDatabase(self.data_dir).get_all_agents()[0]
+        self.assertEqual(loaded.provider.name, "Test Provider")
+
+    def test_search_agents_follows_mutations(self):
+        """Test that search results reflect added, updated and deleted agents."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        agent = db.add_agent(make_agent(provider.id, name="Report Writer", description="Writes summaries"))
+        self.assertEqual(db.search_agents("report"), [agent])
+
+        db.update_agent(agent.model_copy(update={"name": "Chart Builder"}))
+        self.assertEqual(db.search_agents("report"), [])
+        self.assertEqual([a.id for a in db.search_agents("chart")], [agent.id])
+
+        db.delete_agent(agent.id)
+        self.assertEqual(db.search_agents("chart"), [])
+
+    def test_detail_fields_load_on_demand(self):
+        """Test that detail fields are parsed on get_agent and survive updates of summaries."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        agent = db.add_agent(make_agent(
+            provider.id,
+            example_prompts=["Summarize this paper"],
+            code_snippets=[CodeSnippet(language="python", code="run()", description="Literature search setup")],
+            resource_requirements=ResourceRequirement(gpu_required=True)
+        ))
+
+        reloaded = JSONDatabase(self.data_dir)
+        summary = reloaded.get_all_agents()[0]
+        self.assertEqual(summary.code_snippets, [])
+        self.assertEqual([a.id for a in reloaded.search_agents("literature")], [agent.id])
+
+        reloaded.update_agent(summary.model_copy(update={"name": "Renamed", "example_prompts": []}))
+        loaded = JSONDatabase(self.data_dir).get_agent(agent.id)
+        self.assertEqual(loaded.name, "Renamed")
+        self.assertEqual(loaded.example_prompts, [])
+        self.assertEqual(loaded.code_snippets, agent.code_snippets)
+        self.assertTrue(loaded.resource_requirements.gpu_required)
+
+    def test_compact_snapshots_and_pretty_export(self):
+        """Test that snapshots are compact by default and readable with either codec."""
+        for codec in ("json", "orjson"):
+            with self.subTest(codec=codec):
+                data_dir = os.path.join(self.data_dir, codec)
+                try:
+                    db = JSONDatabase(data_dir, codec=codec)
+                except ValueError:
+                    self.skipTest("orjson is not installed")
+                provider = db.add_provider(make_provider())
+                agent = db.add_agent(make_agent(provider.id, example_prompts=["Plan a trip"]))
+                with open(db.agents_file) as f:
+                    self.assertEqual(len(f.read().splitlines()), 1)
+
+                # Unloaded detail fields are written back unchanged
+                reloaded = JSONDatabase(data_dir, codec="json")
+                reloaded.export_json(os.path.join(data_dir, "export"))
+                with open(os.path.join(data_dir, "export", "agents.json")) as f:
+                    self.assertGreater(len(f.read().splitlines()), 1)
+                exported = JSONDatabase(os.path.join(data_dir, "export"))
+                self.assertEqual(exported.get_agent(agent.id).example_prompts, ["Plan a trip"])
+                self.assertEqual(exported.get_provider(provider.id), provider)
+
+    def test_trusted_load_requires_intact_snapshots(self):
+        """Test that only unmodified snapshots take the trusted path and edited ones are validated."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        agent = db.add_agent(make_agent(provider.id, example_prompts=["Plan a trip"]))
+        reloaded = JSONDatabase(self.data_dir)
+        self.assertTrue(reloaded.get_metrics()["last_load_trusted"])
+        self.assertEqual(reloaded.get_agent(agent.id), agent)
+
+        with open(db.agents_file) as f:
+            content = f.read()
+        with open(db.agents_file, 'w') as f:
+            f.write(content.replace("Test Agent", "Edited Agent"))
+        edited = JSONDatabase(self.data_dir)
+        self.assertFalse(edited.get_metrics()["last_load_trusted"])
+        self.assertEqual(edited.get_agent(agent.id).name, "Edited Agent")
+        self.assertEqual(edited.get_agent(agent.id).example_prompts, ["Plan a trip"])
+
+        with open(db.agents_file, 'w') as f:
+            f.write(content.replace('"planning":"basic"', '"planning":"psychic"'))
+        with self.assertRaises(ValueError):
+            JSONDatabase(self.data_dir)
+
+    def test_parallel_load_matches_serial_load(self):
+        """Test that loading in worker processes gives the same catalog, in file order."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        llm_provider = db.add_provider(make_provider("LLM Provider"))
+        for i in range(5):
+            db.add_agent(make_agent(
+                provider.id, name=f"Agent {i}", example_prompts=[f"Prompt {i}"],
+                supported_llms=[LLMSupport(model_name="gpt-4", provider_id=llm_provider.id)]
+            ))
+        # An indented export and an edited snapshot both need full validation
+        export_dir = os.path.join(self.data_dir, "export")
+        db.export_json(export_dir)
+        with open(db.agents_file) as f:
+            content = f.read().replace("Agent 3", "Edited Agent")
+        with open(db.agents_file, 'w') as f:
+            f.write(content)
+
+        with mock.patch("database.PARALLEL_LOAD_MIN_BYTES", 0):
+            for data_dir in (export_dir, self.data_dir):
+                serial = JSONDatabase(data_dir, load_workers=1)
+                loaded = JSONDatabase(data_dir, load_workers=2)
+                self.assertEqual(loaded.get_metrics()["last_load_workers"], 2)
+                self.assertEqual(list(loaded.agents), list(serial.agents))
+                for agent_id in serial.agents:
+                    self.assertEqual(loaded.get_agent(agent_id), serial.get_agent(agent_id))
+                    self.assertIs(loaded.agents[agent_id].provider, loaded.providers[provider.id])
+                    self.assertIs(loaded.agents[agent_id].supported_llms[0].provider, loaded.providers[llm_provider.id])
+                self.assertEqual(loaded.search_index.search("edited prompt"), serial.search_index.search("edited prompt"))
+                self.assertEqual(loaded.get_agents_by_provider(llm_provider.id, include_nested=True),
+                                 loaded.get_all_agents())
+
+    def test_background_load_matches_load(self):
+        """Test that streaming agents in the background gives the same catalog and indexes."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        for i in range(7):
+            db.add_agent(make_agent(provider.id, name=f"Agent {i}", tags=[f"tag{i % 2}"], example_prompts=[f"Prompt {i}"]))
+        export_dir = os.path.join(self.data_dir, "export")
+        db.export_json(export_dir)
+        
+        with mock.patch("database.BACKGROUND_LOAD_MIN_BYTES", 0), mock.patch("database.BACKGROUND_LOAD_BATCH_SIZE", 3):
+            for data_dir in (self.data_dir, export_dir):
+                loaded = JSONDatabase(data_dir, background_load=True)
+                self.assertTrue(loaded.wait_until_loaded(timeout=10))
+                self.assertFalse(loaded.is_loading())
+                self.assertEqual(loaded.get_metrics()["load_progress"], 1.0)
+                self.assertEqual(list(loaded.agents), list(db.agents))
+                for query, tags in (("", None), ("prompt", ["tag1"])):
+                    total, agents = loaded.query_agents(query, tags=tags, sort="name")
+                    expected_total, expected = db.query_agents(query, tags=tags, sort="name")
+                    self.assertEqual((total, [a.id for a in agents]), (expected_total, [a.id for a in expected]))
+                self.assertEqual(loaded.get_facet_counts(), db.get_facet_counts())
+                agent_id = next(iter(db.agents))
+                self.assertEqual(loaded.get_agent(agent_id), db.get_agent(agent_id))
+    
+    def test_background_load_applies_journal_and_reports_errors(self):
+        """Test that a background load replays the journal and that a failed load blocks changes."""
+        db = JSONDatabase(self.data_dir, journal=True)
+        provider = db.add_provider(make_provider())
+        agent = db.add_agent(make_agent(provider.id))
+        db.compact()
+        db.update_agent(agent.model_copy(update={"name": "Renamed Agent"}))
+        
+        with mock.patch("database.BACKGROUND_LOAD_MIN_BYTES", 0):
+            loaded = JSONDatabase(self.data_dir, journal=True, background_load=True)
+            loaded.wait_until_loaded()
+            self.assertEqual(loaded.query_agents("renamed")[1][0].name, "Renamed Agent")
+            
+            with open(db.agents_file, 'w') as f:
+                f.write("[{")
+            broken = JSONDatabase(self.data_dir, background_load=True)
+            with self.assertRaises(RuntimeError):
+                broken.wait_until_loaded()
+            with self.assertRaises(RuntimeError):
+                broken.add_provider(make_provider("Other Provider"))
+    
+    def test_delete_provider_clears_references(self):
+        """Test that deleting a provider unlinks it from agents."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        agent = db.add_agent(make_agent(provider.id))
+
+        self.assertTrue(db.delete_provider(provider.id))
+        self.assertIsNone(db.get_agent(agent.id).provider)
+        self.assertFalse(db.delete_provider(provider.id))
+
+
+class TestProviderReverseIndex(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = JSONDatabase(self.data_dir)
+        self.provider = self.db.add_provider(make_provider())
+        self.llm_provider = self.db.add_provider(make_provider("LLM Provider"))
+        self.agent = self.db.add_agent(make_agent(
+            self.provider.id,
+            supported_llms=[LLMSupport(model_name="gpt-4", provider_id=self.llm_provider.id)]
+        ))
+
+    def test_get_agents_by_provider(self):
+        """Test direct and nested provider lookups."""
+        self.assertEqual(self.db.get_agents_by_provider(self.provider.id), [self.agent])
+        self.assertEqual(self.db.get_agents_by_provider(self.llm_provider.id), [])
+        self.assertEqual(self.db.get_agents_by_provider(self.llm_provider.id, include_nested=True), [self.agent])
+
+    def test_update_provider_relinks_referencing_agents(self):
+        """Test that provider updates reach nested references through the index."""
+        updated = self.llm_provider.model_copy(update={"name": "Renamed"})
+        self.db.update_provider(updated)
+        self.assertEqual(self.db.get_agent(self.agent.id).supported_llms[0].provider.name, "Renamed")
+
+    def test_index_follows_agent_changes(self):
+        """Test that updating and deleting agents keeps the index current."""
+        other = self.db.add_provider(make_provider("Other Provider"))
+        moved = self.agent.model_copy(update={"provider_id": other.id, "supported_llms": []})
+        self.db.update_agent(moved)
+        self.assertEqual(self.db.get_agents_by_provider(self.provider.id), [])
+        self.assertEqual(self.db.get_agents_by_provider(self.llm_provider.id, include_nested=True), [])
+        self.assertEqual(self.db.get_agents_by_provider(other.id), [moved])
+
+        self.db.delete_agent(moved.id)
+        self.assertEqual(self.db.get_agents_by_provider(other.id), [])
+
+
+class TestQueryAgents(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = JSONDatabase(self.data_dir)
+        beta = self.db.add_provider(make_provider("Beta"))
+        alpha = self.db.add_provider(make_provider("Alpha"))
+        self.db.add_agent(make_agent(beta.id, name="Charlie", domains=[AgentDomain.CODING]))
+        self.db.add_agent(make_agent(alpha.id, name="Bravo", description="Writes code"))
+        self.db.add_agent(make_agent(beta.id, name="Alpha Coder", domains=[AgentDomain.CODING]))
+
+    def names(self, **kwargs):
+        total, agents = self.db.query_agents(**kwargs)
+        return total, [a.name for a in agents]
+
+    def test_sort_and_paginate(self):
+        """Test that the total covers all matches while only one page is returned."""
+        self.assertEqual(self.names(limit=2), (3, ["Alpha Coder", "Bravo"]))
+        self.assertEqual(self.names(offset=2, limit=2), (3, ["Charlie"]))
+        self.assertEqual(self.names(sort="provider"), (3, ["Bravo", "Charlie", "Alpha Coder"]))
+        self.assertEqual(self.names(sort="updated_at", limit=1), (3, ["Alpha Coder"]))
+
+    def test_filters_and_query(self):
+        """Test that filters and search text narrow the results."""
+        self.assertEqual(self.names(domains=[AgentDomain.CODING]), (2, ["Alpha Coder", "Charlie"]))
+        self.assertEqual(self.names(query="cod", sort="relevance"), (2, ["Alpha Coder", "Bravo"]))
+        self.assertEqual(self.names(query="cod", domains=["coding"]), (1, ["Alpha Coder"]))
+
+    def test_sort_keys_follow_changes(self):
+        """Test that name sorting ignores case and provider renames re-sort agents."""
+        bravo = self.db.query_agents(limit=2)[1][1]
+        self.db.update_agent(bravo.model_copy(update={"name": "bravo"}))
+        self.assertEqual(self.names(), (3, ["Alpha Coder", "bravo", "Charlie"]))
+
+        alpha = self.db.get_provider(bravo.provider_id)
+        beta = [p for p in self.db.get_all_providers() if p.name == "Beta"][0]
+        self.db.update_provider(beta.model_copy(update={"name": "Aardvark"}))
+        self.assertEqual(self.names(sort="provider"), (3, ["Charlie", "Alpha Coder", "bravo"]))
+        self.db.delete_provider(alpha.id)
+        self.assertEqual(self.names(sort="provider", limit=1), (3, ["bravo"]))
+
+    def test_edits_keep_catalog_order(self):
+        """Test that edited agents keep their facet slot, so filters list agents in catalog order."""
+        charlie = self.db.get_all_agents()[0]
+        for name in ("Charlie 2", "Charlie 3"):
+            self.db.update_agent(charlie.model_copy(update={"name": name}))
+        self.db.add_agent(self.db.get_all_agents()[1].model_copy(update={"description": "Reviews code"}))
+        catalog = [agent.name for agent in self.db.get_all_agents()]
+        self.assertEqual(catalog, ["Charlie 3", "Bravo", "Alpha Coder"])
+        index = self.db.facet_index
+        self.assertEqual([self.db.agents[agent_id].name for agent_id in index.ids(index.all)], catalog)
+        self.assertEqual(len(index._ids), 3)
+
+    def test_sorted_search_results(self):
+        """Test that search matches can be sorted by a stored key."""
+        self.assertEqual(self.names(query="cod", sort="name", limit=1), (2, ["Alpha Coder"]))
+        self.assertEqual(self.names(query="cod", sort="provider"), (2, ["Bravo", "Alpha Coder"]))
+
+    def test_unknown_sort(self):
+        """Test that an unknown sort option is rejected."""
+        with self.assertRaises(ValueError):
+            self.db.query_agents(sort="stars")
+
+    def test_name_prefix_lookup(self):
+        """Test that name prefixes match case-insensitively, in name order, and follow renames."""
+        lookup = lambda prefix, limit=None: [a.name for a in self.db.get_agents_by_name_prefix(prefix, limit)]
+        self.assertEqual(lookup("ALPHA"), ["Alpha Coder"])
+        self.assertEqual(lookup("", limit=2), ["Alpha Coder", "Bravo"])
+        self.assertEqual(lookup("d"), [])
+
+        charlie = self.db.get_agents_by_name_prefix("charlie")[0]
+        generation = self.db.generation
+        self.db.update_agent(charlie.model_copy(update={"name": "Alpine"}))
+        self.assertEqual(lookup("alp"), ["Alpha Coder", "Alpine"])
+        self.assertGreater(self.db.generation, generation)
+
+
+class TestCatalogCounts(DatabaseTestCase):
+    def recount(self, db):
+        """Count the catalog by scanning it, as the dashboard used to."""
+        counts = {"providers": len(db.get_all_providers()), "agents": len(db.get_all_agents()),
+                  "provider_type": {}, "provider": {}, "domain": {}, "planning": {}, "tool_use": {}}
+        for provider in db.get_all_providers():
+            value = provider.provider_type.value
+            counts["provider_type"][value] = counts["provider_type"].get(value, 0) + 1
+        for agent in db.get_all_agents():
+            values = [("provider", agent.provider_id), ("planning", agent.features.planning.value),
+                      ("tool_use", agent.features.tool_use.value)]
+            values += [("domain", domain.value) for domain in set(agent.domains)]
+            for key, value in values:
+                counts[key][value] = counts[key].get(value, 0) + 1
+        return counts
+
+    def test_counts_follow_mutations(self):
+        """Test that maintained counts match a full recount after every kind of change."""
+        db = JSONDatabase(self.data_dir, journal=True)
+        company = db.add_provider(make_provider("Company", provider_type=ProviderType.COMPANY))
+        framework = db.add_provider(make_provider("Framework", provider_type=ProviderType.FRAMEWORK))
+        coder = db.add_agent(make_agent(company.id, name="Coder", domains=[AgentDomain.CODING]))
+        db.add_agents([
+            make_agent(framework.id, name=f"Agent {i}", domains=[AgentDomain.RESEARCH, AgentDomain.CODING])
+            for i in range(3)
+        ])
+        self.assertEqual(db.get_catalog_counts(), self.recount(db))
+        self.assertEqual(db.get_catalog_counts()["domain"], {"coding": 4, "research": 3})
+
+        coder.features = AgentFeatures(planning=PlanningCapability.ADVANCED)
+        coder.domains = [AgentDomain.CREATIVE]
+        db.update_agent(coder)
+        db.delete_agent(db.get_agents_by_provider(framework.id)[0].id)
+        framework.provider_type = ProviderType.OPEN_SOURCE
+        db.update_provider(framework)
+        db.delete_provider(company.id)
+        self.assertEqual(db.get_catalog_counts(), self.recount(db))
+        self.assertEqual(db.get_catalog_counts()["provider_type"], {"open_source": 1})
+        self.assertEqual(db.get_providers_by_type(ProviderType.OPEN_SOURCE), [framework])
+        self.assertEqual(db.get_providers_by_type("framework"), [])
+
+        # Rebuilt from the snapshots and the journal on load
+        self.assertEqual(JSONDatabase(self.data_dir, journal=True).get_catalog_counts(), db.get_catalog_counts())
+
+
+class TestJournal(DatabaseTestCase):
+    def test_mutations_are_appended_and_replayed(self):
+        """Test that journaled mutations leave snapshots untouched and replay on load."""
+        db = JSONDatabase(self.data_dir, journal=True)
+        provider = db.add_provider(make_provider())
+        agent = db.add_agent(make_agent(provider.id))
+        db.delete_agent(agent.id)
+        kept = db.add_agent(make_agent(provider.id, name="Kept Agent"))
+
+        self.assertFalse(os.path.exists(db.agents_file))
+        with open(db.journal_file) as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+        reloaded = JSONDatabase(self.data_dir, journal=True)
+        self.assertEqual([a.id for a in reloaded.get_all_agents()], [kept.id])
+        self.assertEqual(reloaded.get_agent(kept.id).provider.id, provider.id)
+
+    def test_compaction_on_threshold(self):
+        """Test that the journal is folded into the snapshots at the threshold."""
+        db = JSONDatabase(self.data_dir, journal=True, compact_threshold=3)
+        provider = db.add_provider(make_provider())
+        db.add_agent(make_agent(provider.id))
+        with mock.patch.object(db, "_background_compact") as background_compact:
+            db.add_agent(make_agent(provider.id, name="Second Agent"))
+            # The writer reaching the threshold only renames the journal
+            self.assertFalse(os.path.exists(db.journal_file))
+            self.assertFalse(os.path.exists(db.agents_file))
+            db._compaction.join()
+        background_compact.assert_called_once()
+        db._background_compact(*background_compact.call_args.args)
+
+        self.assertFalse(os.path.exists(db.compacting_journal_file))
+        with open(db.agents_file) as f:
+            self.assertEqual(len(json.load(f)["records"]), 2)
+
+    def test_compaction_keeps_details_of_agents_changed_meanwhile(self):
+        """Test that the background snapshot keeps the unloaded details taken with its records."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        agent = db.add_agent(make_agent(provider.id, example_prompts=["Plan my week"]))
+
+        db = JSONDatabase(self.data_dir, journal=True, compact_threshold=1)
+        with mock.patch.object(db, "_background_compact") as background_compact:
+            db.add_agent(make_agent(provider.id, name="Second Agent"))
+            db._compaction.join()
+        # Updating the summary record parses the stored details into the new version
+        db.update_agent(db.get_all_agents()[0].model_copy(update={"name": "Renamed"}))
+        db._background_compact(*background_compact.call_args.args)
+
+        with open(db.agents_file) as f:
+            details = json.loads(json.load(f)["details"][agent.id])
+        self.assertEqual(details["example_prompts"], ["Plan my week"])
+        self.assertIsNone(db._compaction)
+
+    def test_changes_during_compaction_are_kept(self):
+        """Test that changes made while a compaction runs, or after it was interrupted, are replayed."""
+        db = JSONDatabase(self.data_dir, journal=True, compact_threshold=2)
+        provider = db.add_provider(make_provider())
+        with mock.patch.object(db, "_background_compact"):
+            first = db.add_agent(make_agent(provider.id))
+            db._compaction.join()
+        second = db.add_agent(make_agent(provider.id, name="Second Agent"))
+        self.assertTrue(os.path.exists(db.compacting_journal_file))
+
+        reloaded = JSONDatabase(self.data_dir, journal=True)
+        self.assertEqual([a.id for a in reloaded.get_all_agents()], [first.id, second.id])
+        # The interrupted compaction is finished on load
+        self.assertFalse(os.path.exists(reloaded.compacting_journal_file))
+        self.assertFalse(os.path.exists(reloaded.journal_file))
+        self.assertEqual(len(JSONDatabase(self.data_dir).get_all_agents()), 2)
+
+    def test_replayed_provider_deletion_unlinks_agents(self):
+        """Test that agents of a provider deleted in the journal lose its object on reload."""
+        db = JSONDatabase(self.data_dir, journal=True)
+        provider = db.add_provider(make_provider("Acme"))
+        kept = db.add_provider(make_provider("Kept"))
+        agent = db.add_agent(make_agent(provider.id, supported_llms=[
+            LLMSupport(model_name="acme-1", provider_id=provider.id),
+            LLMSupport(model_name="kept-1", provider_id=kept.id),
+        ]))
+        db.delete_provider(provider.id)
+
+        reloaded = JSONDatabase(self.data_dir, journal=True)
+        self.assertEqual([p.id for p in reloaded.get_all_providers()], [kept.id])
+        replayed = reloaded.get_agent(agent.id)
+        self.assertIsNone(replayed.provider)
+        self.assertEqual([llm.provider and llm.provider.name for llm in replayed.supported_llms], [None, "Kept"])
+
+    def test_torn_final_line_is_ignored(self):
+        """Test that an interrupted append does not prevent loading."""
+        db = JSONDatabase(self.data_dir, journal=True)
+        db.add_provider(make_provider())
+        with open(db.journal_file, 'a') as f:
+            f.write('{"op": "put", "kind": "prov')
+
+        reloaded = JSONDatabase(self.data_dir, journal=True)
+        self.assertEqual(len(reloaded.get_all_providers()), 1)
+
+        # Appends after recovery must still be readable
+        reloaded.add_provider(make_provider("Other Provider"))
+        self.assertEqual(len(JSONDatabase(self.data_dir, journal=True).get_all_providers()), 2)
+
+    def test_leftover_journal_is_compacted_without_journal_mode(self):
+        """Test that a snapshot-mode database folds an existing journal on load."""
+        db = JSONDatabase(self.data_dir, journal=True)
+        db.add_provider(make_provider())
+
+        snapshot_db = JSONDatabase(self.data_dir)
+        self.assertEqual(len(snapshot_db.get_all_providers()), 1)
+        self.assertFalse(os.path.exists(snapshot_db.journal_file))
+
+
+class TestWriteBatching(DatabaseTestCase):
+    def test_batch_writes_snapshots_once(self):
+        """Test that mutations in a batch are saved together when the outermost batch exits."""
+        db = JSONDatabase(self.data_dir)
+        with mock.patch.object(db, "_save_data", wraps=db._save_data) as save:
+            with db.batch():
+                provider = db.add_provider(make_provider())
+                with db.batch():
+                    agent = db.add_agent(make_agent(provider.id))
+                agent.name = "Renamed Agent"
+                db.update_agent(agent)
+                self.assertEqual(save.call_count, 0)
+                self.assertFalse(os.path.exists(db.agents_file))
+            self.assertEqual(save.call_count, 1)
+
+        reloaded = JSONDatabase(self.data_dir)
+        self.assertEqual(reloaded.get_agent(agent.id).name, "Renamed Agent")
+        self.assertEqual(db.get_metrics()["changes"], 3)
+        self.assertEqual(db.get_metrics()["flushes"], 1)
+
+    def test_batch_appends_journal_with_one_fsync(self):
+        """Test that a journaled batch is one append of the latest version of each record."""
+        db = JSONDatabase(self.data_dir, journal=True)
+        with mock.patch("database.os.fsync", wraps=os.fsync) as fsync:
+            with db.batch():
+                provider = db.add_provider(make_provider())
+                agent = db.add_agent(make_agent(provider.id))
+                db.update_agent(agent)
+                removed = db.add_agent(make_agent(provider.id, name="Removed Agent"))
+                db.delete_agent(removed.id)
+            self.assertEqual(fsync.call_count, 1)
+
+        with open(db.journal_file) as f:
+            self.assertEqual(len(f.readlines()), 3)
+        reloaded = JSONDatabase(self.data_dir, journal=True)
+        self.assertEqual([a.id for a in reloaded.get_all_agents()], [agent.id])
+
+    def test_batch_flushes_when_the_block_raises(self):
+        """Test that changes made before an error in a batch are still saved."""
+        db = JSONDatabase(self.data_dir)
+        with self.assertRaises(ValueError):
+            with db.batch():
+                db.add_provider(make_provider())
+                db.update_agent(make_agent("missing"))
+        self.assertEqual(len(JSONDatabase(self.data_dir).get_all_providers()), 1)
+
+    def test_flush_interval_coalesces_writes(self):
+        """Test that timed flushing writes all changes since the last flush at once."""
+        db = JSONDatabase(self.data_dir, flush_interval=60)
+        provider = db.add_provider(make_provider())
+        db.add_agent(make_agent(provider.id))
+        self.assertEqual(db.get_metrics()["pending_changes"], 2)
+        self.assertFalse(os.path.exists(db.providers_file))
+
+        # A reload check must not drop changes that are not written yet
+        self.assertFalse(db.reload_if_changed())
+        self.assertEqual(db.get_metrics()["flushes"], 1)
+        self.assertEqual(len(JSONDatabase(self.data_dir).get_all_agents()), 1)
+
+        timed = JSONDatabase(self.data_dir, flush_interval=0.01)
+        timed.add_agent(make_agent(provider.id, name="Second Agent"))
+        timed._flush_timer.join(5)
+        self.assertEqual(timed.get_metrics()["pending_changes"], 0)
+        self.assertEqual(len(JSONDatabase(self.data_dir).get_all_agents()), 2)
+
+
+class TestCompactRecords(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        snippets = [CodeSnippet(language="python", code="print(1)", description="Run")]
+        for name in ("First Agent", "Second Agent"):
+            db.add_agent(make_agent(provider.id, name=name, tags=["python"], code_snippets=snippets,
+                                    supported_llms=[LLMSupport(model_name="gpt-4", provider_id=provider.id)]))
+        self.db = JSONDatabase(self.data_dir)
+        self.first, self.second = sorted(self.db.agents.values(), key=lambda agent: agent.name)
+
+    def test_repeated_values_are_shared(self):
+        """Test that equal strings and fields sets of different agents are one object."""
+        self.assertIs(self.first.tags[0], self.second.tags[0])
+        self.assertIs(self.first.supported_llms[0].model_name, self.second.supported_llms[0].model_name)
+        self.assertIs(self.first.model_fields_set, self.second.model_fields_set)
+        self.assertIs(self.first.features.model_fields_set, self.second.features.model_fields_set)
+        self.assertGreater(self.db.get_metrics()["interned_values"], 0)
+
+        plain = JSONDatabase(self.data_dir, compact_records=False)
+        first, second = plain.agents.values()
+        self.assertIsNot(first.model_fields_set, second.model_fields_set)
+
+    def test_assignment_copies_shared_fields_set(self):
+        """Test that setting a new field on one agent leaves the other agents unchanged."""
+        # Summary records share a fields set without the detail fields
+        self.assertNotIn("code_snippets", self.first.model_fields_set)
+        self.first.code_snippets = []
+        self.assertIn("code_snippets", self.first.model_fields_set)
+        self.assertNotIn("code_snippets", self.second.model_fields_set)
+
+        # Details are kept for the other agent, as its record is still a summary
+        self.second.name = "Renamed Agent"
+        self.db.update_agent(self.second)
+        reloaded = JSONDatabase(self.data_dir).get_agent(self.second.id)
+        self.assertEqual(reloaded.name, "Renamed Agent")
+        self.assertEqual(reloaded.code_snippets[0].code, "print(1)")
+
+
+class TestSharedDatabase(DatabaseTestCase):
+    def test_get_database_returns_shared_instance(self):
+        """Test that get_database reuses one instance per data directory."""
+        db = get_database(self.data_dir)
+        self.assertIs(get_database(self.data_dir), db)
+        self.assertEqual(db.get_metrics()["load_count"], 1)
+
+    def test_own_writes_do_not_trigger_reload(self):
+        """Test that saving through the instance does not force a reload."""
+        db = get_database(self.data_dir)
+        db.add_provider(make_provider())
+        self.assertFalse(db.reload_if_changed())
+
+    def test_reload_on_external_change(self):
+        """Test that the shared instance picks up files changed on disk."""
+        db = get_database(self.data_dir)
+        db.add_provider(make_provider())
+
+        other = JSONDatabase(self.data_dir)
+        other.add_provider(make_provider("Other Provider"))
+        # Make sure the change is visible even on coarse mtime filesystems
+        with open(db.providers_file) as f:
+            providers = json.load(f)
+        with open(db.providers_file, 'w') as f:
+            json.dump(providers, f, indent=4)
+
+        self.assertEqual(len(get_database(self.data_dir).get_all_providers()), 2)
+        self.assertEqual(db.get_metrics()["load_count"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from schema import AgentFeatures, AgentDomain, MemoryType, PlanningCapability
+from facets import FacetIndex
+from tests.test_database import make_agent
+
+
+class TestFacetIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = FacetIndex()
+        self.coder = make_agent(
+            "p1", name="Coder",
+            domains=[AgentDomain.CODING],
+            features=AgentFeatures(planning=PlanningCapability.ADVANCED, autonomous=True),
+            tags=["python"]
+        )
+        self.analyst = make_agent(
+            "p2", name="Analyst",
+            domains=[AgentDomain.DATA_ANALYSIS, AgentDomain.CODING],
+            features=AgentFeatures(memory=[MemoryType.LONG_TERM]),
+            tags=["sql", "python"]
+        )
+        self.writer = make_agent("p1", name="Writer", domains=[AgentDomain.CREATIVE])
+        for agent in (self.coder, self.analyst, self.writer):
+            self.index.add(agent)
+
+    def names(self, selections):
+        ids = self.index.ids(self.index.match(selections))
+        return [{a.id: a.name for a in (self.coder, self.analyst, self.writer)}[i] for i in ids]
+
+    def test_and_across_facets_or_within(self):
+        """Test that values of one facet are ORed and facets are ANDed."""
+        self.assertEqual(self.names({"domain": [AgentDomain.CODING, "creative"]}), ["Coder", "Analyst", "Writer"])
+        self.assertEqual(self.names({"domain": ["coding"], "provider": ["p1"]}), ["Coder"])
+        self.assertEqual(self.names({"tag": ["python"], "autonomous": [False]}), ["Analyst"])
+        self.assertEqual(self.names({"tag": ["missing"]}), [])
+
+    def test_counts_exclude_own_facet(self):
+        """Test that each facet is counted with only the other facets' selections."""
+        counts = self.index.counts({"provider": ["p1"]})
+        self.assertEqual(counts["provider"], {"p1": 2, "p2": 1})
+        self.assertEqual(counts["domain"], {"coding": 1, "creative": 1})
+        self.assertEqual(counts["autonomous"], {True: 1, False: 1})
+
+    def test_update_keeps_slot_and_remove(self):
+        """Test that updates replace values in place and removals clear all bitmaps."""
+        self.index.add(self.coder.model_copy(update={"tags": ["rust"]}))
+        self.assertEqual(self.names({"tag": ["python"]}), ["Analyst"])
+        self.assertEqual(self.names({}), ["Coder", "Analyst", "Writer"])
+
+        self.index.remove(self.analyst.id)
+        self.assertEqual(self.names({"tag": ["python"]}), [])
+        self.assertNotIn("sql", self.index.bitmaps["tag"])
+        self.assertEqual(len(self.index), 2)
+
+    def test_add_all_matches_add(self):
+        """Test that bulk indexing gives the same bitmaps as adding agents one by one."""
+        bulk = FacetIndex()
+        bulk.add_all([self.coder, self.analyst, self.writer])
+        self.assertEqual(bulk.bitmaps, self.index.bitmaps)
+        self.assertEqual(bulk.all, self.index.all)
+
+
+if __name__ == '__main__':
+    unittest.main()
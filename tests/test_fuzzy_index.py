@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from schema import LLMSupport
+from database import JSONDatabase
+from fuzzy_index import FuzzyIndex, edit_distance, trigrams
+from tests.test_database import DatabaseTestCase, make_agent, make_provider
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    def setUp(self):
+        self.autogen = make_agent("p1", name="AutoGen Planner", tags=["multi-agent"],
+                                  supported_llms=[LLMSupport(model_name="gpt-4o")])
+        self.llama = make_agent("p2", name="LlamaIndex Retriever", tags=["rag"],
+                                supported_llms=[LLMSupport(model_name="llama-3")])
+        self.writer = make_agent("p2", name="Report Writer", tags=["writing"])
+        self.index = FuzzyIndex()
+        self.index.add_all([self.autogen, self.llama, self.writer])
+        self.index.set_provider("p1", "Microsoft Research")
+        self.index.set_provider("p2", "Meta AI")
+
+    def ids(self, query, **kwargs):
+        return [agent_id for agent_id, _ in self.index.search(query, **kwargs)]
+
+    def test_trigrams_and_edit_distance(self):
+        """Test padded trigrams and edit distances counting swapped letters as one edit."""
+        self.assertEqual(trigrams("gen"), {"  g", " ge", "gen", "en "})
+        self.assertEqual(edit_distance("agnet", "agent"), 1)
+        self.assertEqual(edit_distance("lama", "llama"), 1)
+        self.assertEqual(edit_distance("", "abc"), 3)
+
+    def test_misspelled_names_match(self):
+        """Test that misspelled and split words find the intended agent first."""
+        self.assertEqual(self.ids("autogne"), [self.autogen.id])
+        self.assertEqual(self.ids("lama index")[0], self.llama.id)
+        self.assertEqual(self.ids("raport writter"), [self.writer.id])
+        self.assertEqual(self.index.match_terms("autogne")[0][0], "autogen")
+        self.assertEqual(self.ids("zzzz"), [])
+
+    def test_tags_llms_and_providers_match(self):
+        """Test matches on tags, run-together model names and provider names, and edit distance scores."""
+        self.assertEqual(self.ids("gpt4o"), [self.autogen.id])
+        self.assertEqual(self.ids("multi agnet"), [self.autogen.id])
+        self.assertEqual(self.ids("microsft"), [self.autogen.id])
+        self.assertEqual(self.ids("meta", limit=1), [self.llama.id])
+        results = self.index.search("retreiver")
+        self.assertEqual([agent_id for agent_id, _ in results], [self.llama.id])
+        self.assertAlmostEqual(results[0][1], 1 - 1 / 9)
+
+    def test_updates_and_removals(self):
+        """Test that re-added agents, renamed or deleted providers and removed agents are reflected."""
+        self.writer.name = "Code Reviewer"
+        self.index.add(self.writer)
+        self.assertEqual(self.ids("raport writter"), [])
+        self.assertEqual(self.ids("reviewr"), [self.writer.id])
+
+        self.index.set_provider("p2", "Hugging Face")
+        self.assertEqual(self.ids("meta"), [])
+        self.assertEqual(self.ids("hugging face"), [self.llama.id, self.writer.id])
+        self.index.set_provider("p2", None)
+        self.assertEqual(self.ids("hugging face"), [])
+
+        self.index.remove(self.autogen.id)
+        self.assertEqual(self.ids("autogne"), [])
+        self.index.add(self.autogen)
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(len(self.index._ids), 3)
+
+    def test_unused_terms_are_dropped(self):
+        """Test that terms of removed agents and renamed providers leave the vocabulary and postings."""
+        num_terms = len(self.index._terms)
+        self.index.remove(self.autogen.id)
+        self.index.set_provider("p2", "Hugging Face")
+        self.assertEqual(self.index.match_terms("autogne"), [])
+        self.assertEqual(self.index.match_terms("meta"), [])
+        for term in ("autogen", "planner", "gpt4o", "meta"):
+            self.assertNotIn(term, self.index._term_ids)
+        self.assertNotIn(" au", self.index._postings)
+
+        # Released IDs are reused
+        self.index.add(self.autogen)
+        self.assertEqual(self.ids("autogne"), [self.autogen.id])
+        self.assertEqual(len(self.index._terms), num_terms)
+        self.assertEqual(self.ids("gpt4o"), [self.autogen.id])
+
+
+class TestFuzzySearch(DatabaseTestCase):
+    def test_fuzzy_fallback_follows_changes(self):
+        """Test that keyword searches without matches fall back to close matches that follow changes."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider("LangChain"))
+        autogen = db.add_agent(make_agent(provider.id, name="AutoGen"))
+        db.add_agent(make_agent(provider.id, name="Report Writer"))
+        self.assertEqual(db.search_agents("autogne"), [])
+        self.assertEqual([agent.name for agent in db.search_agents("autogne", fuzzy=True)], ["AutoGen"])
+        # Exact matches are not mixed with close ones
+        self.assertEqual([agent.name for agent in db.search_agents("autogen", fuzzy=True)], ["AutoGen"])
+
+        db.add_agent(make_agent(provider.id, name="Autogen Studio"))
+        autogen.name = "CrewAI"
+        db.update_agent(autogen)
+        self.assertEqual([agent.name for agent in db.search_agents("autogne", fuzzy=True)], ["Autogen Studio"])
+
+        provider.name = "LlamaIndex"
+        db.update_provider(provider)
+        total, page = db.query_agents("lama index", fuzzy=True, limit=1)
+        self.assertEqual((total, len(page)), (3, 1))
+        self.assertEqual(db.query_agents("lama index", fuzzy=True, provider_id="other")[0], 0)
+        self.assertEqual(db.query_agents("lama index")[0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+import io
+import json
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from json_stream import iter_json
+
+
+class TestIterJSON(unittest.TestCase):
+    def test_array_elements(self):
+        """Test that the elements of a top-level array are yielded one at a time."""
+        text = ' [1, {"a": [2, 3]} ,\n"x"] '
+        items = list(iter_json(text, "records"))
+        self.assertEqual([value for _, value, _ in items], [1, {"a": [2, 3]}, "x"])
+        self.assertEqual({key for key, _, _ in items}, {None})
+        self.assertEqual(items[-1][2], text.rindex("]"))
+
+    def test_object_with_streamed_member(self):
+        """Test that only the named array is streamed and other members are yielded whole."""
+        document = {"format": "agent-hub", "records": [{"id": 1}, {"id": 2}], "details": {"1": "{}"}}
+        items = [(key, value) for key, value, _ in iter_json(json.dumps(document, indent=2), "records")]
+        self.assertEqual(items, [
+            ("format", "agent-hub"), (None, {"id": 1}), (None, {"id": 2}), ("details", {"1": "{}"})
+        ])
+        self.assertEqual(list(iter_json('{"records": []}', "records")), [])
+        self.assertEqual(list(iter_json("{}", "records")), [])
+
+    def test_file_is_read_in_chunks(self):
+        """Test that a file decodes like its text, whatever the chunk size, without reading it all first."""
+        document = {"records": [{"id": i, "score": 12345.5, "ok": True} for i in range(50)], "details": {"x": "é" * 40}}
+        text = json.dumps(document, indent=1, ensure_ascii=False) + "\n"
+        expected = list(iter_json(text, "records"))
+        for chunk_size in (1, 7, 64, len(text)):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(list(iter_json(io.StringIO(text), "records", chunk_size=chunk_size)), expected)
+
+        f = io.StringIO(text)
+        items = iter_json(f, "records", chunk_size=64)
+        self.assertEqual(next(items)[1]["id"], 0)
+        self.assertLess(f.tell(), len(text) // 4)
+        self.assertEqual(list(iter_json(io.StringIO("[1, 22]"), "records", chunk_size=1))[-1][1], 22)
+
+    def test_invalid_documents(self):
+        """Test that malformed documents raise ValueError."""
+        for text in ("[1,]", "[1 2]", "[1] x", '{"a": 1,}', '{"a" 1}', "{1: 2}", '{"records": [1}', "3"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    list(iter_json(text, "records"))
+                with self.assertRaises(ValueError):
+                    list(iter_json(io.StringIO(text), "records", chunk_size=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from schema import AgentFeatures, CodeSnippet
+from search_index import SearchIndex, tokenize
+from tests.test_database import make_agent
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.sql_agent = make_agent(
+            "p1",
+            name="SQL Report Writer",
+            description="Writes reports from a database.",
+            tags=["sql", "reporting"]
+        )
+        self.research_agent = make_agent(
+            "p1",
+            name="Research Assistant",
+            description="Finds papers and writes SQL-free summaries.",
+            features=AgentFeatures(reasoning_frameworks=["ReAct"]),
+            code_snippets=[CodeSnippet(language="python", code="...", description="Literature search setup")]
+        )
+        self.index.add(self.sql_agent)
+        self.index.add(self.research_agent)
+
+    def ids(self, query, **kwargs):
+        return [agent_id for agent_id, _ in self.index.search(query, **kwargs)]
+
+    def test_tokenize(self):
+        """Test that text is split into lowercase words."""
+        self.assertEqual(tokenize("SQL-free Summaries!"), ["sql", "free", "summaries"])
+
+    def test_ranking_prefers_name_and_tag_matches(self):
+        """Test BM25 ranking with field weights."""
+        self.assertEqual(self.ids("sql"), [self.sql_agent.id, self.research_agent.id])
+
+    def test_all_terms_must_match(self):
+        """Test that multi-word queries are combined with AND."""
+        self.assertEqual(self.ids("sql summaries"), [self.research_agent.id])
+        self.assertEqual(self.ids("sql unknownword"), [])
+
+    def test_prefix_matching(self):
+        """Test search-as-you-type prefix matches."""
+        self.assertEqual(self.ids("resea"), [self.research_agent.id])
+        self.assertEqual(self.ids("resea", prefix=False), [])
+
+    def test_secondary_fields_are_indexed(self):
+        """Test reasoning framework and code snippet description matches."""
+        self.assertEqual(self.ids("react"), [self.research_agent.id])
+        self.assertEqual(self.ids("literature"), [self.research_agent.id])
+
+    def test_incremental_update_and_remove(self):
+        """Test that re-adding replaces old terms and removal drops the agent."""
+        renamed = self.sql_agent.model_copy(update={"name": "Dashboard Builder", "tags": []})
+        self.index.add(renamed)
+        self.assertEqual(self.ids("dashboard"), [renamed.id])
+        self.assertEqual(self.ids("writer"), [])
+
+        self.index.remove(renamed.id)
+        self.assertEqual(self.ids("dashboard"), [])
+        self.assertEqual(len(self.index), 1)
+
+    def test_limit(self):
+        """Test that limit returns the top results only."""
+        self.assertEqual(self.ids("sql", limit=1), [self.sql_agent.id])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import sys
+import os
+import tempfile
+import shutil
+import json
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database import JSONDatabase
+from sqlite_database import SQLiteDatabase
+from semantic_index import SemanticIndex, TextEmbedder
+from tests.test_database import DatabaseTestCase, make_agent, make_provider
+
+
+DESCRIPTIONS = {
+    "SQL Reporter": "Runs sql queries against the warehouse and builds data analysis dashboards",
+    "Analyst": "Data analysis and statistics over business data, charts and dashboards",
+    "Storyteller": "Writes short stories, poems and creative fiction",
+    "Poet": "Creative writing assistant for poems and song lyrics",
+    "Coder": "Reviews python code and writes unit tests",
+    "Debugger": "Finds bugs in python code and suggests fixes",
+}
+
+
+def make_agents(provider_id="p1"):
+    return [make_agent(provider_id, name=name, description=description) for name, description in DESCRIPTIONS.items()]
+
+
+class TestSemanticIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.agents = make_agents()
+        self.names = {agent.id: agent.name for agent in self.agents}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def search(self, index, query, **kwargs):
+        return [self.names[agent_id] for agent_id, _ in index.search(query, **kwargs)]
+
+    def test_related_words_match(self):
+        """Test that a query matches descriptions sharing no word with it but used in the same context."""
+        embedder = TextEmbedder.fit(list(DESCRIPTIONS.values()), dim=3)
+        vectors = embedder.embed(["sql reports", *DESCRIPTIONS.values()])
+        scores = dict(zip(DESCRIPTIONS, vectors[1:] @ vectors[0]))
+        self.assertGreater(scores["Analyst"], 0.8)
+        self.assertLess(scores["Poet"], 0.5)
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1, rtol=1e-5)
+
+        index = SemanticIndex(self.directory, dim=3)
+        index.sync(self.agents)
+        self.assertEqual(self.search(index, "statistics", limit=2), ["SQL Reporter", "Analyst"])
+        self.assertEqual(index.search("zzz"), [])
+
+    def test_reopen_embeds_only_changes(self):
+        """Test that stored embeddings are reused and only changed or new agents are embedded."""
+        index = SemanticIndex(self.directory, dim=3)
+        index.sync(self.agents)
+        index.save()
+
+        self.agents[0].description = "Writes poems"
+        del self.agents[1]
+        self.agents.append(make_agent("p1", name="Lyricist", description="Song lyrics and poems"))
+        self.names[self.agents[-1].id] = "Lyricist"
+        reopened = SemanticIndex(self.directory, dim=3)
+        embedded = []
+        embed = reopened.embedder.embed
+        reopened.embedder.embed = lambda texts: embedded.extend(texts) or embed(texts)
+        reopened.sync(self.agents)
+        self.assertEqual([text.split("\n")[0] for text in embedded], ["SQL Reporter", "Lyricist"])
+        self.assertEqual(len(reopened), 6)
+        self.assertNotIn("Analyst", self.search(reopened, "statistics"))
+
+        # An update that leaves the text alone reuses the embedding
+        embedded.clear()
+        reopened.remove(self.agents[1].id)
+        reopened.add(self.agents[1])
+        self.assertEqual(embedded, [])
+
+    def test_clusters_find_the_exact_neighbours(self):
+        """Test that the clustered search agrees with a scan of all agents."""
+        agents = [make_agent("p1", name=f"{agent.name} {i}", description=agent.description)
+                  for i in range(10) for agent in self.agents]
+        index = SemanticIndex(self.directory, dim=3, ann_min_agents=0)
+        index.sync(agents)
+        self.assertGreater(len(index.centroids), 1)
+        exact = index.search("python code", limit=10, probes=len(index.centroids))
+        self.assertEqual({agent_id for agent_id, _ in index.search("python code", limit=10)},
+                         {agent_id for agent_id, _ in exact})
+
+
+class TestSemanticSearch(DatabaseTestCase):
+    def test_semantic_search_follows_changes(self):
+        """Test that semantic search results follow added, updated and deleted agents, also after a reload."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        agents = db.add_agents(make_agents(provider.id))
+        by_name = {agent.name: agent for agent in agents}
+        self.assertEqual(db.search_agents("song lyrics", semantic=True)[0].name, "Poet")
+
+        coder = by_name["Coder"]
+        coder.description = "Writes rhyming poems about code"
+        db.update_agent(coder)
+        db.delete_agent(by_name["Poet"].id)
+        names = [agent.name for agent in db.search_agents("poems", semantic=True)]
+        self.assertIn("Coder", names)
+        self.assertNotIn("Poet", names)
+
+        reloaded = JSONDatabase(self.data_dir)
+        total, page = reloaded.query_agents("poems", semantic=True, sort="relevance", limit=1)
+        self.assertEqual(total, len(names))
+        self.assertEqual(page[0].name, names[0])
+        self.assertEqual(reloaded.query_agents("poems", semantic=True, provider_id="other")[0], 0)
+
+    def test_every_backend_saves_the_index_with_changes(self):
+        """Test that changes persisted by the SQLite backend also write the semantic index."""
+        db = SQLiteDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        db.add_agents(make_agents(provider.id))
+        db.search_agents("poems", semantic=True)
+        added = db.add_agent(make_agent(provider.id, name="Lyricist", description="Song lyrics and poems"))
+        with open(os.path.join(self.data_dir, "semantic", "ids.json")) as f:
+            self.assertIn(added.id, json.load(f))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+import json
+from unittest import mock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from database import JSONDatabase
+from sharded_database import ShardedDatabase, list_record_ids
+from tests.test_database import DatabaseTestCase, make_agent, make_provider
+
+
+class TestShardedDatabase(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = ShardedDatabase(self.data_dir, shards={"provider": 2, "agent": 8})
+        self.provider = self.db.add_provider(make_provider())
+        self.agents = [self.db.add_agent(make_agent(self.provider.id, name=f"Agent {i}")) for i in range(10)]
+
+    def shard_mtimes(self):
+        directory = self.db.shard_dirs["agent"]
+        return {name: os.stat(os.path.join(directory, name)).st_mtime_ns for name in os.listdir(directory)}
+
+    def test_records_persist_in_order(self):
+        """Test that records are reloaded from the shards in catalog order with references linked."""
+        reloaded = ShardedDatabase(self.data_dir)
+        self.assertEqual([a.name for a in reloaded.get_all_agents()], [a.name for a in self.agents])
+        self.assertIs(reloaded.get_agent(self.agents[0].id).provider, reloaded.providers[self.provider.id])
+        with open(self.db.manifest_file) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["counts"], {"provider": 1, "agent": 10})
+        self.assertEqual(manifest["shards"], {"provider": 2, "agent": 8})
+
+    def test_manifest_lists_records(self):
+        """Test that the manifest lists the record IDs in catalog order as they are added and deleted."""
+        self.assertEqual(list_record_ids(self.data_dir), [a.id for a in self.agents])
+        with self.db.batch():
+            self.db.delete_agent(self.agents[0].id)
+            added = self.db.add_agent(make_agent(self.provider.id, name="Added Agent"))
+            self.db.update_agent(self.agents[1])
+        expected = [a.id for a in self.agents[1:]] + [added.id]
+        self.assertEqual(list_record_ids(self.data_dir), expected)
+        self.assertEqual(list_record_ids(self.data_dir, "provider"), [self.provider.id])
+
+        # Version 1 manifests have no ID lists; they are listed from the shards
+        with open(self.db.manifest_file) as f:
+            manifest = json.load(f)
+        del manifest["ids"]
+        manifest["version"] = 1
+        with open(self.db.manifest_file, 'w') as f:
+            json.dump(manifest, f)
+        with self.assertRaises(ValueError):
+            list_record_ids(self.data_dir)
+        reloaded = ShardedDatabase(self.data_dir)
+        reloaded.delete_agent(added.id)
+        self.assertEqual(list_record_ids(self.data_dir), expected[:-1])
+
+    def test_edit_touches_one_shard(self):
+        """Test that an update rewrites only the shard of the changed agent."""
+        before = self.shard_mtimes()
+        agent = self.agents[3]
+        agent.name = "Renamed Agent"
+        self.db.update_agent(agent)
+        changed = [name for name, mtime in self.shard_mtimes().items() if before.get(name) != mtime]
+        self.assertEqual(changed, [os.path.basename(self.db._shard_path("agent", agent.id))])
+
+        self.assertTrue(self.db.delete_agent(self.agents[0].id))
+        reloaded = ShardedDatabase(self.data_dir)
+        self.assertEqual([a.name for a in reloaded.get_all_agents()][:3], ["Agent 1", "Agent 2", "Renamed Agent"])
+        self.assertEqual(len(reloaded.get_all_agents()), 9)
+
+    def test_batch_writes_each_shard_once(self):
+        """Test that a batch rewrites each touched shard, and the manifest, once."""
+        with mock.patch.object(self.db, "_write_atomic", wraps=self.db._write_atomic) as write:
+            with self.db.batch():
+                for agent in self.agents:
+                    agent.name = f"Batched {agent.name}"
+                    self.db.update_agent(agent)
+                added = self.db.add_agent(make_agent(self.provider.id, name="Added Agent"))
+        paths = [call.args[0] for call in write.call_args_list]
+        self.assertEqual(len(paths), len(set(paths)))
+        self.assertIn(self.db.manifest_file, paths)
+
+        reloaded = ShardedDatabase(self.data_dir)
+        self.assertEqual([a.name for a in reloaded.get_all_agents()],
+                         [a.name for a in self.agents] + [added.name])
+
+    def test_writers_keep_each_others_records(self):
+        """Test that two instances saving agents of the same shard do not overwrite each other."""
+        other = ShardedDatabase(self.data_dir)
+        agent = self.agents[0]
+        path = self.db._shard_path("agent", agent.id)
+        new_id = next(f"agent-{i}" for i in range(1000) if self.db._shard_path("agent", f"agent-{i}") == path)
+
+        agent.name = "Edited Here"
+        self.db.update_agent(agent)
+        other.add_agent(make_agent(self.provider.id, name="Added There", id=new_id))
+
+        reloaded = ShardedDatabase(self.data_dir)
+        self.assertEqual(reloaded.get_agent(agent.id).name, "Edited Here")
+        self.assertEqual(reloaded.get_agent(new_id).name, "Added There")
+        self.assertEqual(len(reloaded.get_all_agents()), 11)
+
+    def test_migration_from_json(self):
+        """Test that a sharded catalog is created from existing JSON files."""
+        other_dir = os.path.join(self.data_dir, "json")
+        json_db = JSONDatabase(other_dir)
+        provider = json_db.add_provider(make_provider())
+        agents = [json_db.add_agent(make_agent(provider.id, name=f"Agent {i}", example_prompts=["Hi"])) for i in range(3)]
+
+        migrated = ShardedDatabase(other_dir)
+        self.assertEqual([a.id for a in migrated.get_all_agents()], [a.id for a in agents])
+        self.assertEqual(migrated.get_agent(agents[0].id).example_prompts, ["Hi"])
+        self.assertTrue(os.path.exists(migrated.manifest_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from schema import AgentDomain, AgentFeatures, LLMSupport, PlanningCapability, ToolUseCapability
+from database import JSONDatabase
+from similarity import SimilarityIndex, encode_agents
+from tests.test_database import DatabaseTestCase, make_agent, make_provider
+
+
+def coding_agent(name, provider_id="p1", **kwargs):
+    kwargs.setdefault("features", AgentFeatures(
+        planning=PlanningCapability.ADVANCED,
+        tool_use=ToolUseCapability.DYNAMIC,
+        reasoning_frameworks=["ReAct"]
+    ))
+    return make_agent(
+        provider_id, name=name,
+        domains=[AgentDomain.CODING],
+        tags=kwargs.pop("tags", ["python", "review"]),
+        supported_llms=[LLMSupport(model_name="gpt-4")],
+        **kwargs
+    )
+
+
+class TestSimilarityIndex(unittest.TestCase):
+    def setUp(self):
+        self.coder = coding_agent("Coder")
+        self.twin = coding_agent("Twin")
+        self.cousin = coding_agent("Cousin", tags=["python", "testing"])
+        self.writer = make_agent(
+            "p2", name="Writer",
+            domains=[AgentDomain.CREATIVE],
+            features=AgentFeatures(planning=PlanningCapability.BASIC, autonomous=True)
+        )
+        self.index = SimilarityIndex()
+        self.index.add_all([self.coder, self.twin, self.cousin, self.writer])
+
+    def test_vectors_are_unit_length(self):
+        """Test that encoded vectors are normalized, so dot products are cosine similarities."""
+        vectors = encode_agents([self.coder, self.writer])
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), [1, 1], rtol=1e-6)
+        np.testing.assert_allclose(encode_agents([self.coder]), encode_agents([self.twin]))
+
+    def test_most_similar_first(self):
+        """Test that neighbours are ranked by shared features and never include the agent itself."""
+        results = self.index.similar(self.coder.id, limit=3)
+        self.assertEqual([agent_id for agent_id, _ in results], [self.twin.id, self.cousin.id, self.writer.id])
+        self.assertAlmostEqual(results[0][1], 1.0, places=5)
+        self.assertGreater(results[1][1], results[2][1])
+        self.assertEqual(len(self.index.similar(self.coder.id, limit=1)), 1)
+        self.assertEqual(self.index.similar("missing"), [])
+
+    def test_updates_and_removals(self):
+        """Test that re-adding an agent replaces its vector and removed rows are reused."""
+        self.index.remove(self.twin.id)
+        self.assertNotIn(self.twin.id, [agent_id for agent_id, _ in self.index.similar(self.coder.id)])
+
+        self.writer.domains = [AgentDomain.CODING]
+        self.writer.tags = ["python", "review"]
+        self.index.add(self.writer)
+        self.assertEqual(self.index.similar(self.coder.id, limit=1)[0][0], self.cousin.id)
+
+        self.index.add(self.twin)
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(len(self.index._ids), 4)
+
+
+class TestSimilarAgents(DatabaseTestCase):
+    def test_similar_agents_follow_changes(self):
+        """Test that the similarity index, once built, follows added, updated and deleted agents."""
+        db = JSONDatabase(self.data_dir)
+        provider = db.add_provider(make_provider())
+        coder = db.add_agent(coding_agent("Coder", provider_id=provider.id))
+        writer = db.add_agent(make_agent(provider.id, name="Writer", domains=[AgentDomain.CREATIVE]))
+        self.assertEqual([agent.name for agent, _ in db.get_similar_agents(coder.id)], ["Writer"])
+
+        twin = db.add_agent(coding_agent("Twin", provider_id=provider.id))
+        self.assertEqual([agent.name for agent, _ in db.get_similar_agents(coder.id)], ["Twin", "Writer"])
+
+        writer.tags = ["python", "review"]
+        writer.domains = [AgentDomain.CODING]
+        db.update_agent(writer)
+        db.delete_agent(twin.id)
+        similar = db.get_similar_agents(coder.id)
+        self.assertEqual([agent.name for agent, _ in similar], ["Writer"])
+        self.assertIs(similar[0][0], db.agents[writer.id])
+
+
+if __name__ == '__main__':
+    unittest.main()
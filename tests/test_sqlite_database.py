@@ -0,0 +1,110 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from schema import AgentFeatures, AgentDomain, MemoryType, PlanningCapability, ProviderType, ToolUseCapability
+from database import JSONDatabase
+from sqlite_database import SQLiteDatabase
+from tests.test_database import DatabaseTestCase, make_agent, make_provider
+
+
+class TestSQLiteDatabase(DatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.db = SQLiteDatabase(self.data_dir)
+        self.company = self.db.add_provider(make_provider("Company", provider_type=ProviderType.COMPANY))
+        self.framework = self.db.add_provider(make_provider("Framework", provider_type=ProviderType.FRAMEWORK))
+        self.coder = self.db.add_agent(make_agent(
+            self.company.id,
+            name="Coder",
+            domains=[AgentDomain.CODING],
+            features=AgentFeatures(
+                planning=PlanningCapability.ADVANCED,
+                memory=[MemoryType.LONG_TERM],
+                autonomous=True,
+                reasoning_frameworks=["ReAct"]
+            )
+        ))
+        self.helper = self.db.add_agent(make_agent(
+            self.framework.id,
+            name="Helper",
+            domains=[AgentDomain.CUSTOMER_SERVICE]
+        ))
+
+    def test_records_persist(self):
+        """Test that records are reloaded from the database file with references linked."""
+        reloaded = SQLiteDatabase(self.data_dir)
+        self.assertEqual([a.name for a in reloaded.get_all_agents()], ["Coder", "Helper"])
+        self.assertEqual(reloaded.get_agent(self.coder.id).provider.name, "Company")
+
+    def test_update_and_delete(self):
+        """Test that updates keep order and deletes remove child rows."""
+        self.coder.name = "Senior Coder"
+        self.db.update_agent(self.coder)
+        self.assertTrue(self.db.delete_agent(self.helper.id))
+
+        reloaded = SQLiteDatabase(self.data_dir)
+        self.assertEqual([a.name for a in reloaded.get_all_agents()], ["Senior Coder"])
+        self.assertEqual(reloaded.filter_agents(domains=["customer_service"]), [])
+
+    def test_batch_commits_once(self):
+        """Test that a batch is written in a single transaction."""
+        flushes = self.db.get_metrics()["flushes"]
+        with self.db.batch():
+            self.coder.name = "Senior Coder"
+            self.db.update_agent(self.coder)
+            self.db.delete_agent(self.helper.id)
+            self.db.delete_provider(self.framework.id)
+        self.assertEqual(self.db.get_metrics()["flushes"], flushes + 1)
+
+        reloaded = SQLiteDatabase(self.data_dir)
+        self.assertEqual([a.name for a in reloaded.get_all_agents()], ["Senior Coder"])
+        self.assertEqual([p.name for p in reloaded.get_all_providers()], ["Company"])
+
+    def test_get_providers_by_type(self):
+        """Test the indexed provider type query."""
+        self.assertEqual([p.id for p in self.db.get_providers_by_type(ProviderType.FRAMEWORK)], [self.framework.id])
+        self.company.provider_type = ProviderType.FRAMEWORK
+        self.db.update_provider(self.company)
+        self.assertEqual([p.id for p in self.db.get_providers_by_type("framework")],
+                         [self.company.id, self.framework.id])
+        self.assertEqual(self.db.get_providers_by_type(ProviderType.COMPANY), [])
+
+    def test_filter_agents_matches_json_database(self):
+        """Test that SQL filters return the same agents as the JSON implementation."""
+        json_db = JSONDatabase(self.data_dir)
+        json_db.providers, json_db.agents = self.db.providers, self.db.agents
+        json_db._rebuild_indexes()
+
+        criteria = [
+            {"provider_id": self.company.id},
+            {"domains": [AgentDomain.CODING, AgentDomain.FINANCE]},
+            {"features": {"planning": PlanningCapability.ADVANCED}},
+            {"features": {"autonomous": True, "memory": [MemoryType.LONG_TERM]}},
+            {"features": {"tool_use": ToolUseCapability.PREDEFINED}},
+            {"features": {"reasoning_frameworks": ["ReAct"]}},
+            {"features": {"autonomous": False}},
+            {"tags": ["missing"]},
+        ]
+        for kwargs in criteria:
+            with self.subTest(kwargs=kwargs):
+                self.assertEqual(
+                    [a.id for a in self.db.filter_agents(**kwargs)],
+                    [a.id for a in json_db.filter_agents(**kwargs)]
+                )
+
+    def test_migration_from_json(self):
+        """Test that a new SQLite database is created from existing JSON files."""
+        other_dir = os.path.join(self.data_dir, "json")
+        json_db = JSONDatabase(other_dir)
+        provider = json_db.add_provider(make_provider())
+        json_db.add_agent(make_agent(provider.id))
+
+        migrated = SQLiteDatabase(other_dir)
+        self.assertEqual(len(migrated.get_all_agents()), 1)
+        self.assertEqual(migrated.get_all_agents()[0].provider.id, provider.id)
+
+
+if __name__ == '__main__':
+    unittest.main()